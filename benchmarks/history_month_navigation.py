@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.services import history_service  # noqa: E402
+
+_CATEGORIES = ["Trabalho", "Pessoal", "Estudos", "Diversos"]
+
+
+def _populate(total_rows: int, months: int) -> None:
+    connection = history_service._connect()
+    try:
+        cursor = connection.cursor()
+        first_day = date.today().replace(day=1) - timedelta(days=30 * (months - 1))
+        span_days = (date.today() - first_day).days + 1
+        random_generator = random.Random(42)
+        batch: list[tuple[str | int | None, ...]] = []
+        for index in range(total_rows):
+            day = first_day + timedelta(days=random_generator.randrange(span_days))
+            content = f"Nota de teste {index} " + "lorem ipsum " * 16
+            batch.append(
+                (
+                    day.isoformat(),
+                    f"{random_generator.randrange(24):02d}:{random_generator.randrange(60):02d}",
+                    f"nota_{index}.md",
+                    random_generator.choice(_CATEGORIES),
+                    "Pasta",
+                    "Justificativa",
+                    "local",
+                    history_service._store_content(cursor, content),
+                    content[:80],
+                )
+            )
+            if len(batch) >= 50_000:
+                _insert(connection, batch)
+                batch = []
+        _insert(connection, batch)
+        history_service._index_all_entries(cursor)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def _insert(connection: sqlite3.Connection, rows: list[tuple[str | int | None, ...]]) -> None:
+    connection.executemany(
+        """
+        INSERT INTO historico (
+            data, hora, titulo, categoria, destino, justificativa, fonte, conteudo_id, resumo
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+
+
+async def _measure(months: list[tuple[int, int]], repeat: int) -> list[float]:
+    timings: list[float] = []
+    for _ in range(repeat):
+        for year, month in months:
+            started_at = time.perf_counter()
+            await history_service.get_month_counts(year, month)
+            await history_service.get_month_entries_page(year, month)
+            timings.append((time.perf_counter() - started_at) * 1000)
+    return timings
+
+
+def _recent_months(count: int) -> list[tuple[int, int]]:
+    today = date.today()
+    year, month = today.year, today.month
+    months: list[tuple[int, int]] = []
+    for _ in range(count):
+        months.append((year, month))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return months
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede a navegação mensal do histórico.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--months", type=int, default=36, help="meses cobertos pelos dados gerados")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as temp_home:
+            os.environ["HOME"] = temp_home
+            asyncio.run(history_service.init_db())
+            _populate(size, args.months)
+
+            timings = asyncio.run(_measure(_recent_months(12), args.repeat))
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            print(
+                f"{size:>9} linhas: mediana {statistics.median(timings):8.2f} ms | "
+                f"p95 {p95:8.2f} ms | máx {max(timings):8.2f} ms"
+            )
+            history_service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.history_month_navigation import _populate  # noqa: E402
+from src.services import history_service  # noqa: E402
+
+_QUERIES = ["nota", "lorem", "teste 123", "ipsum lor", "nota_99", "justificativa", "inexistente"]
+
+
+async def _measure(repeat: int) -> list[float]:
+    await history_service.search(_QUERIES[0])
+    timings: list[float] = []
+    for _ in range(repeat):
+        for query in _QUERIES:
+            started_at = time.perf_counter()
+            await history_service.search(query, limit=20)
+            timings.append((time.perf_counter() - started_at) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede a busca textual no histórico.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 300_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as temp_home:
+            os.environ["HOME"] = temp_home
+            asyncio.run(history_service.init_db())
+            _populate(size, 36)
+
+            timings = asyncio.run(_measure(args.repeat))
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            print(
+                f"{size:>9} linhas: mediana {statistics.median(timings):8.2f} ms | "
+                f"p95 {p95:8.2f} ms | máx {max(timings):8.2f} ms"
+            )
+            history_service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import asdict
+from datetime import date
+from pathlib import Path
+from typing import Any, Awaitable, TextIO, TypeVar
+
+from src.models.schemas import OVERSIZE_STRATEGIES, AnalysisResult, AppConfig, NoteFile
+from src.services import cache_service, history_service
+from src.services.ai_service import DEFAULT_MAX_CONCURRENCY, AIService, close_clients
+from src.services.backfill_service import list_notes_in_range, run_backfill, stream_notes_in_range
+from src.services.notes_service import MARK_ANALYZED_BATCH_SIZE, mark_notes_analyzed
+from src.utils.config_manager import CONFIG_FILE, load_config_file
+
+_API_KEY_ENV_VARS = ("NOTES_ANALYZER_API_KEY", "GROQ_API_KEY")
+_T = TypeVar("_T")
+
+
+def _run(awaitable: Awaitable[_T]) -> _T:
+    async def runner() -> _T:
+        try:
+            return await awaitable
+        finally:
+            await close_clients()
+
+    return asyncio.run(runner())
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"data inválida (use AAAA-MM-DD): {value}") from error
+
+
+def _positive_int(value: str) -> int:
+    try:
+        parsed = int(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"inteiro inválido: {value}") from error
+    if parsed < 1:
+        raise argparse.ArgumentTypeError("o valor deve ser maior que zero")
+    return parsed
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Analisa notas sem abrir a interface gráfica.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    analyze = subparsers.add_parser(
+        "analyze",
+        help="classifica as notas de um período e imprime um JSON por linha",
+    )
+    _add_common_arguments(analyze)
+    analyze.add_argument("--dry-run", action="store_true", help="apenas lista as notas encontradas, sem chamar a IA")
+    analyze.add_argument("--no-history", action="store_true", help="não grava os resultados no histórico")
+
+    backfill = subparsers.add_parser(
+        "backfill",
+        help="analisa um período longo com checkpoints, retomando de onde parou",
+    )
+    _add_common_arguments(backfill)
+    backfill.add_argument(
+        "--restart",
+        action="store_true",
+        help="descarta o checkpoint deste período e começa do zero",
+    )
+    subparsers.add_parser(
+        "compact",
+        help="compacta o banco do histórico (VACUUM); rode com o app fechado",
+    )
+    return parser
+
+
+def _add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--from", dest="start", type=_parse_date, help="data inicial (padrão: hoje)")
+    parser.add_argument("--to", dest="end", type=_parse_date, help="data final, inclusiva (padrão: --from)")
+    parser.add_argument(
+        "--source",
+        choices=("local", "antinote"),
+        help="origem das notas (padrão: a da configuração)",
+    )
+    parser.add_argument("--directory", help="pasta das notas locais (padrão: a da configuração)")
+    parser.add_argument(
+        "--concurrency",
+        type=_positive_int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help=f"requisições simultâneas à IA (padrão: {DEFAULT_MAX_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--max-chars",
+        type=_positive_int,
+        help="caracteres máximos por nota enviados à IA (padrão: o da configuração)",
+    )
+    parser.add_argument(
+        "--oversize",
+        choices=OVERSIZE_STRATEGIES,
+        help="o que fazer com notas maiores que o limite: truncar ou dividir em partes",
+    )
+    parser.add_argument("--config", type=Path, default=CONFIG_FILE, help="arquivo JSON de configuração")
+
+
+def _resolve_api_key(config: AppConfig) -> str:
+    for variable in _API_KEY_ENV_VARS:
+        value = os.environ.get(variable, "").strip()
+        if value:
+            return value
+    return config.api_key
+
+
+def _write_line(stream: TextIO, payload: dict[str, Any]) -> None:
+    stream.write(json.dumps(payload, ensure_ascii=False) + "\n")
+    stream.flush()
+
+
+def _write_result(note: NoteFile, result: AnalysisResult) -> None:
+    _write_line(sys.stdout, {**asdict(result), "file_path": note.file_path})
+
+
+def _resolve_run_options(args: argparse.Namespace) -> tuple[AppConfig, str, str, date, date] | None:
+    config = load_config_file(args.config)
+    if args.max_chars is not None:
+        config.max_note_chars = args.max_chars
+    if args.oversize is not None:
+        config.oversize_strategy = args.oversize
+    source = args.source or config.notes_source
+    directory = args.directory or config.notes_directory
+    start = args.start or date.today()
+    end = args.end or start
+    if end < start:
+        print("A data final deve ser igual ou posterior à inicial.", file=sys.stderr)
+        return None
+    if source == "local" and not directory:
+        print("Pasta das notas não configurada. Use --directory.", file=sys.stderr)
+        return None
+    return config, source, directory, start, end
+
+
+def _print_missing_api_key() -> None:
+    print(
+        f"API Key não configurada. Defina {_API_KEY_ENV_VARS[0]} ou use o arquivo de configuração.",
+        file=sys.stderr,
+    )
+
+
+async def _run_analyze(
+    args: argparse.Namespace,
+    config: AppConfig,
+    source: str,
+    directory: str,
+    start: date,
+    end: date,
+) -> int:
+    if not args.no_history:
+        await history_service.init_db()
+
+    started_at = time.perf_counter()
+    total = 0
+    failed = 0
+    ai_service = AIService(_resolve_api_key(config))
+    analyzed_notes: list[NoteFile] = []
+    failed_notes: list[NoteFile] = []
+    try:
+        async for note, result in ai_service.iter_stream(
+            notes=stream_notes_in_range(
+                source, directory, start, end, config.max_note_chars, config.oversize_strategy
+            ),
+            base_prompt=config.base_prompt,
+            categories=config.categories,
+            max_concurrency=args.concurrency,
+            pack_short_notes=True,
+        ):
+            total += 1
+            if not args.no_history:
+                await history_service.save_result(result, source, note=note)
+            if result.error:
+                failed += 1
+                if source == "local":
+                    failed_notes.append(note)
+            elif source == "local":
+                analyzed_notes.append(note)
+                if len(analyzed_notes) >= MARK_ANALYZED_BATCH_SIZE:
+                    analyzed_notes = await asyncio.to_thread(
+                        mark_notes_analyzed, analyzed_notes, failed_notes
+                    )
+            _write_result(note, result)
+    finally:
+        if analyzed_notes:
+            await asyncio.to_thread(mark_notes_analyzed, analyzed_notes, failed_notes)
+
+    if total == 0:
+        print(f"Nenhuma nota encontrada entre {start} e {end}.", file=sys.stderr)
+        return 0
+
+    elapsed = time.perf_counter() - started_at
+    rate = total / elapsed if elapsed > 0 else 0.0
+    cache_stats = cache_service.get_cache_stats()
+    print(
+        f"{total} nota(s) em {elapsed:.1f}s ({rate:.2f} notas/s), {failed} com erro; "
+        f"cache: {cache_stats['hits']} acerto(s), {cache_stats['misses']} falha(s).",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+def _analyze(args: argparse.Namespace) -> int:
+    options = _resolve_run_options(args)
+    if options is None:
+        return 2
+    config, source, directory, start, end = options
+
+    if args.dry_run:
+        try:
+            notes = list_notes_in_range(
+                source, directory, start, end, config.max_note_chars, config.oversize_strategy
+            )
+        except (FileNotFoundError, PermissionError, RuntimeError) as error:
+            print(f"Erro ao ler notas: {error}", file=sys.stderr)
+            return 2
+        for note in notes:
+            _write_line(
+                sys.stdout,
+                {
+                    "file_name": note.file_name,
+                    "file_path": note.file_path,
+                    "modified_at": note.modified_at.isoformat(timespec="seconds"),
+                    "characters": len(note.content),
+                },
+            )
+        print(f"{len(notes)} nota(s) encontrada(s) entre {start} e {end}.", file=sys.stderr)
+        return 0
+
+    if not _resolve_api_key(config):
+        _print_missing_api_key()
+        return 2
+
+    try:
+        return _run(_run_analyze(args, config, source, directory, start, end))
+    except (FileNotFoundError, PermissionError, RuntimeError) as error:
+        print(f"Erro ao ler notas: {error}", file=sys.stderr)
+        return 2
+
+
+def _backfill(args: argparse.Namespace) -> int:
+    options = _resolve_run_options(args)
+    if options is None:
+        return 2
+    config, source, directory, start, end = options
+
+    api_key = _resolve_api_key(config)
+    if not api_key:
+        _print_missing_api_key()
+        return 2
+
+    started_at = time.perf_counter()
+    try:
+        summary = _run(
+            run_backfill(
+                api_key=api_key,
+                source=source,
+                directory=directory,
+                start=start,
+                end=end,
+                base_prompt=config.base_prompt,
+                categories=config.categories,
+                max_concurrency=args.concurrency,
+                restart=args.restart,
+                on_result=_write_result,
+                max_content_chars=config.max_note_chars,
+                oversize_strategy=config.oversize_strategy,
+            )
+        )
+    except (FileNotFoundError, PermissionError, RuntimeError) as error:
+        print(f"Erro ao ler notas: {error}", file=sys.stderr)
+        return 2
+
+    elapsed = time.perf_counter() - started_at
+    print(
+        f"{summary.total} nota(s) no período: {summary.skipped} já processada(s), "
+        f"{summary.analyzed} analisada(s), {summary.failed} com erro em {elapsed:.1f}s.",
+        file=sys.stderr,
+    )
+    if summary.failed:
+        print("Execute o mesmo comando novamente para tentar as notas com erro.", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _compact() -> int:
+    started_at = time.perf_counter()
+    try:
+        _run(history_service.compact())
+    except sqlite3.OperationalError as error:
+        print(f"Não foi possível compactar o histórico: {error}", file=sys.stderr)
+        return 1
+    print(f"Histórico compactado em {time.perf_counter() - started_at:.1f}s.", file=sys.stderr)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    if args.command == "analyze":
+        return _analyze(args)
+    if args.command == "backfill":
+        return _backfill(args)
+    if args.command == "compact":
+        return _compact()
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
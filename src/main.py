@@ -4,7 +4,8 @@ from pathlib import Path
 
 import flet as ft
 
-from src.services import history_service
+from src.services import history_service, job_service
+from src.services.ai_service import close_clients
 from src.utils.config_manager import ConfigManager
 from src.views.dashboard_view import DashboardView
 from src.views.history_view import HistoryView
@@ -39,6 +40,7 @@ async def main(page: ft.Page) -> None:
     dashboard_view = DashboardView(page=page, config_manager=config_manager)
     history_view = HistoryView(page=page, config_manager=config_manager)
     settings_view = SettingsView(page=page, config_manager=config_manager)
+    await job_service.start()
 
     content_area = ft.Container(
         expand=True,
@@ -125,7 +127,19 @@ async def main(page: ft.Page) -> None:
         page.update()
 
     page.on_resized = on_page_resized
-    
+
+    async def on_window_event(event: ft.WindowEvent) -> None:
+        if event.type != ft.WindowEventType.CLOSE:
+            return
+        # Running jobs stop here and stay queued in the history database, so the
+        # next launch resumes them; the shared AI connections close after them.
+        await job_service.shutdown()
+        await close_clients()
+        await page.window.destroy()
+
+    page.window.prevent_close = True
+    page.window.on_event = on_window_event
+
     apply_compact_mode()
     page.update()
 
@@ -4,6 +4,15 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
+DEFAULT_MAX_NOTE_CHARS = 20_000
+OVERSIZE_STRATEGIES = ("truncate", "chunk")
+
+JOB_PENDING = "pendente"
+JOB_RUNNING = "executando"
+JOB_DONE = "concluida"
+JOB_FAILED = "falhou"
+JOB_CANCELLED = "cancelada"
+
 
 @dataclass(slots=True)
 class NoteFile:
@@ -11,6 +20,8 @@ class NoteFile:
     file_path: str
     modified_at: datetime
     content: str
+    revision: str = ""
+    part_count: int = 1
 
 
 @dataclass(slots=True)
@@ -22,6 +33,39 @@ class AnalysisResult:
     error: str | None = None
 
 
+@dataclass(slots=True)
+class BackfillSummary:
+    total: int = 0
+    skipped: int = 0
+    analyzed: int = 0
+    failed: int = 0
+
+
+@dataclass(slots=True)
+class ReprocessSummary:
+    total: int = 0
+    updated: int = 0
+    failed: int = 0
+
+
+@dataclass(slots=True)
+class Job:
+    id: int
+    kind: str
+    key: str
+    params: dict[str, Any] = field(default_factory=dict)
+    priority: int = 0
+    status: str = JOB_PENDING
+    completed: int = 0
+    total: int | None = None
+    result: str | None = None
+    error: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+
 @dataclass(slots=True)
 class CategoryRule:
     name: str
@@ -39,6 +83,9 @@ class AppConfig:
     api_key: str = ""
     notes_directory: str = ""
     notes_source: str = "local"
+    incremental_sync: bool = False
+    max_note_chars: int = DEFAULT_MAX_NOTE_CHARS
+    oversize_strategy: str = "truncate"
     base_prompt: str = (
         "Você é um assistente de organização. Leia a nota e classifique-a em uma categoria "
         "adequada, sugerindo onde ela deve ser guardada."
@@ -57,6 +104,9 @@ class AppConfig:
             "api_key": self.api_key,
             "notes_directory": self.notes_directory,
             "notes_source": self.notes_source,
+            "incremental_sync": self.incremental_sync,
+            "max_note_chars": self.max_note_chars,
+            "oversize_strategy": self.oversize_strategy,
             "base_prompt": self.base_prompt,
             "categories": [category.to_dict() for category in self.categories],
         }
@@ -82,10 +132,19 @@ class AppConfig:
                             )
                         )
 
+        try:
+            max_note_chars = int(data.get("max_note_chars", DEFAULT_MAX_NOTE_CHARS))
+        except (TypeError, ValueError):
+            max_note_chars = DEFAULT_MAX_NOTE_CHARS
+        oversize_strategy = str(data.get("oversize_strategy", "truncate"))
+
         return cls(
             api_key=str(data.get("api_key", "")),
             notes_directory=str(data.get("notes_directory", "")),
             notes_source=str(data.get("notes_source", "local")),
+            incremental_sync=bool(data.get("incremental_sync", False)),
+            max_note_chars=max_note_chars if max_note_chars > 0 else DEFAULT_MAX_NOTE_CHARS,
+            oversize_strategy=oversize_strategy if oversize_strategy in OVERSIZE_STRATEGIES else "truncate",
             base_prompt=str(data.get("base_prompt", cls().base_prompt)),
             categories=categories or cls().categories,
         )
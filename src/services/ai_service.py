@@ -1,19 +1,92 @@
 from __future__ import annotations
 
+import asyncio
+import importlib.util
 import json
-from typing import Callable
+from collections import defaultdict, deque
+from typing import AsyncIterable, AsyncIterator, Callable
 
-from groq import APIStatusError, AsyncGroq
+import httpx
+from groq import APIConnectionError, APIStatusError, AsyncGroq, DefaultAsyncHttpxClient
+from groq.types.chat import ChatCompletion
 
 from src.models.schemas import AnalysisResult, CategoryRule, NoteFile
+from src.services import cache_service
+from src.services.content_limits import split_content
+from src.services.rate_limiter import RETRYABLE_STATUS_CODES, RateLimiter, backoff_delay, parse_duration
 
+DEFAULT_MAX_CONCURRENCY = 4
+MODEL_NAME = "llama-3.3-70b-versatile"
+MAX_ATTEMPTS = 5
+SHORT_NOTE_MAX_TOKENS = 200
+PACK_TOKEN_BUDGET = 1500
+MAX_NOTES_PER_PACK = 15
+SUMMARY_CHUNK_TOKEN_BUDGET = 6000
+SUMMARY_SEPARATOR = "\n\n---\n\n"
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+CONNECTION_LIMITS = httpx.Limits(
+    max_connections=16,
+    max_keepalive_connections=8,
+    keepalive_expiry=60.0,
+)
 
-class AIService:
-    def __init__(self, api_key: str) -> None:
-        self._client = AsyncGroq(api_key=api_key)
+_DAY_SUMMARY_PROMPT = "Faça um resumo executivo em tópicos do meu dia com base nestas anotações:"
+_CHUNK_SUMMARY_PROMPT = (
+    "Resuma em tópicos curtos os pontos principais destas anotações de um trecho do meu dia, "
+    "preservando tarefas, decisões, nomes e datas:"
+)
+_REDUCE_SUMMARY_PROMPT = (
+    "Faça um resumo executivo em tópicos do meu dia combinando estes resumos parciais "
+    "das minhas anotações, sem repetir tópicos:"
+)
+
+
+class _ClientRegistry:
+    def __init__(self) -> None:
+        self._entries: dict[tuple[str, asyncio.AbstractEventLoop], tuple[AsyncGroq, RateLimiter]] = {}
+
+    def get(self, api_key: str) -> tuple[AsyncGroq, RateLimiter]:
+        # Pooled connections belong to the loop that opened them, so each loop gets
+        # its own client (e.g. another asyncio.run) and closes it before it ends.
+        loop = asyncio.get_running_loop()
+        self._drop_closed_loops()
+        entry = self._entries.get((api_key, loop))
+        if entry is None:
+            http_client = DefaultAsyncHttpxClient(http2=HTTP2_AVAILABLE, limits=CONNECTION_LIMITS)
+            entry = (AsyncGroq(api_key=api_key, max_retries=0, http_client=http_client), RateLimiter())
+            self._entries[(api_key, loop)] = entry
+        return entry
 
     async def close(self) -> None:
-        await self._client.close()
+        loop = asyncio.get_running_loop()
+        clients = [client for (_, entry_loop), (client, _) in self._entries.items() if entry_loop is loop]
+        self._entries = {key: entry for key, entry in self._entries.items() if key[1] is not loop}
+        self._drop_closed_loops()
+        for client in clients:
+            await client.close()
+
+    def _drop_closed_loops(self) -> None:
+        # A closed loop has already torn down its connections; only the entry is left.
+        closed = [key for key in self._entries if key[1].is_closed()]
+        for key in closed:
+            del self._entries[key]
+
+
+_clients = _ClientRegistry()
+
+
+async def close_clients() -> None:
+    await _clients.close()
+
+
+class AIService:
+    def __init__(
+        self,
+        api_key: str,
+        use_cache: bool = True,
+    ) -> None:
+        self._api_key = api_key
+        self._use_cache = use_cache
 
     async def analyze_batch(
         self,
@@ -21,27 +94,336 @@ class AIService:
         base_prompt: str,
         categories: list[CategoryRule],
         on_progress: Callable[[int, int], None] | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        pack_short_notes: bool = False,
     ) -> list[AnalysisResult]:
-        results: list[AnalysisResult] = []
         total = len(notes)
+        if total == 0:
+            return []
 
-        for index, note in enumerate(notes, start=1):
+        # iter_stream yields in completion order; each note's input position puts
+        # its result back in place.
+        positions: dict[int, deque[int]] = defaultdict(deque)
+        for index, note in enumerate(notes):
+            positions[id(note)].append(index)
+
+        async def source() -> AsyncIterator[NoteFile]:
+            for note in notes:
+                yield note
+
+        results: list[AnalysisResult | None] = [None] * total
+        completed = 0
+        if on_progress is not None:
+            on_progress(0, total)
+
+        async for note, result in self.iter_stream(
+            notes=source(),
+            base_prompt=base_prompt,
+            categories=categories,
+            max_concurrency=max_concurrency,
+            pack_short_notes=pack_short_notes,
+        ):
+            results[positions[id(note)].popleft()] = result
+            completed += 1
             if on_progress is not None:
-                on_progress(index, total)
-            result = await self.analyze_note(note=note, base_prompt=base_prompt, categories=categories)
-            results.append(result)
+                on_progress(completed, total)
+
+        return [result for result in results if result is not None]
+
+    async def iter_stream(
+        self,
+        notes: AsyncIterable[NoteFile],
+        base_prompt: str,
+        categories: list[CategoryRule],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        pack_short_notes: bool = False,
+    ) -> AsyncIterator[tuple[NoteFile, AnalysisResult]]:
+        # A slot is taken before each unit of work is submitted and only given back
+        # once its results have been handed to the caller, so at most max_concurrency
+        # units are held at once however large the source is.
+        limit = max(1, max_concurrency)
+        slots = asyncio.Semaphore(limit)
+        finished: asyncio.Queue[list[tuple[NoteFile, AnalysisResult]] | None] = asyncio.Queue()
+        tasks: set[asyncio.Task[None]] = set()
+
+        async def analyze_unit(unit: list[NoteFile]) -> None:
+            try:
+                if len(unit) == 1:
+                    unit_results = [
+                        await self.analyze_note(note=unit[0], base_prompt=base_prompt, categories=categories)
+                    ]
+                else:
+                    unit_results = await self.analyze_packed(
+                        notes=unit,
+                        base_prompt=base_prompt,
+                        categories=categories,
+                    )
+            except asyncio.CancelledError:
+                slots.release()
+                raise
+            except Exception as error:
+                # Every note still gets exactly one result, so the caller can record
+                # the failure instead of losing the whole unit.
+                unit_results = [
+                    AnalysisResult(
+                        file_name=note.file_name,
+                        category="Erro",
+                        destination="-",
+                        justification="Erro inesperado durante a análise.",
+                        error=str(error) or error.__class__.__name__,
+                    )
+                    for note in unit
+                ]
+            finished.put_nowait(list(zip(unit, unit_results)))
+
+        async def submit(unit: list[NoteFile]) -> None:
+            await slots.acquire()
+            task = asyncio.create_task(analyze_unit(unit))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        async def produce() -> None:
+            pack: list[NoteFile] = []
+            pack_tokens = 0
+            try:
+                async for note in notes:
+                    note_tokens = self._estimate_tokens(note.file_name) + self._estimate_tokens(note.content)
+                    if not pack_short_notes or note_tokens > SHORT_NOTE_MAX_TOKENS:
+                        await submit([note])
+                        continue
+                    if pack and (
+                        pack_tokens + note_tokens > PACK_TOKEN_BUDGET
+                        or len(pack) >= MAX_NOTES_PER_PACK
+                    ):
+                        await submit(pack)
+                        pack = []
+                        pack_tokens = 0
+                    pack.append(note)
+                    pack_tokens += note_tokens
+                if pack:
+                    await submit(pack)
+                for _ in range(limit):
+                    await slots.acquire()
+            finally:
+                finished.put_nowait(None)
+                close_source = getattr(notes, "aclose", None)
+                if close_source is not None:
+                    await close_source()
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (unit_results := await finished.get()) is not None:
+                slots.release()
+                for item in unit_results:
+                    yield item
+            await producer
+        finally:
+            producer.cancel()
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(producer, *tasks, return_exceptions=True)
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        return len(text) // 4 + 1
+
+    async def analyze_packed(
+        self,
+        notes: list[NoteFile],
+        base_prompt: str,
+        categories: list[CategoryRule],
+    ) -> list[AnalysisResult]:
+        results: list[AnalysisResult | None] = [None] * len(notes)
+        cache_keys = [""] * len(notes)
+        if self._use_cache:
+            for index, note in enumerate(notes):
+                cache_keys[index] = cache_service.build_cache_key(
+                    note.content, base_prompt, categories, MODEL_NAME
+                )
+                results[index] = await cache_service.get_cached_result(cache_keys[index], note.file_name)
+
+        pending = [index for index, result in enumerate(results) if result is None]
+        if len(pending) > 1:
+            packed = await self._request_packed_analysis(
+                [notes[index] for index in pending],
+                base_prompt,
+                categories,
+            )
+            for index, result in zip(pending, packed):
+                results[index] = result
+                if result is not None and cache_keys[index] and not result.error:
+                    await cache_service.store_result(cache_keys[index], result)
+
+        for index, result in enumerate(results):
+            if result is not None:
+                continue
+            if not self._use_cache:
+                results[index] = await self.analyze_note(notes[index], base_prompt, categories)
+                continue
+            fallback_result = await self._request_analysis(notes[index], base_prompt, categories)
+            if not fallback_result.error:
+                await cache_service.store_result(cache_keys[index], fallback_result)
+            results[index] = fallback_result
+
+        return [result for result in results if result is not None]
 
+    async def _request_packed_analysis(
+        self,
+        notes: list[NoteFile],
+        base_prompt: str,
+        categories: list[CategoryRule],
+    ) -> list[AnalysisResult | None]:
+        categories_text = "\n".join(
+            f"- {category.name}: {category.instruction}" for category in categories
+        )
+        system_instruction = (
+            "Você analisa várias notas de uma vez e responde exclusivamente em JSON válido. "
+            "Formato obrigatório: {\"results\":[{\"id\":\"...\",\"category\":\"...\","
+            "\"destination\":\"...\",\"justification\":\"...\"}]}, com exatamente um item por nota."
+        )
+        notes_text = "\n\n".join(
+            f"### Nota id={index}\nNome do arquivo: {note.file_name}\nConteúdo da nota:\n{note.content}"
+            for index, note in enumerate(notes, start=1)
+        )
+        user_prompt = (
+            f"{base_prompt}\n\n"
+            f"Categorias possíveis:\n{categories_text}\n\n"
+            f"Classifique cada uma das {len(notes)} notas abaixo:\n\n{notes_text}\n"
+        )
+
+        try:
+            response = await self._create_completion(
+                messages=[
+                    {"role": "system", "content": system_instruction},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=0.3,
+            )
+            content = response.choices[0].message.content if response.choices else ""
+            items = self._parse_json_array_response(content or "")
+        except APIStatusError as api_error:
+            return [
+                AnalysisResult(
+                    file_name=note.file_name,
+                    category="Erro",
+                    destination="-",
+                    justification="Falha na chamada à API.",
+                    error=self._map_api_error(api_error),
+                )
+                for note in notes
+            ]
+        except Exception:
+            return [None] * len(notes)
+
+        parsed_by_id: dict[str, dict[str, str]] = {}
+        for item in items:
+            if isinstance(item, dict) and "id" in item:
+                parsed_by_id[str(item["id"]).strip()] = item
+
+        results: list[AnalysisResult | None] = []
+        for index, note in enumerate(notes, start=1):
+            parsed = parsed_by_id.get(str(index))
+            if parsed is None or "category" not in parsed:
+                results.append(None)
+                continue
+            results.append(
+                AnalysisResult(
+                    file_name=note.file_name,
+                    category=str(parsed.get("category", "Sem categoria")),
+                    destination=str(parsed.get("destination", "Sem destino")),
+                    justification=str(parsed.get("justification", "Sem justificativa")),
+                )
+            )
         return results
 
     async def generate_summary(self, combined_text: str) -> str:
+        return await self._request_summary(_DAY_SUMMARY_PROMPT, combined_text)
+
+    async def summarize_day(
+        self,
+        note_contents: list[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> str:
+        chunks = self._plan_summary_chunks(note_contents)
+        if not chunks:
+            raise ValueError("Nenhuma anotação para resumir.")
+        if len(chunks) == 1:
+            summary = await self.generate_summary(chunks[0])
+            if on_progress is not None:
+                on_progress(1, 1)
+            return summary
+
+        completed = 0
+        total = len(chunks) + 1
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def summarize(chunk: str) -> str:
+            nonlocal completed
+            partial = await self._summarize_chunk(chunk, semaphore)
+            completed += 1
+            if on_progress is not None:
+                on_progress(completed, total)
+            return partial
+
+        partials = list(await asyncio.gather(*(summarize(chunk) for chunk in chunks)))
+        # On very heavy days even the partial summaries may not fit in one request,
+        # so they are folded again until they do. A group may hold a single oversized
+        # partial, which is then summarized on its own; if a whole round does not
+        # shrink the text, the final request would still be over budget.
+        groups = self._plan_summary_chunks(partials)
+        while len(groups) > 1:
+            previous_tokens = sum(self._estimate_tokens(partial) for partial in partials)
+            total += len(groups)
+            partials = list(await asyncio.gather(*(summarize(group) for group in groups)))
+            if sum(self._estimate_tokens(partial) for partial in partials) >= previous_tokens:
+                raise ValueError("Os resumos parciais do dia não couberam em uma única requisição.")
+            groups = self._plan_summary_chunks(partials)
+        summary = await self._request_summary(_REDUCE_SUMMARY_PROMPT, SUMMARY_SEPARATOR.join(partials))
+        if on_progress is not None:
+            on_progress(total, total)
+        return summary
+
+    def _plan_summary_chunks(self, texts: list[str]) -> list[str]:
+        # Notes are packed in order, so a note added at the end of the day only
+        # changes the last chunk and the earlier partial summaries stay cached.
+        chunks: list[str] = []
+        current: list[str] = []
+        current_tokens = 0
+        for text in texts:
+            for piece in split_content(text, SUMMARY_CHUNK_TOKEN_BUDGET * 4):
+                piece_tokens = self._estimate_tokens(piece)
+                if current and current_tokens + piece_tokens > SUMMARY_CHUNK_TOKEN_BUDGET:
+                    chunks.append(SUMMARY_SEPARATOR.join(current))
+                    current = []
+                    current_tokens = 0
+                current.append(piece)
+                current_tokens += piece_tokens
+
+        if current:
+            chunks.append(SUMMARY_SEPARATOR.join(current))
+        return chunks
+
+    async def _summarize_chunk(self, chunk: str, semaphore: asyncio.Semaphore) -> str:
+        cache_key = ""
+        if self._use_cache:
+            cache_key = cache_service.build_summary_cache_key(chunk, _CHUNK_SUMMARY_PROMPT, MODEL_NAME)
+            cached_summary = await cache_service.get_cached_summary(cache_key)
+            if cached_summary:
+                return cached_summary
+
+        async with semaphore:
+            summary = await self._request_summary(_CHUNK_SUMMARY_PROMPT, chunk)
+
+        if self._use_cache:
+            await cache_service.store_summary(cache_key, summary)
+        return summary
+
+    async def _request_summary(self, instruction: str, text: str) -> str:
         system_instruction = "Você é um assistente de produtividade."
-        user_prompt = (
-            "Faça um resumo executivo em tópicos do meu dia com base nestas anotações:\n\n"
-            f"{combined_text}"
-        )
+        user_prompt = f"{instruction}\n\n{text}"
 
-        response = await self._client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+        response = await self._create_completion(
             messages=[
                 {"role": "system", "content": system_instruction},
                 {"role": "user", "content": user_prompt},
@@ -60,6 +442,24 @@ class AIService:
         note: NoteFile,
         base_prompt: str,
         categories: list[CategoryRule],
+    ) -> AnalysisResult:
+        cache_key = ""
+        if self._use_cache:
+            cache_key = cache_service.build_cache_key(note.content, base_prompt, categories, MODEL_NAME)
+            cached_result = await cache_service.get_cached_result(cache_key, note.file_name)
+            if cached_result is not None:
+                return cached_result
+
+        result = await self._request_analysis(note, base_prompt, categories)
+        if cache_key and not result.error:
+            await cache_service.store_result(cache_key, result)
+        return result
+
+    async def _request_analysis(
+        self,
+        note: NoteFile,
+        base_prompt: str,
+        categories: list[CategoryRule],
     ) -> AnalysisResult:
         categories_text = "\n".join(
             f"- {category.name}: {category.instruction}" for category in categories
@@ -76,8 +476,7 @@ class AIService:
         )
 
         try:
-            response = await self._client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
+            response = await self._create_completion(
                 messages=[
                     {"role": "system", "content": system_instruction},
                     {"role": "user", "content": user_prompt},
@@ -117,6 +516,42 @@ class AIService:
                 error=str(error),
             )
 
+    async def _create_completion(
+        self,
+        messages: list[dict[str, str]],
+        temperature: float,
+    ) -> ChatCompletion:
+        client, rate_limiter = _clients.get(self._api_key)
+        for attempt in range(MAX_ATTEMPTS):
+            await rate_limiter.acquire()
+            try:
+                raw_response = await client.chat.completions.with_raw_response.create(
+                    model=MODEL_NAME,
+                    messages=messages,
+                    temperature=temperature,
+                )
+            except APIStatusError as api_error:
+                status_code = int(getattr(api_error, "status_code", 0) or 0)
+                if status_code not in RETRYABLE_STATUS_CODES or attempt == MAX_ATTEMPTS - 1:
+                    raise
+                retry_after = parse_duration(api_error.response.headers.get("retry-after"))
+                if status_code == 429:
+                    rate_limiter.record_throttled(api_error.response.headers, retry_after)
+                await asyncio.sleep(retry_after if retry_after is not None else backoff_delay(attempt))
+                continue
+            except APIConnectionError:
+                if attempt == MAX_ATTEMPTS - 1:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+
+            completion = await raw_response.parse()
+            usage = getattr(completion, "usage", None)
+            rate_limiter.record_success(raw_response.headers, getattr(usage, "total_tokens", None))
+            return completion
+
+        raise RuntimeError("Número máximo de tentativas excedido.")
+
     @staticmethod
     def _parse_json_response(raw_text: str) -> dict[str, str]:
         cleaned = raw_text.strip()
@@ -127,6 +562,18 @@ class AIService:
             raise ValueError("Resposta da IA não é um objeto JSON")
         return parsed
 
+    @staticmethod
+    def _parse_json_array_response(raw_text: str) -> list[dict[str, str]]:
+        cleaned = raw_text.strip()
+        if cleaned.startswith("```"):
+            cleaned = cleaned.replace("```json", "").replace("```", "").strip()
+        parsed = json.loads(cleaned)
+        if isinstance(parsed, dict):
+            parsed = parsed.get("results")
+        if not isinstance(parsed, list):
+            raise ValueError("Resposta da IA não contém uma lista de classificações")
+        return parsed
+
     @staticmethod
     def _map_api_error(api_error: APIStatusError) -> str:
         status_code = int(getattr(api_error, "status_code", 0) or 0)
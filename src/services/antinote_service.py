@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import sqlite3
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
+from typing import AsyncIterator
 
-from src.models.schemas import NoteFile
+from src.models.schemas import DEFAULT_MAX_NOTE_CHARS, NoteFile
+from src.services.content_limits import limit_note, source_path
 
 ANTINOTE_DB_PATH = Path.home() / "Library/Containers/com.chabomakers.Antinote/Data/Documents/notes.sqlite3"
+_ISO_DATE_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*"
+_CONTENT_BATCH_SIZE = 500
+_STREAM_BATCH_SIZE = 50
+_VERSION_EXPRESSION = "COALESCE(NULLIF(lastModified, ''), created)"
 
 
 def get_antinote_db_path() -> Path:
@@ -15,6 +23,40 @@ def get_antinote_db_path() -> Path:
     return ANTINOTE_DB_PATH
 
 
+def _get_sync_state_path() -> Path:
+    base_dir = Path.home() / ".notes_analyzer"
+    base_dir.mkdir(parents=True, exist_ok=True)
+    return base_dir / "antinote_sync.json"
+
+
+def _load_sync_state() -> tuple[str, set[str]]:
+    state_path = _get_sync_state_path()
+    if not state_path.exists():
+        return "", set()
+    try:
+        data = json.loads(state_path.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError):
+        return "", set()
+    if not isinstance(data, dict):
+        return "", set()
+    processed_ids = data.get("processed_ids", [])
+    return (
+        str(data.get("watermark", "") or ""),
+        {str(item) for item in processed_ids} if isinstance(processed_ids, list) else set(),
+    )
+
+
+def _save_sync_state(watermark: str, processed_ids: set[str]) -> None:
+    _get_sync_state_path().write_text(
+        json.dumps(
+            {"watermark": watermark, "processed_ids": sorted(processed_ids)},
+            ensure_ascii=False,
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+
+
 def _parse_antinote_datetime(value: str) -> datetime:
     raw = (value or "").strip()
     if not raw:
@@ -38,44 +80,224 @@ def _parse_antinote_datetime(value: str) -> datetime:
     return datetime.min
 
 
-def get_today_notes_from_antinote() -> list[NoteFile]:
-    db_path = get_antinote_db_path()
+def get_today_notes_from_antinote(
+    max_content_chars: int = DEFAULT_MAX_NOTE_CHARS,
+    oversize_strategy: str = "truncate",
+) -> list[NoteFile]:
     today = date.today()
-    notes: list[NoteFile] = []
+    return get_antinote_notes_in_range(today, today, max_content_chars, oversize_strategy)
+
+
+def _open_database() -> sqlite3.Connection:
+    db_path = get_antinote_db_path()
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
 
-    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+def get_antinote_notes_in_range(
+    start: date,
+    end: date,
+    max_content_chars: int = DEFAULT_MAX_NOTE_CHARS,
+    oversize_strategy: str = "truncate",
+) -> list[NoteFile]:
+    connection = _open_database()
     try:
         cursor = connection.cursor()
-        cursor.execute("SELECT id, created, lastModified, content FROM notes")
-        rows = cursor.fetchall()
+        matches = _select_matches_in_range(cursor, start, end)
+        notes = _load_notes(cursor, matches, max_content_chars, oversize_strategy)
+    except sqlite3.Error as error:
+        raise RuntimeError(f"Falha ao ler banco do Antinote: {error}") from error
+    finally:
+        connection.close()
 
-        for row in rows:
-            note_id = str(row[0] or "").strip()
-            created_text = str(row[1] or "")
-            modified_text = str(row[2] or "")
-            content = str(row[3] or "")
+    return notes
 
-            if not note_id or not content.strip():
-                continue
 
-            created_at = _parse_antinote_datetime(created_text)
-            modified_at = _parse_antinote_datetime(modified_text)
+async def iter_antinote_notes_in_range(
+    start: date,
+    end: date,
+    max_content_chars: int = DEFAULT_MAX_NOTE_CHARS,
+    oversize_strategy: str = "truncate",
+) -> AsyncIterator[NoteFile]:
+    connection = await asyncio.to_thread(_open_database)
+    try:
+        cursor = connection.cursor()
+        matches = await asyncio.to_thread(_select_matches_in_range, cursor, start, end)
+        ordered_ids = sorted(matches, key=lambda note_id: matches[note_id][0], reverse=True)
+        for offset in range(0, len(ordered_ids), _STREAM_BATCH_SIZE):
+            batch = {note_id: matches[note_id] for note_id in ordered_ids[offset:offset + _STREAM_BATCH_SIZE]}
+            notes = await asyncio.to_thread(_load_notes, cursor, batch, max_content_chars, oversize_strategy)
+            for note in notes:
+                yield note
+    except sqlite3.Error as error:
+        raise RuntimeError(f"Falha ao ler banco do Antinote: {error}") from error
+    finally:
+        connection.close()
+
+
+def _select_matches_in_range(
+    cursor: sqlite3.Cursor,
+    start: date,
+    end: date,
+) -> dict[str, tuple[datetime, str]]:
+    matches: dict[str, tuple[datetime, str]] = {}
+    for note_id, created_at, modified_at, version in _select_rows_in_range(cursor, start, end):
+        created_date = created_at.date()
+        modified_date = modified_at.date()
+        if not (start <= created_date <= end or start <= modified_date <= end):
+            continue
+        matches[note_id] = (modified_at if modified_at != datetime.min else created_at, version)
+    return matches
 
-            if created_at.date() != today and modified_at.date() != today:
+
+def get_antinote_notes_since_last_sync(
+    max_content_chars: int = DEFAULT_MAX_NOTE_CHARS,
+    oversize_strategy: str = "truncate",
+) -> list[NoteFile]:
+    watermark, processed_ids = _load_sync_state()
+    if not watermark:
+        return get_today_notes_from_antinote(max_content_chars, oversize_strategy)
+
+    connection = _open_database()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            f"""
+            SELECT id, created, lastModified, {_VERSION_EXPRESSION}
+            FROM notes
+            WHERE {_VERSION_EXPRESSION} >= ?
+            """,
+            (watermark,),
+        )
+        matches: dict[str, tuple[datetime, str]] = {}
+        for note_id, created_at, modified_at, version in _parse_rows(cursor.fetchall()):
+            if version == watermark and note_id in processed_ids:
                 continue
+            matches[note_id] = (modified_at if modified_at != datetime.min else created_at, version)
+        notes = _load_notes(cursor, matches, max_content_chars, oversize_strategy)
+    except sqlite3.Error as error:
+        raise RuntimeError(f"Falha ao ler banco do Antinote: {error}") from error
+    finally:
+        connection.close()
+
+    return notes
+
+
+def mark_antinote_notes_synced(
+    synced_notes: list[NoteFile],
+    failed_notes: list[NoteFile] | None = None,
+) -> None:
+    watermark, processed_ids = _load_sync_state()
+    failed_versions = [note.revision for note in failed_notes or [] if note.revision]
+    ceiling = min(failed_versions) if failed_versions else None
+
+    versions_by_id: dict[str, str] = {}
+    for note in synced_notes:
+        if not note.revision or not note.file_path.startswith("antinote://"):
+            continue
+        if ceiling is not None and note.revision >= ceiling:
+            continue
+        versions_by_id[source_path(note.file_path).removeprefix("antinote://")] = note.revision
+
+    if not versions_by_id:
+        return
+
+    new_watermark = max(versions_by_id.values())
+    if new_watermark < watermark:
+        return
+
+    new_processed_ids = {
+        note_id for note_id, version in versions_by_id.items() if version == new_watermark
+    }
+    if new_watermark == watermark:
+        new_processed_ids |= processed_ids
+    _save_sync_state(new_watermark, new_processed_ids)
 
-            notes.append(
+
+def _load_notes(
+    cursor: sqlite3.Cursor,
+    matches: dict[str, tuple[datetime, str]],
+    max_content_chars: int = DEFAULT_MAX_NOTE_CHARS,
+    oversize_strategy: str = "truncate",
+) -> list[NoteFile]:
+    # Truncated reads only pull one character past the limit out of SQLite, which is
+    # enough for limit_note to detect the overflow and append the marker.
+    read_limit = None if oversize_strategy == "chunk" else max_content_chars + 1
+    notes: list[NoteFile] = []
+    for note_id, content in _select_contents(cursor, list(matches), read_limit):
+        if not content.strip():
+            continue
+        modified_at, version = matches[note_id]
+        notes.extend(
+            limit_note(
                 NoteFile(
                     file_name=f"Antinote {note_id[:8]}",
                     file_path=f"antinote://{note_id}",
-                    modified_at=modified_at if modified_at != datetime.min else created_at,
+                    modified_at=modified_at,
                     content=content,
-                )
+                    revision=version,
+                ),
+                max_content_chars,
+                oversize_strategy,
             )
-    except sqlite3.Error as error:
-        raise RuntimeError(f"Falha ao ler banco do Antinote: {error}") from error
-    finally:
-        connection.close()
+        )
 
     notes.sort(key=lambda item: item.modified_at, reverse=True)
     return notes
+
+
+def _select_rows_in_range(
+    cursor: sqlite3.Cursor,
+    start: date,
+    end: date,
+) -> list[tuple[str, datetime, datetime, str]]:
+    # Timestamps may carry a UTC offset, so the SQL window is one day wider on each
+    # side and the exact local-date check happens after parsing.
+    lower_bound = (start - timedelta(days=1)).isoformat()
+    upper_bound = (end + timedelta(days=2)).isoformat()
+    cursor.execute(
+        f"""
+        SELECT id, created, lastModified, {_VERSION_EXPRESSION}
+        FROM notes
+        WHERE (created >= ? AND created < ?)
+           OR (lastModified >= ? AND lastModified < ?)
+           OR created NOT GLOB ?
+           OR lastModified NOT GLOB ?
+        """,
+        (lower_bound, upper_bound, lower_bound, upper_bound, _ISO_DATE_GLOB, _ISO_DATE_GLOB),
+    )
+    return _parse_rows(cursor.fetchall())
+
+
+def _parse_rows(rows: list[tuple]) -> list[tuple[str, datetime, datetime, str]]:
+    parsed: list[tuple[str, datetime, datetime, str]] = []
+    for row in rows:
+        note_id = str(row[0] or "").strip()
+        if not note_id:
+            continue
+        parsed.append(
+            (
+                note_id,
+                _parse_antinote_datetime(str(row[1] or "")),
+                _parse_antinote_datetime(str(row[2] or "")),
+                str(row[3] or ""),
+            )
+        )
+    return parsed
+
+
+def _select_contents(
+    cursor: sqlite3.Cursor,
+    note_ids: list[str],
+    read_limit: int | None = None,
+) -> list[tuple[str, str]]:
+    content_expression = "content" if read_limit is None else f"substr(content, 1, {int(read_limit)})"
+    contents: list[tuple[str, str]] = []
+    for offset in range(0, len(note_ids), _CONTENT_BATCH_SIZE):
+        batch = note_ids[offset:offset + _CONTENT_BATCH_SIZE]
+        placeholders = ", ".join("?" for _ in batch)
+        cursor.execute(
+            f"SELECT id, {content_expression} FROM notes WHERE id IN ({placeholders})",
+            batch,
+        )
+        contents.extend((str(row[0] or "").strip(), str(row[1] or "")) for row in cursor.fetchall())
+    return contents
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import aclosing
+from datetime import date
+from typing import AsyncIterator, Callable
+
+from src.models.schemas import (
+    DEFAULT_MAX_NOTE_CHARS,
+    AnalysisResult,
+    BackfillSummary,
+    CategoryRule,
+    NoteFile,
+)
+from src.services import history_service
+from src.services.ai_service import DEFAULT_MAX_CONCURRENCY, AIService
+from src.services.antinote_service import get_antinote_notes_in_range, iter_antinote_notes_in_range
+from src.services.notes_service import (
+    MARK_ANALYZED_BATCH_SIZE,
+    get_notes_in_range,
+    iter_notes_in_range,
+    mark_notes_analyzed,
+)
+
+
+def build_run_key(source: str, directory: str, start: date, end: date) -> str:
+    folder = directory if source == "local" else ""
+    return f"{source}|{folder}|{start.isoformat()}|{end.isoformat()}"
+
+
+def list_notes_in_range(
+    source: str,
+    directory: str,
+    start: date,
+    end: date,
+    max_content_chars: int = DEFAULT_MAX_NOTE_CHARS,
+    oversize_strategy: str = "truncate",
+) -> list[NoteFile]:
+    if source == "antinote":
+        return get_antinote_notes_in_range(start, end, max_content_chars, oversize_strategy)
+    return get_notes_in_range(directory, start, end, max_content_chars, oversize_strategy)
+
+
+def stream_notes_in_range(
+    source: str,
+    directory: str,
+    start: date,
+    end: date,
+    max_content_chars: int = DEFAULT_MAX_NOTE_CHARS,
+    oversize_strategy: str = "truncate",
+) -> AsyncIterator[NoteFile]:
+    if source == "antinote":
+        return iter_antinote_notes_in_range(start, end, max_content_chars, oversize_strategy)
+    return iter_notes_in_range(directory, start, end, max_content_chars, oversize_strategy)
+
+
+async def run_backfill(
+    api_key: str,
+    source: str,
+    directory: str,
+    start: date,
+    end: date,
+    base_prompt: str,
+    categories: list[CategoryRule],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    restart: bool = False,
+    on_result: Callable[[NoteFile, AnalysisResult], None] | None = None,
+    max_content_chars: int = DEFAULT_MAX_NOTE_CHARS,
+    oversize_strategy: str = "truncate",
+) -> BackfillSummary:
+    await history_service.init_db()
+    run_id = await history_service.start_backfill_run(
+        build_run_key(source, directory, start, end),
+        restart=restart,
+    )
+
+    checkpoint = await history_service.get_backfill_checkpoint(run_id)
+    summary = BackfillSummary()
+
+    async def pending_notes() -> AsyncIterator[NoteFile]:
+        notes = stream_notes_in_range(source, directory, start, end, max_content_chars, oversize_strategy)
+        async with aclosing(notes):
+            async for note in notes:
+                summary.total += 1
+                if (note.file_path, note.revision) in checkpoint:
+                    summary.skipped += 1
+                    continue
+                yield note
+
+    ai_service = AIService(api_key)
+    analyzed_notes: list[NoteFile] = []
+    failed_notes: list[NoteFile] = []
+    try:
+        async for note, result in ai_service.iter_stream(
+            notes=pending_notes(),
+            base_prompt=base_prompt,
+            categories=categories,
+            max_concurrency=max_concurrency,
+            pack_short_notes=True,
+        ):
+            if result.error:
+                summary.failed += 1
+                if source == "local":
+                    failed_notes.append(note)
+            else:
+                await history_service.save_backfill_result(run_id, result, source, note)
+                summary.analyzed += 1
+                if source == "local":
+                    analyzed_notes.append(note)
+                    if len(analyzed_notes) >= MARK_ANALYZED_BATCH_SIZE:
+                        analyzed_notes = await asyncio.to_thread(
+                            mark_notes_analyzed, analyzed_notes, failed_notes
+                        )
+            if on_result is not None:
+                on_result(note, result)
+    finally:
+        if analyzed_notes:
+            await asyncio.to_thread(mark_notes_analyzed, analyzed_notes, failed_notes)
+
+    if summary.failed == 0:
+        await history_service.finish_backfill_run(run_id)
+    return summary
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from src.models.schemas import AnalysisResult, CategoryRule
+
+MAX_CACHE_ENTRIES = 5000
+MAX_SUMMARY_CACHE_ENTRIES = 2000
+
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+_schema_ready = False
+
+
+def _get_db_path() -> Path:
+    base_dir = Path.home() / ".notes_analyzer"
+    base_dir.mkdir(parents=True, exist_ok=True)
+    return base_dir / "cache_analises.db"
+
+
+def _connect() -> sqlite3.Connection:
+    global _schema_ready
+    connection = sqlite3.connect(_get_db_path())
+    if _schema_ready:
+        return connection
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cache_analises (
+            chave TEXT PRIMARY KEY,
+            categoria TEXT NOT NULL,
+            destino TEXT NOT NULL,
+            justificativa TEXT NOT NULL,
+            criado_em TEXT NOT NULL,
+            usado_em TEXT NOT NULL
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_cache_analises_usado_em
+        ON cache_analises (usado_em)
+        """
+    )
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cache_resumos_parciais (
+            chave TEXT PRIMARY KEY,
+            resumo_texto TEXT NOT NULL,
+            criado_em TEXT NOT NULL,
+            usado_em TEXT NOT NULL
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_cache_resumos_parciais_usado_em
+        ON cache_resumos_parciais (usado_em)
+        """
+    )
+    connection.commit()
+    _schema_ready = True
+    return connection
+
+
+def build_cache_key(
+    content: str,
+    base_prompt: str,
+    categories: list[CategoryRule],
+    model: str,
+) -> str:
+    payload = json.dumps(
+        {
+            "content": content,
+            "base_prompt": base_prompt,
+            "categories": [category.to_dict() for category in categories],
+            "model": model,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def get_cached_result(key: str, file_name: str) -> AnalysisResult | None:
+    return await asyncio.to_thread(_get_cached_result_sync, key, file_name)
+
+
+def _get_cached_result_sync(key: str, file_name: str) -> AnalysisResult | None:
+    connection = _connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            SELECT categoria, destino, justificativa
+            FROM cache_analises
+            WHERE chave = ?
+            """,
+            (key,),
+        )
+        row = cursor.fetchone()
+        if row is not None:
+            cursor.execute(
+                "UPDATE cache_analises SET usado_em = ? WHERE chave = ?",
+                (datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"), key),
+            )
+            connection.commit()
+    finally:
+        connection.close()
+
+    with _stats_lock:
+        _stats["hits" if row is not None else "misses"] += 1
+    if row is None:
+        return None
+
+    return AnalysisResult(
+        file_name=file_name,
+        category=str(row[0]),
+        destination=str(row[1]),
+        justification=str(row[2]),
+    )
+
+
+async def store_result(key: str, result: AnalysisResult) -> None:
+    await asyncio.to_thread(_store_result_sync, key, result)
+
+
+def _store_result_sync(key: str, result: AnalysisResult) -> None:
+    if result.error:
+        return
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+    connection = _connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO cache_analises (
+                chave,
+                categoria,
+                destino,
+                justificativa,
+                criado_em,
+                usado_em
+            )
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (key, result.category, result.destination, result.justification, now, now),
+        )
+        _evict_overflow(cursor)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def _evict_overflow(
+    cursor: sqlite3.Cursor,
+    table: str = "cache_analises",
+    max_entries: int = MAX_CACHE_ENTRIES,
+) -> None:
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    total = int(cursor.fetchone()[0])
+    overflow = total - max_entries
+    if overflow <= 0:
+        return
+    cursor.execute(
+        f"""
+        DELETE FROM {table}
+        WHERE chave IN (
+            SELECT chave
+            FROM {table}
+            ORDER BY usado_em ASC
+            LIMIT ?
+        )
+        """,
+        (overflow,),
+    )
+
+
+def build_summary_cache_key(content: str, prompt: str, model: str) -> str:
+    payload = json.dumps(
+        {"content": content, "prompt": prompt, "model": model},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def get_cached_summary(key: str) -> str | None:
+    return await asyncio.to_thread(_get_cached_summary_sync, key)
+
+
+def _get_cached_summary_sync(key: str) -> str | None:
+    connection = _connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT resumo_texto FROM cache_resumos_parciais WHERE chave = ?", (key,))
+        row = cursor.fetchone()
+        if row is not None:
+            cursor.execute(
+                "UPDATE cache_resumos_parciais SET usado_em = ? WHERE chave = ?",
+                (datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"), key),
+            )
+            connection.commit()
+    finally:
+        connection.close()
+    return str(row[0]) if row is not None else None
+
+
+async def store_summary(key: str, summary: str) -> None:
+    await asyncio.to_thread(_store_summary_sync, key, summary)
+
+
+def _store_summary_sync(key: str, summary: str) -> None:
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+    connection = _connect()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO cache_resumos_parciais (chave, resumo_texto, criado_em, usado_em)
+            VALUES (?, ?, ?, ?)
+            """,
+            (key, summary, now, now),
+        )
+        _evict_overflow(cursor, "cache_resumos_parciais", MAX_SUMMARY_CACHE_ENTRIES)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def get_cache_stats() -> dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+async def clear_cache() -> None:
+    await asyncio.to_thread(_clear_cache_sync)
+
+
+def _clear_cache_sync() -> None:
+    connection = _connect()
+    try:
+        connection.execute("DELETE FROM cache_analises")
+        connection.execute("DELETE FROM cache_resumos_parciais")
+        connection.commit()
+    finally:
+        connection.close()
+    with _stats_lock:
+        _stats["hits"] = 0
+        _stats["misses"] = 0
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+from src.models.schemas import DEFAULT_MAX_NOTE_CHARS, NoteFile
+
+TRUNCATION_MARKER = "\n\n[... conteúdo truncado ...]"
+_PART_SEPARATOR = "#parte-"
+
+
+def source_path(file_path: str) -> str:
+    return file_path.split(_PART_SEPARATOR, 1)[0]
+
+
+def truncate_content(content: str, max_chars: int = DEFAULT_MAX_NOTE_CHARS) -> str:
+    if len(content) <= max_chars:
+        return content
+    return content[:max_chars].rstrip() + TRUNCATION_MARKER
+
+
+def limit_note(
+    note: NoteFile,
+    max_chars: int = DEFAULT_MAX_NOTE_CHARS,
+    strategy: str = "truncate",
+) -> list[NoteFile]:
+    if len(note.content) <= max_chars:
+        return [note]
+    if strategy != "chunk":
+        return [replace(note, content=truncate_content(note.content, max_chars))]
+
+    parts = split_content(note.content, max_chars)
+    return [
+        replace(
+            note,
+            file_name=f"{note.file_name} (parte {index}/{len(parts)})",
+            file_path=f"{note.file_path}{_PART_SEPARATOR}{index}",
+            content=part,
+            part_count=len(parts),
+        )
+        for index, part in enumerate(parts, start=1)
+    ]
+
+
+def split_content(content: str, max_chars: int) -> list[str]:
+    parts: list[str] = []
+    start = 0
+    while start < len(content):
+        end = min(start + max_chars, len(content))
+        if end < len(content):
+            # Prefer breaking at a paragraph or line so each part stays readable.
+            for separator in ("\n\n", "\n"):
+                boundary = content.rfind(separator, start + max_chars // 2, end)
+                if boundary != -1:
+                    end = boundary + len(separator)
+                    break
+        part = content[start:end].strip()
+        if part:
+            parts.append(part)
+        start = end
+    return parts
@@ -1,11 +1,85 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
+import hashlib
+import json
+import logging
+import re
 import sqlite3
+import threading
+import unicodedata
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-
-from src.models.schemas import AnalysisResult, NoteFile
+from typing import Any, Callable, TypeVar
+
+from src.models.schemas import (
+    JOB_CANCELLED,
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_PENDING,
+    JOB_RUNNING,
+    AnalysisResult,
+    Job,
+    NoteFile,
+)
+
+_READER_POOL_SIZE = 3
+_SQL_BATCH_SIZE = 500
+_SEARCH_CANDIDATES = 2000
+_TIMELINE_PAGE_SIZE = 100
+_COMPRESSION_LEVEL = 6
+_FINISHED_JOBS_KEPT = 200
+HIGHLIGHT_START = "\u0002"
+HIGHLIGHT_END = "\u0003"
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+_ENTRY_SELECT = """
+    SELECT
+        historico.id,
+        historico.data,
+        historico.hora,
+        historico.titulo,
+        historico.categoria,
+        historico.destino,
+        historico.justificativa,
+        historico.fonte,
+        historico.conteudo,
+        conteudos.dados,
+        historico.resumo
+    FROM historico
+    LEFT JOIN conteudos ON conteudos.id = historico.conteudo_id
+"""
+_TIMELINE_COLUMNS = "id, data, hora, titulo, categoria, fonte, resumo"
+_JOB_COLUMNS = "id, tipo, chave, parametros, prioridade, estado, concluidas, total, resultado, erro"
+_SEARCH_SELECT = """
+    SELECT
+        historico.id,
+        historico.data,
+        historico.hora,
+        historico.titulo,
+        historico.categoria,
+        historico.fonte,
+        historico.justificativa,
+        historico.conteudo,
+        conteudos.dados
+    FROM historico_fts
+    JOIN historico ON historico.id = historico_fts.rowid
+    LEFT JOIN conteudos ON conteudos.id = historico.conteudo_id
+"""
+_SNIPPET_TOKENS = 16
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+_T = TypeVar("_T")
+_logger = logging.getLogger(__name__)
 
 
 def _get_db_path() -> Path:
@@ -15,67 +89,580 @@ def _get_db_path() -> Path:
 
 
 def _connect() -> sqlite3.Connection:
-    return sqlite3.connect(_get_db_path())
+    connection = sqlite3.connect(_get_db_path(), check_same_thread=False)
+    for pragma in _CONNECTION_PRAGMAS:
+        connection.execute(pragma)
+    # Only the migrations before 007 still reference it; the schema they leave
+    # behind is replaced there by one that plain SQLite can read and write.
+    connection.create_function("descomprimir", 1, _decompress_content, deterministic=True)
+    return connection
 
 
-def _init_db_sync() -> None:
-    connection = _connect()
-    try:
-        cursor = connection.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS historico (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                data TEXT NOT NULL,
-                hora TEXT NOT NULL,
-                titulo TEXT NOT NULL,
-                categoria TEXT NOT NULL,
-                destino TEXT,
-                justificativa TEXT,
-                fonte TEXT NOT NULL,
-                conteudo TEXT,
-                resumo TEXT
-            )
-            """
+def _compress_content(content: str) -> bytes:
+    return zlib.compress(content.encode("utf-8"), _COMPRESSION_LEVEL)
+
+
+def _decompress_content(data: bytes | None) -> str | None:
+    if data is None:
+        return None
+    return zlib.decompress(data).decode("utf-8")
+
+
+def _row_content(inline_content: str | None, compressed: bytes | None) -> str:
+    if inline_content is not None:
+        return str(inline_content)
+    return _decompress_content(compressed) or ""
+
+
+class _ConnectionManager:
+    def __init__(self, reader_count: int) -> None:
+        self._reader_count = reader_count
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._writer: ThreadPoolExecutor | None = None
+        self._readers: ThreadPoolExecutor | None = None
+
+    async def write(self, function: Callable[..., _T], *args: Any) -> _T:
+        executor = self._get_executors()[0]
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._run_write, function, args)
+
+    async def read(self, function: Callable[..., _T], *args: Any) -> _T:
+        executor = self._get_executors()[1]
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._run_read, function, args)
+
+    def close(self) -> None:
+        with self._lock:
+            executors = [self._writer, self._readers]
+            self._writer = None
+            self._readers = None
+            connections = self._connections
+            self._connections = []
+            self._local = threading.local()
+
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        for connection in connections:
+            connection.close()
+
+    def _get_executors(self) -> tuple[ThreadPoolExecutor, ThreadPoolExecutor]:
+        with self._lock:
+            if self._writer is None or self._readers is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="historico-escrita")
+                self._readers = ThreadPoolExecutor(
+                    max_workers=self._reader_count,
+                    thread_name_prefix="historico-leitura",
+                )
+            return self._writer, self._readers
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        local = self._local
+        connection = getattr(local, "connection", None)
+        if connection is None:
+            connection = _connect()
+            local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _run_write(self, function: Callable[..., _T], args: tuple[Any, ...]) -> _T:
+        connection = self._thread_connection()
+        with connection:
+            return function(connection, *args)
+
+    def _run_read(self, function: Callable[..., _T], args: tuple[Any, ...]) -> _T:
+        return function(self._thread_connection(), *args)
+
+
+_database = _ConnectionManager(_READER_POOL_SIZE)
+atexit.register(_database.close)
+_schema_ready = False
+_backfill_task: asyncio.Task[None] | None = None
+
+
+def close() -> None:
+    global _schema_ready, _backfill_task
+    if _backfill_task is not None:
+        _backfill_task.cancel()
+        _backfill_task = None
+    _schema_ready = False
+    _database.close()
+
+
+def _migration_001_base_schema(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS historico (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data TEXT NOT NULL,
+            hora TEXT NOT NULL,
+            titulo TEXT NOT NULL,
+            categoria TEXT NOT NULL,
+            destino TEXT,
+            justificativa TEXT,
+            fonte TEXT NOT NULL,
+            conteudo TEXT,
+            resumo TEXT
         )
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS resumos_dia (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                data TEXT NOT NULL UNIQUE,
-                resumo_texto TEXT NOT NULL,
-                gerado_em TEXT NOT NULL
-            )
-            """
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS resumos_dia (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data TEXT NOT NULL UNIQUE,
+            resumo_texto TEXT NOT NULL,
+            gerado_em TEXT NOT NULL
         )
-        _ensure_column(cursor, "historico", "conteudo", "TEXT")
-        _ensure_column(cursor, "historico", "resumo", "TEXT")
+        """
+    )
+    existing_columns = _column_names(cursor, "historico")
+    for column_name in ("conteudo", "resumo"):
+        if column_name not in existing_columns:
+            cursor.execute(f"ALTER TABLE historico ADD COLUMN {column_name} TEXT")
+    cursor.execute("DROP INDEX IF EXISTS idx_historico_data")
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_historico_data_hora_id
+        ON historico (data, hora, id)
+        """
+    )
+
+
+def _migration_002_daily_counts(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'contagem_dia'")
+    already_exists = cursor.fetchone() is not None
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS contagem_dia (
+            data TEXT PRIMARY KEY,
+            total INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS contagem_dia_insert AFTER INSERT ON historico BEGIN
+            INSERT INTO contagem_dia (data, total) VALUES (new.data, 1)
+            ON CONFLICT (data) DO UPDATE SET total = total + 1;
+        END
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS contagem_dia_delete AFTER DELETE ON historico BEGIN
+            UPDATE contagem_dia SET total = total - 1 WHERE data = old.data;
+            DELETE FROM contagem_dia WHERE data = old.data AND total <= 0;
+        END
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS contagem_dia_update AFTER UPDATE OF data ON historico
+        WHEN old.data IS NOT new.data BEGIN
+            UPDATE contagem_dia SET total = total - 1 WHERE data = old.data;
+            DELETE FROM contagem_dia WHERE data = old.data AND total <= 0;
+            INSERT INTO contagem_dia (data, total) VALUES (new.data, 1)
+            ON CONFLICT (data) DO UPDATE SET total = total + 1;
+        END
+        """
+    )
+    if not already_exists:
         cursor.execute(
             """
-            CREATE INDEX IF NOT EXISTS idx_historico_data
-            ON historico (data)
+            INSERT INTO contagem_dia (data, total)
+            SELECT data, COUNT(*)
+            FROM historico
+            GROUP BY data
             """
         )
-        connection.commit()
-    finally:
-        connection.close()
 
 
-def _ensure_column(
-    cursor: sqlite3.Cursor,
-    table_name: str,
-    column_name: str,
-    column_type: str,
-) -> None:
+def _migration_003_content_storage(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS conteudos (
+            id INTEGER PRIMARY KEY,
+            hash BLOB NOT NULL UNIQUE,
+            dados BLOB NOT NULL
+        )
+        """
+    )
+    if "conteudo_id" not in _column_names(cursor, "historico"):
+        cursor.execute("ALTER TABLE historico ADD COLUMN conteudo_id INTEGER")
+        _drop_search_index(cursor)
+    cursor.execute(
+        """
+        CREATE VIEW IF NOT EXISTS historico_completo AS
+        SELECT
+            historico.id,
+            historico.data,
+            historico.hora,
+            historico.titulo,
+            historico.categoria,
+            historico.destino,
+            historico.justificativa,
+            historico.fonte,
+            COALESCE(historico.conteudo, descomprimir(conteudos.dados)) AS conteudo,
+            historico.resumo
+        FROM historico
+        LEFT JOIN conteudos ON conteudos.id = historico.conteudo_id
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_historico_conteudo_id
+        ON historico (conteudo_id)
+        """
+    )
+
+
+def _drop_search_index(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("DROP TRIGGER IF EXISTS historico_fts_insert")
+    cursor.execute("DROP TRIGGER IF EXISTS historico_fts_delete")
+    cursor.execute("DROP TRIGGER IF EXISTS historico_fts_update")
+    cursor.execute("DROP TABLE IF EXISTS historico_fts")
+
+
+def _migration_004_search_index(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'historico_fts'")
+    already_exists = cursor.fetchone() is not None
+    cursor.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS historico_fts USING fts5(
+            titulo,
+            categoria,
+            justificativa,
+            conteudo,
+            content='historico_completo',
+            content_rowid='id',
+            prefix='2 3 4 5 6',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS historico_fts_insert AFTER INSERT ON historico BEGIN
+            INSERT INTO historico_fts (rowid, titulo, categoria, justificativa, conteudo)
+            SELECT id, titulo, categoria, justificativa, conteudo
+            FROM historico_completo
+            WHERE id = new.id;
+        END
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS historico_fts_delete AFTER DELETE ON historico BEGIN
+            INSERT INTO historico_fts (historico_fts, rowid, titulo, categoria, justificativa, conteudo)
+            VALUES (
+                'delete',
+                old.id,
+                old.titulo,
+                old.categoria,
+                old.justificativa,
+                COALESCE(old.conteudo, (SELECT descomprimir(dados) FROM conteudos WHERE id = old.conteudo_id))
+            );
+            DELETE FROM conteudos
+            WHERE id = old.conteudo_id
+              AND NOT EXISTS (SELECT 1 FROM historico WHERE conteudo_id = old.conteudo_id);
+        END
+        """
+    )
+    cursor.execute("DROP TRIGGER IF EXISTS historico_fts_update")
+    cursor.execute(
+        """
+        CREATE TRIGGER historico_fts_update
+        AFTER UPDATE OF titulo, categoria, justificativa ON historico BEGIN
+            INSERT INTO historico_fts (historico_fts, rowid, titulo, categoria, justificativa, conteudo)
+            VALUES (
+                'delete',
+                old.id,
+                old.titulo,
+                old.categoria,
+                old.justificativa,
+                COALESCE(old.conteudo, (SELECT descomprimir(dados) FROM conteudos WHERE id = old.conteudo_id))
+            );
+            INSERT INTO historico_fts (rowid, titulo, categoria, justificativa, conteudo)
+            SELECT id, titulo, categoria, justificativa, conteudo
+            FROM historico_completo
+            WHERE id = new.id;
+        END
+        """
+    )
+    if not already_exists:
+        cursor.execute("INSERT INTO historico_fts (historico_fts) VALUES ('rebuild')")
+
+
+def _migration_005_backfill_checkpoints(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS backfill_execucoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chave TEXT NOT NULL UNIQUE,
+            criada_em TEXT NOT NULL,
+            concluida_em TEXT
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+            execucao_id INTEGER NOT NULL,
+            caminho TEXT NOT NULL,
+            revisao TEXT NOT NULL,
+            PRIMARY KEY (execucao_id, caminho, revisao)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def _migration_006_job_queue(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tarefas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tipo TEXT NOT NULL,
+            chave TEXT NOT NULL,
+            parametros TEXT NOT NULL,
+            prioridade INTEGER NOT NULL DEFAULT 0,
+            estado TEXT NOT NULL,
+            concluidas INTEGER NOT NULL DEFAULT 0,
+            total INTEGER,
+            resultado TEXT,
+            erro TEXT,
+            criada_em TEXT NOT NULL,
+            iniciada_em TEXT,
+            finalizada_em TEXT
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_tarefas_chave_ativa
+        ON tarefas (chave)
+        WHERE estado IN ('pendente', 'executando')
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_tarefas_fila
+        ON tarefas (estado, prioridade DESC, id)
+        """
+    )
+
+
+def _migration_007_search_index_without_udf(cursor: sqlite3.Cursor) -> None:
+    # The view, the external-content index and its triggers all called descomprimir,
+    # which only exists in this process. The index is now contentless and kept in
+    # step by the write paths below, so any SQLite connection can use the tables.
+    _drop_search_index(cursor)
+    cursor.execute("DROP VIEW IF EXISTS historico_completo")
+    cursor.execute(
+        """
+        CREATE VIRTUAL TABLE historico_fts USING fts5(
+            titulo,
+            categoria,
+            justificativa,
+            conteudo,
+            content='',
+            prefix='2 3 4 5 6',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS conteudos_limpeza AFTER DELETE ON historico BEGIN
+            DELETE FROM conteudos
+            WHERE id = old.conteudo_id
+              AND NOT EXISTS (SELECT 1 FROM historico WHERE conteudo_id = old.conteudo_id);
+        END
+        """
+    )
+    _index_all_entries(cursor)
+
+
+def _index_all_entries(cursor: sqlite3.Cursor) -> None:
+    rows = cursor.connection.cursor()
+    rows.execute(
+        """
+        SELECT
+            historico.id,
+            historico.titulo,
+            historico.categoria,
+            historico.justificativa,
+            historico.conteudo,
+            conteudos.dados
+        FROM historico
+        LEFT JOIN conteudos ON conteudos.id = historico.conteudo_id
+        """
+    )
+    while batch := rows.fetchmany(_SQL_BATCH_SIZE):
+        _index_search_rows(
+            cursor,
+            [
+                (int(entry_id), title, category, justification or "", _row_content(inline_content, compressed))
+                for entry_id, title, category, justification, inline_content, compressed in batch
+            ],
+        )
+
+
+_MIGRATIONS: tuple[Callable[[sqlite3.Cursor], None], ...] = (
+    _migration_001_base_schema,
+    _migration_002_daily_counts,
+    _migration_003_content_storage,
+    _migration_004_search_index,
+    _migration_005_backfill_checkpoints,
+    _migration_006_job_queue,
+    _migration_007_search_index_without_udf,
+)
+
+
+def _column_names(cursor: sqlite3.Cursor, table_name: str) -> set[str]:
     cursor.execute(f"PRAGMA table_info({table_name})")
-    existing_columns = {str(row[1]) for row in cursor.fetchall()}
-    if column_name in existing_columns:
-        return
-    cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}")
+    return {str(row[1]) for row in cursor.fetchall()}
+
+
+def _migrate_sync(connection: sqlite3.Connection) -> None:
+    current_version = int(connection.execute("PRAGMA user_version").fetchone()[0])
+    for version in range(current_version, len(_MIGRATIONS)):
+        cursor = connection.cursor()
+        cursor.execute("BEGIN")
+        _MIGRATIONS[version](cursor)
+        cursor.execute(f"PRAGMA user_version = {version + 1}")
+        connection.commit()
+
+
+# Backfills run after the schema is current, one small transaction per batch on the
+# writer thread, so the app keeps reading and writing while old rows are converted.
+def _backfill_contents_sync(connection: sqlite3.Connection) -> int:
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        SELECT id, conteudo
+        FROM historico
+        WHERE conteudo IS NOT NULL
+        LIMIT ?
+        """,
+        (_SQL_BATCH_SIZE,),
+    )
+    rows = cursor.fetchall()
+    updates = [(_store_content(cursor, str(content)), int(entry_id)) for entry_id, content in rows]
+    cursor.executemany(
+        "UPDATE historico SET conteudo_id = ?, conteudo = NULL WHERE id = ?",
+        updates,
+    )
+    return len(rows)
+
+
+_BACKFILLS: tuple[Callable[[sqlite3.Connection], int], ...] = (_backfill_contents_sync,)
+
+
+async def _run_backfills() -> None:
+    for backfill in _BACKFILLS:
+        while await _database.write(backfill):
+            pass
+
+
+async def compact() -> None:
+    # VACUUM rewrites the whole file and holds the writer until it is done, so it is
+    # an explicit maintenance step instead of the tail of the online backfills.
+    await init_db()
+    await _database.write(_vacuum_sync)
+
+
+def _vacuum_sync(connection: sqlite3.Connection) -> None:
+    connection.execute("VACUUM")
+
+
+def _store_content(cursor: sqlite3.Cursor, content: str) -> int | None:
+    if not content:
+        return None
+    content_hash = hashlib.sha256(content.encode("utf-8")).digest()
+    cursor.execute("SELECT id FROM conteudos WHERE hash = ?", (content_hash,))
+    row = cursor.fetchone()
+    if row is not None:
+        return int(row[0])
+    cursor.execute(
+        "INSERT INTO conteudos (hash, dados) VALUES (?, ?)",
+        (content_hash, _compress_content(content)),
+    )
+    return int(cursor.lastrowid)
+
+
+_SearchRow = tuple[int, str, str, str, str]
+
+
+def _index_search_rows(cursor: sqlite3.Cursor, rows: list[_SearchRow]) -> None:
+    cursor.executemany(
+        "INSERT INTO historico_fts (rowid, titulo, categoria, justificativa, conteudo) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+def _unindex_search_rows(cursor: sqlite3.Cursor, rows: list[_SearchRow]) -> None:
+    # A contentless index forgets a row only when given the exact values it indexed.
+    cursor.executemany(
+        """
+        INSERT INTO historico_fts (historico_fts, rowid, titulo, categoria, justificativa, conteudo)
+        VALUES ('delete', ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+
+
+def _load_search_rows(cursor: sqlite3.Cursor, entry_ids: list[int]) -> list[_SearchRow]:
+    rows: list[_SearchRow] = []
+    for offset in range(0, len(entry_ids), _SQL_BATCH_SIZE):
+        batch = entry_ids[offset:offset + _SQL_BATCH_SIZE]
+        placeholders = ", ".join("?" for _ in batch)
+        cursor.execute(
+            f"""
+            SELECT
+                historico.id,
+                historico.titulo,
+                historico.categoria,
+                historico.justificativa,
+                historico.conteudo,
+                conteudos.dados
+            FROM historico
+            LEFT JOIN conteudos ON conteudos.id = historico.conteudo_id
+            WHERE historico.id IN ({placeholders})
+            """,
+            batch,
+        )
+        rows.extend(
+            (int(entry_id), title, category, justification or "", _row_content(inline_content, compressed))
+            for entry_id, title, category, justification, inline_content, compressed in cursor.fetchall()
+        )
+    return rows
 
 
 async def init_db() -> None:
-    await asyncio.to_thread(_init_db_sync)
+    global _schema_ready, _backfill_task
+    if _schema_ready:
+        return
+    await _database.write(_migrate_sync)
+    _schema_ready = True
+    _backfill_task = asyncio.create_task(_run_backfills())
+    _backfill_task.add_done_callback(_finish_backfills)
+
+
+def _finish_backfills(task: asyncio.Task[None]) -> None:
+    global _backfill_task
+    if _backfill_task is task:
+        _backfill_task = None
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        # Rows already converted stay converted; the rest are picked up again on
+        # the next start, since each backfill resumes from what is left.
+        _logger.error("Falha ao migrar o histórico em segundo plano.", exc_info=error)
 
 
 def _build_snippet(text: str, max_length: int = 80) -> str:
@@ -86,18 +673,22 @@ def _build_snippet(text: str, max_length: int = 80) -> str:
 
 
 def _save_results_batch_sync(
+    connection: sqlite3.Connection,
     results: list[AnalysisResult],
     source: str,
     notes: list[NoteFile] | None = None,
+    recorded_at: datetime | None = None,
 ) -> None:
     if not results:
         return
 
-    now = datetime.now()
+    now = recorded_at or datetime.now()
     current_date = now.strftime("%Y-%m-%d")
     current_time = now.strftime("%H:%M")
 
-    rows: list[tuple[str, str, str, str, str, str, str, str, str]] = []
+    cursor = connection.cursor()
+    rows: list[tuple[str, str, str, str, str, str, str, int | None, str]] = []
+    contents: list[str] = []
     if notes and len(notes) == len(results):
         for note, result in zip(notes, results):
             if result.error:
@@ -112,10 +703,11 @@ def _save_results_batch_sync(
                     result.destination,
                     result.justification,
                     source,
-                    content,
+                    _store_content(cursor, content),
                     _build_snippet(content),
                 )
             )
+            contents.append(content)
     else:
         for result in results:
             if result.error:
@@ -129,18 +721,18 @@ def _save_results_batch_sync(
                     result.destination,
                     result.justification,
                     source,
-                    "",
+                    None,
                     "",
                 )
             )
+            contents.append("")
 
     if not rows:
         return
 
-    connection = _connect()
-    try:
-        cursor = connection.cursor()
-        cursor.executemany(
+    search_rows: list[_SearchRow] = []
+    for row, content in zip(rows, contents):
+        cursor.execute(
             """
             INSERT INTO historico (
                 data,
@@ -150,20 +742,23 @@ def _save_results_batch_sync(
                 destino,
                 justificativa,
                 fonte,
-                conteudo,
+                conteudo_id,
                 resumo
             )
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            rows,
+            row,
         )
-        connection.commit()
-    finally:
-        connection.close()
+        search_rows.append((int(cursor.lastrowid), row[2], row[3], row[5], content))
+    _index_search_rows(cursor, search_rows)
 
 
-async def save_result(result: AnalysisResult, source: str) -> None:
-    await save_results_batch([result], source)
+async def save_result(
+    result: AnalysisResult,
+    source: str,
+    note: NoteFile | None = None,
+) -> None:
+    await save_results_batch([result], source, notes=[note] if note is not None else None)
 
 
 async def save_results_batch(
@@ -171,98 +766,610 @@ async def save_results_batch(
     source: str,
     notes: list[NoteFile] | None = None,
 ) -> None:
-    await asyncio.to_thread(_save_results_batch_sync, results, source, notes)
+    await _database.write(_save_results_batch_sync, results, source, notes)
 
 
-async def get_month_counts(year: int, month: int) -> dict[int, int]:
-    return await asyncio.to_thread(_get_month_counts_sync, year, month)
-
+async def start_backfill_run(key: str, restart: bool = False) -> int:
+    return await _database.write(_start_backfill_run_sync, key, restart)
 
-def _get_month_counts_sync(year: int, month: int) -> dict[int, int]:
-    year_str = f"{year:04d}"
-    month_str = f"{month:02d}"
 
-    connection = _connect()
-    try:
-        cursor = connection.cursor()
+def _start_backfill_run_sync(connection: sqlite3.Connection, key: str, restart: bool) -> int:
+    cursor = connection.cursor()
+    if restart:
         cursor.execute(
             """
-            SELECT CAST(strftime('%d', data) AS INTEGER) AS dia, COUNT(*)
-            FROM historico
-            WHERE strftime('%Y', data) = ?
-              AND strftime('%m', data) = ?
-            GROUP BY dia
+            DELETE FROM backfill_checkpoints
+            WHERE execucao_id IN (SELECT id FROM backfill_execucoes WHERE chave = ?)
             """,
-            (year_str, month_str),
+            (key,),
         )
-        rows = cursor.fetchall()
-    finally:
-        connection.close()
+        cursor.execute("DELETE FROM backfill_execucoes WHERE chave = ?", (key,))
+    cursor.execute(
+        """
+        INSERT INTO backfill_execucoes (chave, criada_em)
+        VALUES (?, ?)
+        ON CONFLICT (chave) DO UPDATE SET concluida_em = NULL
+        """,
+        (key, datetime.now().isoformat(timespec="seconds")),
+    )
+    cursor.execute("SELECT id FROM backfill_execucoes WHERE chave = ?", (key,))
+    return int(cursor.fetchone()[0])
+
+
+async def get_backfill_checkpoint(run_id: int) -> set[tuple[str, str]]:
+    return await _database.read(_get_backfill_checkpoint_sync, run_id)
+
+
+def _get_backfill_checkpoint_sync(connection: sqlite3.Connection, run_id: int) -> set[tuple[str, str]]:
+    cursor = connection.cursor()
+    cursor.execute(
+        "SELECT caminho, revisao FROM backfill_checkpoints WHERE execucao_id = ?",
+        (run_id,),
+    )
+    return {(str(path), str(revision)) for path, revision in cursor.fetchall()}
+
+
+async def save_backfill_result(
+    run_id: int,
+    result: AnalysisResult,
+    source: str,
+    note: NoteFile,
+    keep_note_date: bool = True,
+) -> None:
+    await _database.write(_save_backfill_result_sync, run_id, result, source, note, keep_note_date)
+
 
-    return {int(day): int(total) for day, total in rows}
+def _save_backfill_result_sync(
+    connection: sqlite3.Connection,
+    run_id: int,
+    result: AnalysisResult,
+    source: str,
+    note: NoteFile,
+    keep_note_date: bool,
+) -> None:
+    # The history row and its checkpoint share one transaction, so a resumed run
+    # never analyses a note twice nor skips one that was not saved.
+    recorded_at = note.modified_at if keep_note_date else None
+    _save_results_batch_sync(connection, [result], source, [note], recorded_at=recorded_at)
+    connection.execute(
+        """
+        INSERT OR IGNORE INTO backfill_checkpoints (execucao_id, caminho, revisao)
+        VALUES (?, ?, ?)
+        """,
+        (run_id, note.file_path, note.revision),
+    )
 
 
-async def get_month_entries(year: int, month: int) -> list[dict[str, str]]:
-    return await asyncio.to_thread(_get_month_entries_sync, year, month)
+async def finish_backfill_run(run_id: int) -> None:
+    await _database.write(_finish_backfill_run_sync, run_id)
+
+
+def _finish_backfill_run_sync(connection: sqlite3.Connection, run_id: int) -> None:
+    connection.execute(
+        "UPDATE backfill_execucoes SET concluida_em = ? WHERE id = ?",
+        (datetime.now().isoformat(timespec="seconds"), run_id),
+    )
+
 
+async def discard_backfill_run(run_id: int) -> None:
+    await _database.write(_discard_backfill_run_sync, run_id)
+
+
+def _discard_backfill_run_sync(connection: sqlite3.Connection, run_id: int) -> None:
+    connection.execute("DELETE FROM backfill_checkpoints WHERE execucao_id = ?", (run_id,))
+    connection.execute("DELETE FROM backfill_execucoes WHERE id = ?", (run_id,))
+
+
+async def enqueue_job(kind: str, key: str, params: dict[str, Any], priority: int) -> tuple[Job, bool]:
+    return await _database.write(_enqueue_job_sync, kind, key, params, priority)
+
+
+def _enqueue_job_sync(
+    connection: sqlite3.Connection,
+    kind: str,
+    key: str,
+    params: dict[str, Any],
+    priority: int,
+) -> tuple[Job, bool]:
+    # Only one job per key can be active; submitting it again joins the queued or
+    # running one and only raises its priority.
+    cursor = connection.cursor()
+    cursor.execute(
+        f"SELECT {_JOB_COLUMNS} FROM tarefas WHERE chave = ? AND estado IN (?, ?)",
+        (key, JOB_PENDING, JOB_RUNNING),
+    )
+    row = cursor.fetchone()
+    if row is not None:
+        job = _row_to_job(row)
+        if priority > job.priority:
+            cursor.execute("UPDATE tarefas SET prioridade = ? WHERE id = ?", (priority, job.id))
+            job.priority = priority
+        return job, False
+
+    cursor.execute(
+        """
+        INSERT INTO tarefas (tipo, chave, parametros, prioridade, estado, criada_em)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (
+            kind,
+            key,
+            json.dumps(params, ensure_ascii=False, sort_keys=True),
+            priority,
+            JOB_PENDING,
+            datetime.now().isoformat(timespec="seconds"),
+        ),
+    )
+    return Job(id=int(cursor.lastrowid), kind=kind, key=key, params=params, priority=priority), True
 
-def _get_month_entries_sync(year: int, month: int) -> list[dict[str, str]]:
-    year_str = f"{year:04d}"
-    month_str = f"{month:02d}"
 
-    connection = _connect()
+async def claim_next_job(kinds: list[str], min_priority: int | None = None) -> Job | None:
+    if not kinds:
+        return None
+    return await _database.write(_claim_next_job_sync, kinds, min_priority)
+
+
+def _claim_next_job_sync(
+    connection: sqlite3.Connection,
+    kinds: list[str],
+    min_priority: int | None,
+) -> Job | None:
+    placeholders = ", ".join("?" for _ in kinds)
+    priority_filter = "AND prioridade >= ?" if min_priority is not None else ""
+    priority_params = (min_priority,) if min_priority is not None else ()
+    cursor = connection.cursor()
+    cursor.execute(
+        f"""
+        SELECT {_JOB_COLUMNS}
+        FROM tarefas
+        WHERE estado = ?
+          AND tipo IN ({placeholders})
+          {priority_filter}
+        ORDER BY prioridade DESC, id ASC
+        LIMIT 1
+        """,
+        (JOB_PENDING, *kinds, *priority_params),
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+
+    job = _row_to_job(row)
+    cursor.execute(
+        "UPDATE tarefas SET estado = ?, iniciada_em = ? WHERE id = ?",
+        (JOB_RUNNING, datetime.now().isoformat(timespec="seconds"), job.id),
+    )
+    job.status = JOB_RUNNING
+    return job
+
+
+async def requeue_interrupted_jobs() -> int:
+    return await _database.write(_requeue_interrupted_jobs_sync)
+
+
+def _requeue_interrupted_jobs_sync(connection: sqlite3.Connection) -> int:
+    cursor = connection.cursor()
+    cursor.execute(
+        "UPDATE tarefas SET estado = ?, iniciada_em = NULL WHERE estado = ?",
+        (JOB_PENDING, JOB_RUNNING),
+    )
+    return cursor.rowcount
+
+
+async def cancel_pending_job(job_id: int) -> bool:
+    return await _database.write(_cancel_pending_job_sync, job_id)
+
+
+def _cancel_pending_job_sync(connection: sqlite3.Connection, job_id: int) -> bool:
+    cursor = connection.cursor()
+    cursor.execute(
+        "UPDATE tarefas SET estado = ?, finalizada_em = ? WHERE id = ? AND estado = ?",
+        (JOB_CANCELLED, datetime.now().isoformat(timespec="seconds"), job_id, JOB_PENDING),
+    )
+    return cursor.rowcount > 0
+
+
+async def finish_job(job: Job) -> None:
+    await _database.write(_finish_job_sync, job)
+
+
+def _finish_job_sync(connection: sqlite3.Connection, job: Job) -> None:
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        UPDATE tarefas
+        SET estado = ?, concluidas = ?, total = ?, resultado = ?, erro = ?, finalizada_em = ?
+        WHERE id = ?
+        """,
+        (
+            job.status,
+            job.completed,
+            job.total,
+            job.result,
+            job.error,
+            datetime.now().isoformat(timespec="seconds"),
+            job.id,
+        ),
+    )
+    cursor.execute(
+        """
+        DELETE FROM tarefas
+        WHERE estado IN (?, ?, ?)
+          AND id NOT IN (
+              SELECT id
+              FROM tarefas
+              WHERE estado IN (?, ?, ?)
+              ORDER BY id DESC
+              LIMIT ?
+          )
+        """,
+        (
+            JOB_DONE,
+            JOB_FAILED,
+            JOB_CANCELLED,
+            JOB_DONE,
+            JOB_FAILED,
+            JOB_CANCELLED,
+            _FINISHED_JOBS_KEPT,
+        ),
+    )
+
+
+async def get_job(job_id: int) -> Job | None:
+    return await _database.read(_get_job_sync, job_id)
+
+
+def _get_job_sync(connection: sqlite3.Connection, job_id: int) -> Job | None:
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT {_JOB_COLUMNS} FROM tarefas WHERE id = ?", (job_id,))
+    row = cursor.fetchone()
+    return _row_to_job(row) if row is not None else None
+
+
+def _row_to_job(row: tuple[Any, ...]) -> Job:
     try:
-        cursor = connection.cursor()
+        params = json.loads(str(row[3] or "{}"))
+    except json.JSONDecodeError:
+        params = {}
+    return Job(
+        id=int(row[0]),
+        kind=str(row[1]),
+        key=str(row[2]),
+        params=params if isinstance(params, dict) else {},
+        priority=int(row[4]),
+        status=str(row[5]),
+        completed=int(row[6] or 0),
+        total=int(row[7]) if row[7] is not None else None,
+        result=row[8],
+        error=row[9],
+    )
+
+
+async def get_month_counts(year: int, month: int) -> dict[int, int]:
+    return await _database.read(_get_month_counts_sync, year, month)
+
+
+def _month_bounds(year: int, month: int) -> tuple[str, str]:
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01", f"{next_year:04d}-{next_month:02d}-01"
+
+
+def _get_month_counts_sync(connection: sqlite3.Connection, year: int, month: int) -> dict[int, int]:
+    start_date, end_date = _month_bounds(year, month)
+
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        SELECT data, total
+        FROM contagem_dia
+        WHERE data >= ?
+          AND data < ?
+        """,
+        (start_date, end_date),
+    )
+    rows = cursor.fetchall()
+
+    return {int(str(data)[8:10]): int(total) for data, total in rows}
+
+
+async def get_year_counts(year: int) -> dict[str, int]:
+    return await _database.read(_get_year_counts_sync, year)
+
+
+def _get_year_counts_sync(connection: sqlite3.Connection, year: int) -> dict[str, int]:
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        SELECT data, total
+        FROM contagem_dia
+        WHERE data >= ?
+          AND data < ?
+        """,
+        (f"{year:04d}-01-01", f"{year + 1:04d}-01-01"),
+    )
+    return {str(data): int(total) for data, total in cursor.fetchall()}
+
+
+async def get_month_entries_page(
+    year: int,
+    month: int,
+    cursor: tuple[str, str, int] | None = None,
+    limit: int = _TIMELINE_PAGE_SIZE,
+) -> tuple[list[dict[str, str]], tuple[str, str, int] | None]:
+    return await _database.read(_get_month_entries_page_sync, year, month, cursor, limit)
+
+
+def _get_month_entries_page_sync(
+    connection: sqlite3.Connection,
+    year: int,
+    month: int,
+    cursor: tuple[str, str, int] | None,
+    limit: int,
+) -> tuple[list[dict[str, str]], tuple[str, str, int] | None]:
+    start_date, end_date = _month_bounds(year, month)
+    if cursor is None:
+        cursor = (end_date, "", 0)
+
+    db_cursor = connection.cursor()
+    db_cursor.execute(
+        f"""
+        SELECT {_TIMELINE_COLUMNS}
+        FROM historico
+        WHERE data >= ?
+          AND (data, hora, id) < (?, ?, ?)
+        ORDER BY data DESC, hora DESC, id DESC
+        LIMIT ?
+        """,
+        (start_date, *cursor, limit + 1),
+    )
+    rows = db_cursor.fetchall()
+    if len(rows) <= limit:
+        return [_row_to_timeline_entry(row) for row in rows], None
+
+    # Pages always end on a day boundary so the timeline never shows a partial day.
+    rows = rows[:limit]
+    last_id, last_date, last_time = rows[-1][0], rows[-1][1], rows[-1][2]
+    db_cursor.execute(
+        f"""
+        SELECT {_TIMELINE_COLUMNS}
+        FROM historico
+        WHERE data = ?
+          AND (hora, id) < (?, ?)
+        ORDER BY hora DESC, id DESC
+        """,
+        (last_date, last_time, last_id),
+    )
+    rows.extend(db_cursor.fetchall())
+
+    last_id, last_date, last_time = rows[-1][0], rows[-1][1], rows[-1][2]
+    db_cursor.execute(
+        """
+        SELECT 1
+        FROM historico
+        WHERE data >= ?
+          AND (data, hora, id) < (?, ?, ?)
+        LIMIT 1
+        """,
+        (start_date, last_date, last_time, last_id),
+    )
+    next_cursor = (str(last_date), str(last_time), int(last_id)) if db_cursor.fetchone() else None
+
+    return [_row_to_timeline_entry(row) for row in rows], next_cursor
+
+
+def _row_to_timeline_entry(row: tuple[Any, ...]) -> dict[str, str]:
+    return {
+        "id": str(row[0]),
+        "data": str(row[1]),
+        "hora": str(row[2]),
+        "titulo": str(row[3]),
+        "categoria": str(row[4]),
+        "fonte": str(row[5]),
+        "resumo": str(row[6] or ""),
+    }
+
+
+async def get_day_contents(date_str: str) -> list[str]:
+    return await _database.read(_get_day_contents_sync, date_str)
+
+
+def _get_day_contents_sync(connection: sqlite3.Connection, date_str: str) -> list[str]:
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        SELECT historico.conteudo, conteudos.dados
+        FROM historico
+        LEFT JOIN conteudos ON conteudos.id = historico.conteudo_id
+        WHERE historico.data = ?
+          AND (historico.conteudo_id IS NOT NULL OR TRIM(COALESCE(historico.conteudo, '')) <> '')
+        ORDER BY historico.hora ASC, historico.id ASC
+        """,
+        (date_str,),
+    )
+    contents = (_row_content(inline_content, compressed).strip() for inline_content, compressed in cursor.fetchall())
+    return [content for content in contents if content]
+
+
+def _row_to_entry(row: tuple[Any, ...]) -> dict[str, str]:
+    return {
+        "id": str(row[0]),
+        "data": str(row[1]),
+        "hora": str(row[2]),
+        "titulo": str(row[3]),
+        "categoria": str(row[4]),
+        "destino": str(row[5] or ""),
+        "justificativa": str(row[6] or ""),
+        "fonte": str(row[7]),
+        "conteudo": _row_content(row[8], row[9]),
+        "resumo": str(row[10] or ""),
+    }
+
+
+async def get_entry(entry_id: int) -> dict[str, str] | None:
+    return await _database.read(_get_entry_sync, entry_id)
+
+
+def _get_entry_sync(connection: sqlite3.Connection, entry_id: int) -> dict[str, str] | None:
+    cursor = connection.cursor()
+    cursor.execute(f"{_ENTRY_SELECT} WHERE historico.id = ?", (entry_id,))
+    row = cursor.fetchone()
+    return _row_to_entry(row) if row is not None else None
+
+
+def _build_match_query(text: str) -> str:
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] = f"{quoted[-1]}*"
+    return " ".join(quoted)
+
+
+async def search(
+    query: str,
+    limit: int = 20,
+    offset: int = 0,
+) -> tuple[list[dict[str, str]], bool]:
+    match_query = _build_match_query(query)
+    if not match_query:
+        return [], False
+    return await _database.read(_search_sync, match_query, limit, offset)
+
+
+def _search_sync(
+    connection: sqlite3.Connection,
+    match_query: str,
+    limit: int,
+    offset: int,
+) -> tuple[list[dict[str, str]], bool]:
+    # bm25 scores every matching row, so very common terms are ranked only within
+    # the most recent candidates; older matches follow, newest first. The window is
+    # fixed per query, so every page slices the same ordering.
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        SELECT MIN(rowid), COUNT(*)
+        FROM (
+            SELECT rowid
+            FROM historico_fts
+            WHERE historico_fts MATCH ?
+            ORDER BY rowid DESC
+            LIMIT ?
+        )
+        """,
+        (match_query, _SEARCH_CANDIDATES),
+    )
+    lowest_id, window_size = cursor.fetchone()
+    if not window_size:
+        return [], False
+
+    terms = _query_terms(match_query)
+    wanted = limit + 1
+    rows: list[tuple[Any, ...]] = []
+    if offset < window_size:
         cursor.execute(
-            """
-                        SELECT id, data, hora, titulo, categoria, destino, justificativa, fonte, conteudo, resumo
-            FROM historico
-            WHERE strftime('%Y', data) = ?
-              AND strftime('%m', data) = ?
-            ORDER BY data DESC, hora DESC, id DESC
+            f"""
+            {_SEARCH_SELECT}
+            WHERE historico_fts MATCH ?
+              AND historico_fts.rowid >= ?
+            ORDER BY bm25(historico_fts, 4.0, 2.0, 1.0, 1.0), historico_fts.rowid DESC
+            LIMIT ? OFFSET ?
+            """,
+            (match_query, lowest_id, wanted, offset),
+        )
+        rows.extend(cursor.fetchall())
+    if len(rows) < wanted:
+        cursor.execute(
+            f"""
+            {_SEARCH_SELECT}
+            WHERE historico_fts MATCH ?
+              AND historico_fts.rowid < ?
+            ORDER BY historico_fts.rowid DESC
+            LIMIT ? OFFSET ?
             """,
-            (year_str, month_str),
+            (match_query, lowest_id, wanted - len(rows), max(0, offset - window_size)),
         )
-        rows = cursor.fetchall()
-    finally:
-        connection.close()
+        rows.extend(cursor.fetchall())
 
-    return [
+    results = [
         {
             "id": str(row[0]),
             "data": str(row[1]),
             "hora": str(row[2]),
             "titulo": str(row[3]),
             "categoria": str(row[4]),
-            "destino": str(row[5] or ""),
-            "justificativa": str(row[6] or ""),
-            "fonte": str(row[7]),
-            "conteudo": str(row[8] or ""),
-            "resumo": str(row[9] or ""),
+            "fonte": str(row[5]),
+            "trecho": _highlight_snippet(
+                [str(row[3]), str(row[4]), str(row[6] or ""), _row_content(row[7], row[8])],
+                terms,
+            ),
         }
-        for row in rows
+        for row in rows[:limit]
     ]
+    return results, len(rows) > limit
+
+
+def _query_terms(match_query: str) -> list[tuple[str, bool]]:
+    quoted = re.findall(r'"([^"]*)"(\*?)', match_query)
+    return [(_fold_token(term), bool(prefix)) for term, prefix in quoted]
+
+
+def _fold_token(token: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", token.casefold())
+    return "".join(character for character in decomposed if not unicodedata.combining(character))
+
+
+def _matches_terms(token: str, terms: list[tuple[str, bool]]) -> bool:
+    folded = _fold_token(token)
+    return any(folded.startswith(term) if prefix else folded == term for term, prefix in terms)
+
+
+def _highlight_snippet(fields: list[str], terms: list[tuple[str, bool]]) -> str:
+    # Same shape as FTS5 snippet(): the field with the most hits, a window of tokens
+    # around the first one, and every hit wrapped in the highlight markers. The index
+    # keeps no text, so the snippet is cut from the stored fields here.
+    candidates = []
+    for text in fields:
+        tokens = list(_TOKEN_PATTERN.finditer(text))
+        hits = {index for index, token in enumerate(tokens) if _matches_terms(token.group(), terms)}
+        candidates.append((len(hits), text, tokens, hits))
+    _, text, tokens, hits = max(candidates, key=lambda candidate: candidate[0])
+    if not tokens:
+        return ""
+
+    first_hit = min(hits) if hits else 0
+    start = max(0, min(first_hit - 2, len(tokens) - _SNIPPET_TOKENS))
+    end = min(len(tokens), start + _SNIPPET_TOKENS)
+    parts = ["…"] if start > 0 else []
+    position = tokens[start].start()
+    for index in range(start, end):
+        token = tokens[index]
+        parts.append(text[position:token.start()])
+        if index in hits:
+            parts.append(f"{HIGHLIGHT_START}{token.group()}{HIGHLIGHT_END}")
+        else:
+            parts.append(token.group())
+        position = token.end()
+    if end < len(tokens):
+        parts.append("…")
+    return "".join(parts)
 
 
 async def get_daily_summary(date_str: str) -> str | None:
-    return await asyncio.to_thread(_get_daily_summary_sync, date_str)
-
-
-def _get_daily_summary_sync(date_str: str) -> str | None:
-    connection = _connect()
-    try:
-        cursor = connection.cursor()
-        cursor.execute(
-            """
-            SELECT resumo_texto
-            FROM resumos_dia
-            WHERE data = ?
-            """,
-            (date_str,),
-        )
-        row = cursor.fetchone()
-    finally:
-        connection.close()
+    return await _database.read(_get_daily_summary_sync, date_str)
+
+
+def _get_daily_summary_sync(connection: sqlite3.Connection, date_str: str) -> str | None:
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        SELECT resumo_texto
+        FROM resumos_dia
+        WHERE data = ?
+        """,
+        (date_str,),
+    )
+    row = cursor.fetchone()
 
     if row is None:
         return None
@@ -270,38 +1377,28 @@ def _get_daily_summary_sync(date_str: str) -> str | None:
 
 
 async def save_daily_summary(date_str: str, summary: str) -> None:
-    await asyncio.to_thread(_save_daily_summary_sync, date_str, summary)
+    await _database.write(_save_daily_summary_sync, date_str, summary)
 
 
-def _save_daily_summary_sync(date_str: str, summary: str) -> None:
+def _save_daily_summary_sync(connection: sqlite3.Connection, date_str: str, summary: str) -> None:
     generated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    connection = _connect()
-    try:
-        cursor = connection.cursor()
-        cursor.execute(
-            """
-            INSERT OR REPLACE INTO resumos_dia (data, resumo_texto, gerado_em)
-            VALUES (?, ?, ?)
-            """,
-            (date_str, summary, generated_at),
-        )
-        connection.commit()
-    finally:
-        connection.close()
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        INSERT OR REPLACE INTO resumos_dia (data, resumo_texto, gerado_em)
+        VALUES (?, ?, ?)
+        """,
+        (date_str, summary, generated_at),
+    )
 
 
 async def delete_daily_summary(date_str: str) -> None:
-    await asyncio.to_thread(_delete_daily_summary_sync, date_str)
+    await _database.write(_delete_daily_summary_sync, date_str)
 
 
-def _delete_daily_summary_sync(date_str: str) -> None:
-    connection = _connect()
-    try:
-        cursor = connection.cursor()
-        cursor.execute("DELETE FROM resumos_dia WHERE data = ?", (date_str,))
-        connection.commit()
-    finally:
-        connection.close()
+def _delete_daily_summary_sync(connection: sqlite3.Connection, date_str: str) -> None:
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM resumos_dia WHERE data = ?", (date_str,))
 
 
 async def update_entry_analysis(
@@ -310,7 +1407,7 @@ async def update_entry_analysis(
     destination: str,
     justification: str,
 ) -> None:
-    await asyncio.to_thread(
+    await _database.write(
         _update_entry_analysis_sync,
         entry_id,
         category,
@@ -320,6 +1417,7 @@ async def update_entry_analysis(
 
 
 def _update_entry_analysis_sync(
+    connection: sqlite3.Connection,
     entry_id: int,
     category: str,
     destination: str,
@@ -329,71 +1427,272 @@ def _update_entry_analysis_sync(
     current_date = now.strftime("%Y-%m-%d")
     current_time = now.strftime("%H:%M")
 
-    connection = _connect()
-    try:
-        cursor = connection.cursor()
+    cursor = connection.cursor()
+    indexed = _load_search_rows(cursor, [entry_id])
+    _unindex_search_rows(cursor, indexed)
+    cursor.execute(
+        """
+        UPDATE historico
+        SET data = ?,
+            hora = ?,
+            categoria = ?,
+            destino = ?,
+            justificativa = ?
+        WHERE id = ?
+        """,
+        (current_date, current_time, category, destination, justification, entry_id),
+    )
+    _index_search_rows(
+        cursor,
+        [(row_id, title, category, justification, content) for row_id, title, _, _, content in indexed],
+    )
+
+
+async def update_entries_analysis(results: list[tuple[int, AnalysisResult]]) -> None:
+    if not results:
+        return
+    await _database.write(_update_entries_analysis_sync, results)
+
+
+def _update_entries_analysis_sync(
+    connection: sqlite3.Connection,
+    results: list[tuple[int, AnalysisResult]],
+) -> None:
+    # Bulk reprocessing keeps each entry on its original day; only the
+    # classification changes.
+    cursor = connection.cursor()
+    results_by_id = {int(entry_id): result for entry_id, result in results}
+    indexed = _load_search_rows(cursor, list(results_by_id))
+    _unindex_search_rows(cursor, indexed)
+    cursor.executemany(
+        """
+        UPDATE historico
+        SET categoria = ?,
+            destino = ?,
+            justificativa = ?
+        WHERE id = ?
+        """,
+        [
+            (result.category, result.destination, result.justification, entry_id)
+            for entry_id, result in results_by_id.items()
+        ],
+    )
+    _index_search_rows(
+        cursor,
+        [
+            (
+                row_id,
+                title,
+                results_by_id[row_id].category,
+                results_by_id[row_id].justification,
+                content,
+            )
+            for row_id, title, _, _, content in indexed
+        ],
+    )
+
+
+def _reprocess_filter(
+    date_str: str | None,
+    year_month: tuple[int, int] | None,
+) -> tuple[str, list[Any]]:
+    conditions = [
+        "(historico.conteudo_id IS NOT NULL OR TRIM(COALESCE(historico.conteudo, '')) <> '')"
+    ]
+    parameters: list[Any] = []
+    if date_str is not None:
+        conditions.append("historico.data = ?")
+        parameters.append(date_str)
+    elif year_month is not None:
+        conditions.append("historico.data >= ? AND historico.data < ?")
+        parameters.extend(_month_bounds(*year_month))
+    return " AND ".join(conditions), parameters
+
+
+async def count_entries_to_reprocess(
+    entry_ids: list[int] | None = None,
+    date_str: str | None = None,
+    year_month: tuple[int, int] | None = None,
+) -> int:
+    return await _database.read(_count_entries_to_reprocess_sync, entry_ids, date_str, year_month)
+
+
+def _count_entries_to_reprocess_sync(
+    connection: sqlite3.Connection,
+    entry_ids: list[int] | None,
+    date_str: str | None,
+    year_month: tuple[int, int] | None,
+) -> int:
+    where_clause, parameters = _reprocess_filter(date_str, year_month)
+    cursor = connection.cursor()
+    if entry_ids is None:
+        cursor.execute(f"SELECT COUNT(*) FROM historico WHERE {where_clause}", parameters)
+        return int(cursor.fetchone()[0])
+
+    total = 0
+    for offset in range(0, len(entry_ids), _SQL_BATCH_SIZE):
+        batch = [int(entry_id) for entry_id in entry_ids[offset:offset + _SQL_BATCH_SIZE]]
+        placeholders = ", ".join("?" for _ in batch)
         cursor.execute(
-            """
-            UPDATE historico
-            SET data = ?,
-                hora = ?,
-                categoria = ?,
-                destino = ?,
-                justificativa = ?
-            WHERE id = ?
-            """,
-            (current_date, current_time, category, destination, justification, entry_id),
+            f"SELECT COUNT(*) FROM historico WHERE historico.id IN ({placeholders}) AND {where_clause}",
+            [*batch, *parameters],
         )
-        connection.commit()
-    finally:
-        connection.close()
+        total += int(cursor.fetchone()[0])
+    return total
+
+
+async def get_entries_to_reprocess_page(
+    after_id: int = 0,
+    limit: int = _TIMELINE_PAGE_SIZE,
+    entry_ids: list[int] | None = None,
+    date_str: str | None = None,
+    year_month: tuple[int, int] | None = None,
+) -> list[dict[str, str]]:
+    return await _database.read(
+        _get_entries_to_reprocess_page_sync,
+        after_id,
+        limit,
+        entry_ids,
+        date_str,
+        year_month,
+    )
 
 
-async def delete_entry(entry_id: int) -> None:
-    await asyncio.to_thread(_delete_entry_sync, entry_id)
+def _get_entries_to_reprocess_page_sync(
+    connection: sqlite3.Connection,
+    after_id: int,
+    limit: int,
+    entry_ids: list[int] | None,
+    date_str: str | None,
+    year_month: tuple[int, int] | None,
+) -> list[dict[str, str]]:
+    where_clause, parameters = _reprocess_filter(date_str, year_month)
+    if entry_ids is not None:
+        batch = sorted(int(entry_id) for entry_id in entry_ids if int(entry_id) > after_id)[:limit]
+        if not batch:
+            return []
+        placeholders = ", ".join("?" for _ in batch)
+        where_clause = f"historico.id IN ({placeholders}) AND {where_clause}"
+        parameters = [*batch, *parameters]
+
+    cursor = connection.cursor()
+    cursor.execute(
+        f"""
+        SELECT
+            historico.id,
+            historico.titulo,
+            historico.conteudo,
+            conteudos.dados
+        FROM historico
+        LEFT JOIN conteudos ON conteudos.id = historico.conteudo_id
+        WHERE historico.id > ?
+          AND {where_clause}
+        ORDER BY historico.id
+        LIMIT ?
+        """,
+        [after_id, *parameters, limit],
+    )
+    return [
+        {"id": str(row[0]), "titulo": str(row[1]), "conteudo": _row_content(row[2], row[3])}
+        for row in cursor.fetchall()
+    ]
 
 
-def _delete_entry_sync(entry_id: int) -> None:
-    connection = _connect()
-    try:
-        cursor = connection.cursor()
-        cursor.execute("DELETE FROM historico WHERE id = ?", (entry_id,))
-        connection.commit()
-    finally:
-        connection.close()
+async def delete_entry(entry_id: int) -> None:
+    await delete_entries([entry_id])
+
+
+async def delete_entries(entry_ids: list[int]) -> list[dict[str, str]]:
+    if not entry_ids:
+        return []
+    return await _database.write(_delete_entries_sync, entry_ids)
+
+
+def _delete_entries_sync(connection: sqlite3.Connection, entry_ids: list[int]) -> list[dict[str, str]]:
+    cursor = connection.cursor()
+    deleted: list[dict[str, str]] = []
+    for offset in range(0, len(entry_ids), _SQL_BATCH_SIZE):
+        batch = [int(entry_id) for entry_id in entry_ids[offset:offset + _SQL_BATCH_SIZE]]
+        placeholders = ", ".join("?" for _ in batch)
+        cursor.execute(f"{_ENTRY_SELECT} WHERE historico.id IN ({placeholders})", batch)
+        deleted.extend(_row_to_entry(row) for row in cursor.fetchall())
+    _unindex_search_rows(
+        cursor,
+        [
+            (int(entry["id"]), entry["titulo"], entry["categoria"], entry["justificativa"], entry["conteudo"])
+            for entry in deleted
+        ],
+    )
+    cursor.executemany("DELETE FROM historico WHERE id = ?", [(int(entry_id),) for entry_id in entry_ids])
+    return deleted
 
 
 async def clear_history() -> None:
-    await asyncio.to_thread(_clear_history_sync)
+    await _database.write(_clear_history_sync)
 
 
-def _clear_history_sync() -> None:
-    connection = _connect()
-    try:
-        cursor = connection.cursor()
-        cursor.execute("DELETE FROM historico")
-        cursor.execute("DELETE FROM resumos_dia")
-        connection.commit()
-    finally:
-        connection.close()
+def _clear_history_sync(connection: sqlite3.Connection) -> None:
+    cursor = connection.cursor()
+    cursor.execute("INSERT INTO historico_fts (historico_fts) VALUES ('delete-all')")
+    cursor.execute("DELETE FROM historico")
+    cursor.execute("DELETE FROM conteudos")
+    cursor.execute("DELETE FROM resumos_dia")
 
 
 async def restore_entry(entry: dict[str, str]) -> None:
-    await asyncio.to_thread(_restore_entry_sync, entry)
+    await restore_entries([entry])
 
 
-def _restore_entry_sync(entry: dict[str, str]) -> None:
-    content = str(entry.get("conteudo", "") or "")
-    snippet = str(entry.get("resumo", "") or "")
-    if not snippet and content:
-        snippet = _build_snippet(content)
+async def restore_entries(entries: list[dict[str, str]]) -> None:
+    if not entries:
+        return
+    await _database.write(_restore_entries_sync, entries)
+
+
+def _restore_entries_sync(connection: sqlite3.Connection, entries: list[dict[str, str]]) -> None:
+    cursor = connection.cursor()
+    # Entries still present are left alone: replacing them would bypass the delete
+    # triggers and double-count them in contagem_dia and the search index.
+    entry_ids = [int(entry_id) for entry in entries if (entry_id := str(entry.get("id", "") or "")).isdigit()]
+    existing_ids: set[int] = set()
+    for offset in range(0, len(entry_ids), _SQL_BATCH_SIZE):
+        batch = entry_ids[offset:offset + _SQL_BATCH_SIZE]
+        placeholders = ", ".join("?" for _ in batch)
+        cursor.execute(f"SELECT id FROM historico WHERE id IN ({placeholders})", batch)
+        existing_ids.update(int(row[0]) for row in cursor.fetchall())
+
+    rows: list[tuple[int | None, str, str, str, str, str, str, str, int | None, str]] = []
+    contents: list[str] = []
+    for entry in entries:
+        entry_id = str(entry.get("id", "") or "")
+        if entry_id.isdigit() and int(entry_id) in existing_ids:
+            continue
+        content = str(entry.get("conteudo", "") or "")
+        snippet = str(entry.get("resumo", "") or "")
+        if not snippet and content:
+            snippet = _build_snippet(content)
+        rows.append(
+            (
+                int(entry_id) if entry_id.isdigit() else None,
+                str(entry.get("data", "")),
+                str(entry.get("hora", "")),
+                str(entry.get("titulo", "")),
+                str(entry.get("categoria", "")),
+                str(entry.get("destino", "")),
+                str(entry.get("justificativa", "")),
+                str(entry.get("fonte", "")),
+                _store_content(cursor, content),
+                snippet,
+            )
+        )
+        contents.append(content)
 
-    connection = _connect()
-    try:
-        cursor = connection.cursor()
+    search_rows: list[_SearchRow] = []
+    for row, content in zip(rows, contents):
         cursor.execute(
             """
             INSERT INTO historico (
+                id,
                 data,
                 hora,
                 titulo,
@@ -401,23 +1700,14 @@ def _restore_entry_sync(entry: dict[str, str]) -> None:
                 destino,
                 justificativa,
                 fonte,
-                conteudo,
+                conteudo_id,
                 resumo
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO NOTHING
             """,
-            (
-                str(entry.get("data", "")),
-                str(entry.get("hora", "")),
-                str(entry.get("titulo", "")),
-                str(entry.get("categoria", "")),
-                str(entry.get("destino", "")),
-                str(entry.get("justificativa", "")),
-                str(entry.get("fonte", "")),
-                content,
-                snippet,
-            ),
+            row,
         )
-        connection.commit()
-    finally:
-        connection.close()
+        if cursor.rowcount == 1:
+            search_rows.append((int(cursor.lastrowid), row[3], row[4], row[6], content))
+    _index_search_rows(cursor, search_rows)
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable
+
+from src.models.schemas import JOB_CANCELLED, JOB_DONE, JOB_FAILED, Job
+from src.services import history_service
+
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 10
+PRIORITY_HIGH = 20
+DEFAULT_MAX_WORKERS = 2
+
+_logger = logging.getLogger(__name__)
+
+JobListener = Callable[[Job, Any], None]
+
+
+class JobContext:
+    def __init__(self, scheduler: _JobScheduler, job: Job) -> None:
+        self._scheduler = scheduler
+        self.job = job
+
+    @property
+    def params(self) -> dict[str, Any]:
+        return self.job.params
+
+    @property
+    def stopping(self) -> bool:
+        # Set when the app shuts down: the job stays queued and resumes on the next start.
+        return self._scheduler.stopping
+
+    def progress(self, completed: int, total: int | None = None) -> None:
+        self.job.completed = completed
+        if total is not None:
+            self.job.total = total
+        self._scheduler.notify(self.job)
+
+    def emit(self, item: Any) -> None:
+        self._scheduler.notify(self.job, item)
+
+
+JobHandler = Callable[[JobContext], Awaitable[str | None]]
+
+
+class _JobScheduler:
+    def __init__(self) -> None:
+        self._handlers: dict[str, JobHandler] = {}
+        self._listeners: list[tuple[str | None, int | None, JobListener]] = []
+        self._running: dict[int, tuple[Job, asyncio.Task[None]]] = {}
+        self._waiters: dict[int, list[asyncio.Future[Job]]] = {}
+        self._max_workers = DEFAULT_MAX_WORKERS
+        self._wakeup: asyncio.Event | None = None
+        self._dispatcher: asyncio.Task[None] | None = None
+        self._stopping = False
+
+    @property
+    def stopping(self) -> bool:
+        return self._stopping
+
+    def register_handler(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+        self._wake()
+
+    def subscribe(
+        self,
+        listener: JobListener,
+        kind: str | None = None,
+        job_id: int | None = None,
+    ) -> Callable[[], None]:
+        entry = (kind, job_id, listener)
+        self._listeners.append(entry)
+
+        def unsubscribe() -> None:
+            if entry in self._listeners:
+                self._listeners.remove(entry)
+
+        return unsubscribe
+
+    def notify(self, job: Job, item: Any = None) -> None:
+        for kind, job_id, listener in list(self._listeners):
+            if (kind is None or kind == job.kind) and (job_id is None or job_id == job.id):
+                listener(job, item)
+
+    async def start(self, max_workers: int) -> None:
+        if self._dispatcher is not None:
+            return
+        await history_service.init_db()
+        # Jobs still marked as running were interrupted by the last shutdown or a
+        # crash; they go back to the queue and their handlers resume them.
+        await history_service.requeue_interrupted_jobs()
+        self._max_workers = max(1, max_workers)
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def submit(self, kind: str, params: dict[str, Any], priority: int, key: str | None) -> Job:
+        await history_service.init_db()
+        if key is None:
+            key = f"{kind}|{json.dumps(params, ensure_ascii=False, sort_keys=True)}"
+        job, created = await history_service.enqueue_job(kind, key, params, priority)
+        running = self._running.get(job.id)
+        if running is not None:
+            return running[0]
+        if created:
+            self.notify(job)
+        self._wake()
+        return job
+
+    async def cancel(self, job_id: int) -> bool:
+        running = self._running.get(job_id)
+        if running is not None:
+            running[1].cancel()
+            return True
+        if not await history_service.cancel_pending_job(job_id):
+            return False
+        job = await history_service.get_job(job_id)
+        if job is not None:
+            self.notify(job)
+            self._resolve_waiters(job)
+        return True
+
+    async def wait(self, job_id: int) -> Job | None:
+        # The future is registered before the table is read, so a job finishing while
+        # that read is in flight still resolves it.
+        future: asyncio.Future[Job] = asyncio.get_running_loop().create_future()
+        waiters = self._waiters.setdefault(job_id, [])
+        waiters.append(future)
+        try:
+            if job_id not in self._running:
+                job = await history_service.get_job(job_id)
+                if job is None or job.finished:
+                    return job
+            return await future
+        finally:
+            if future in waiters:
+                waiters.remove(future)
+            if not waiters and self._waiters.get(job_id) is waiters:
+                del self._waiters[job_id]
+
+    async def shutdown(self) -> None:
+        self._stopping = True
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        tasks = [task for _, task in self._running.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._dispatcher is not None:
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+        self._dispatcher = None
+        self._wakeup = None
+        self._running.clear()
+        for futures in self._waiters.values():
+            for future in futures:
+                future.cancel()
+        self._waiters.clear()
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _dispatch(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            self._wakeup.clear()
+            while len(self._running) <= self._max_workers:
+                # High-priority jobs are short, interactive requests (e.g. a day summary):
+                # they may take one slot beyond max_workers and run beside a job of their
+                # own kind, so they never wait behind long background work.
+                job = await history_service.claim_next_job(list(self._handlers), PRIORITY_HIGH)
+                if job is None and len(self._running) < self._max_workers:
+                    # Otherwise one job per kind at a time, so two analyses never write
+                    # over each other.
+                    busy_kinds = {job.kind for job, _ in self._running.values()}
+                    kinds = [kind for kind in self._handlers if kind not in busy_kinds]
+                    job = await history_service.claim_next_job(kinds)
+                if job is None:
+                    break
+                self._running[job.id] = (job, asyncio.create_task(self._run(job)))
+            await self._wakeup.wait()
+
+    async def _run(self, job: Job) -> None:
+        self.notify(job)
+        try:
+            job.result = await self._handlers[job.kind](JobContext(self, job))
+            job.status = JOB_DONE
+        except asyncio.CancelledError:
+            if self._stopping:
+                # Left as running in the table so the next start resumes it.
+                raise
+            job.status = JOB_CANCELLED
+        except Exception as error:
+            job.status = JOB_FAILED
+            job.error = str(error) or error.__class__.__name__
+
+        try:
+            await history_service.finish_job(job)
+        except Exception:
+            # The table keeps the job as running, so the next start queues it again.
+            _logger.exception("Falha ao registrar o fim da tarefa %s.", job.id)
+        finally:
+            self._running.pop(job.id, None)
+            self.notify(job)
+            self._resolve_waiters(job)
+            self._wake()
+
+    def _resolve_waiters(self, job: Job) -> None:
+        for future in self._waiters.pop(job.id, []):
+            if not future.done():
+                future.set_result(job)
+
+
+_scheduler = _JobScheduler()
+
+
+def register_handler(kind: str, handler: JobHandler) -> None:
+    _scheduler.register_handler(kind, handler)
+
+
+def subscribe(
+    listener: JobListener,
+    kind: str | None = None,
+    job_id: int | None = None,
+) -> Callable[[], None]:
+    return _scheduler.subscribe(listener, kind=kind, job_id=job_id)
+
+
+async def start(max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+    await _scheduler.start(max_workers)
+
+
+async def submit(
+    kind: str,
+    params: dict[str, Any],
+    priority: int = PRIORITY_NORMAL,
+    key: str | None = None,
+) -> Job:
+    return await _scheduler.submit(kind, params, priority, key)
+
+
+async def cancel(job_id: int) -> bool:
+    return await _scheduler.cancel(job_id)
+
+
+async def wait(job_id: int) -> Job | None:
+    return await _scheduler.wait(job_id)
+
+
+async def shutdown() -> None:
+    await _scheduler.shutdown()
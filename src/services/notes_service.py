@@ -1,15 +1,62 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import os
+import sqlite3
+import sys
 from datetime import date, datetime
 from pathlib import Path
+from typing import AsyncIterator
 
-from src.models.schemas import NoteFile
+from src.models.schemas import DEFAULT_MAX_NOTE_CHARS, NoteFile
+from src.services.content_limits import TRUNCATION_MARKER, limit_note, source_path
 
 _ALLOWED_EXTENSIONS = {".txt", ".md"}
+_READ_BLOCK_CHARS = 65_536
+_INDEX_FLUSH_SIZE = 500
+MARK_ANALYZED_BATCH_SIZE = 200
 
+_IndexRow = tuple[str, int, int, int, str]
+_index_ready = False
 
-def _is_created_or_modified_today(file_path: Path, today: date) -> bool:
-    stats = file_path.stat()
+
+def _get_index_path() -> Path:
+    base_dir = Path.home() / ".notes_analyzer"
+    base_dir.mkdir(parents=True, exist_ok=True)
+    return base_dir / "indice_notas.db"
+
+
+def _connect_index() -> sqlite3.Connection:
+    global _index_ready
+    connection = sqlite3.connect(_get_index_path())
+    if _index_ready:
+        return connection
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS arquivos_notas (
+            caminho TEXT PRIMARY KEY,
+            pasta TEXT NOT NULL,
+            tamanho INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            hash TEXT NOT NULL,
+            hash_analisado TEXT
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_arquivos_notas_pasta
+        ON arquivos_notas (pasta)
+        """
+    )
+    connection.commit()
+    _index_ready = True
+    return connection
+
+
+def _is_created_or_modified_between(stats: os.stat_result, start: date, end: date) -> bool:
     modified_date = datetime.fromtimestamp(stats.st_mtime).date()
 
     created_date: date | None = None
@@ -17,37 +64,275 @@ def _is_created_or_modified_today(file_path: Path, today: date) -> bool:
     if isinstance(birth_time, (float, int)):
         created_date = datetime.fromtimestamp(birth_time).date()
 
-    return modified_date == today or (created_date == today if created_date is not None else False)
+    if start <= modified_date <= end:
+        return True
+    return created_date is not None and start <= created_date <= end
 
 
-def get_today_notes(directory: str) -> list[NoteFile]:
+def _resolve_notes_dir(directory: str) -> Path:
     notes_dir = Path(directory)
     if not notes_dir.exists() or not notes_dir.is_dir():
         raise FileNotFoundError(f"Pasta não encontrada: {directory}")
+    return notes_dir
+
+
+def _iter_note_entries(notes_dir: Path) -> list[tuple[os.DirEntry[str], os.stat_result]]:
+    entries: list[tuple[os.DirEntry[str], os.stat_result]] = []
+    with os.scandir(notes_dir) as iterator:
+        for entry in iterator:
+            if os.path.splitext(entry.name)[1].lower() not in _ALLOWED_EXTENSIONS:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                entries.append((entry, entry.stat()))
+            except OSError:
+                continue
+    return entries
+
+
+def _read_note(
+    entry: os.DirEntry[str],
+    stats: os.stat_result,
+    max_chars: int = DEFAULT_MAX_NOTE_CHARS,
+) -> NoteFile:
+    # Only the first max_chars characters are kept, but the whole file is hashed in
+    # blocks so the revision still changes when the tail of a large note is edited.
+    digest = hashlib.sha256()
+    kept: list[str] = []
+    kept_chars = 0
+    truncated = False
+    with open(entry.path, encoding="utf-8") as handle:
+        while block := handle.read(_READ_BLOCK_CHARS):
+            digest.update(block.encode("utf-8"))
+            if kept_chars < max_chars:
+                piece = block[:max_chars - kept_chars]
+                kept.append(piece)
+                kept_chars += len(piece)
+                truncated = len(piece) < len(block)
+            else:
+                truncated = True
+
+    content = "".join(kept)
+    return NoteFile(
+        file_name=entry.name,
+        file_path=entry.path,
+        modified_at=datetime.fromtimestamp(stats.st_mtime),
+        content=content.rstrip() + TRUNCATION_MARKER if truncated else content,
+        revision=digest.hexdigest(),
+    )
+
 
+def _index_row(stats: os.stat_result, note: NoteFile) -> _IndexRow:
+    # Only what the index stores is kept, not the note content.
+    return (source_path(note.file_path), stats.st_size, stats.st_mtime_ns, stats.st_ino, note.revision)
+
+
+def _upsert_index_rows(
+    connection: sqlite3.Connection,
+    folder: str,
+    rows: list[_IndexRow],
+) -> None:
+    connection.executemany(
+        """
+        INSERT INTO arquivos_notas (caminho, pasta, tamanho, mtime_ns, inode, hash)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(caminho) DO UPDATE SET
+            tamanho = excluded.tamanho,
+            mtime_ns = excluded.mtime_ns,
+            inode = excluded.inode,
+            hash = excluded.hash
+        """,
+        [(path, folder, size, mtime_ns, inode, revision) for path, size, mtime_ns, inode, revision in rows],
+    )
+
+
+def _save_index_rows(folder: str, rows: list[_IndexRow]) -> None:
+    connection = _connect_index()
+    try:
+        _upsert_index_rows(connection, folder, rows)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def _read_note_parts(
+    entry: os.DirEntry[str],
+    stats: os.stat_result,
+    max_chars: int,
+    oversize_strategy: str,
+) -> list[NoteFile]:
+    if oversize_strategy == "chunk":
+        return limit_note(_read_note(entry, stats, max_chars=sys.maxsize), max_chars, oversize_strategy)
+    return [_read_note(entry, stats, max_chars)]
+
+
+def get_today_notes(directory: str) -> list[NoteFile]:
     today = date.today()
+    return get_notes_in_range(directory, today, today)
+
+
+def get_notes_in_range(
+    directory: str,
+    start: date,
+    end: date,
+    max_content_chars: int = DEFAULT_MAX_NOTE_CHARS,
+    oversize_strategy: str = "truncate",
+) -> list[NoteFile]:
+    notes_dir = _resolve_notes_dir(directory)
     notes: list[NoteFile] = []
+    indexed_rows: list[_IndexRow] = []
 
-    for file_path in notes_dir.iterdir():
-        if not file_path.is_file() or file_path.suffix.lower() not in _ALLOWED_EXTENSIONS:
+    for entry, stats in _iter_note_entries(notes_dir):
+        if not _is_created_or_modified_between(stats, start, end):
             continue
-
         try:
-            if not _is_created_or_modified_today(file_path, today):
-                continue
+            parts = _read_note_parts(entry, stats, max_content_chars, oversize_strategy)
+        except (PermissionError, UnicodeDecodeError, OSError):
+            continue
+        if not parts:
+            continue
+        notes.extend(parts)
+        indexed_rows.append(_index_row(stats, parts[0]))
+
+    _save_index_rows(str(notes_dir), indexed_rows)
+
+    notes.sort(key=lambda item: item.modified_at, reverse=True)
+    return notes
+
 
-            content = file_path.read_text(encoding="utf-8")
-            modified_at = datetime.fromtimestamp(file_path.stat().st_mtime)
-            notes.append(
-                NoteFile(
-                    file_name=file_path.name,
-                    file_path=str(file_path),
-                    modified_at=modified_at,
-                    content=content,
+async def iter_notes_in_range(
+    directory: str,
+    start: date,
+    end: date,
+    max_content_chars: int = DEFAULT_MAX_NOTE_CHARS,
+    oversize_strategy: str = "truncate",
+) -> AsyncIterator[NoteFile]:
+    notes_dir = _resolve_notes_dir(directory)
+    entries = await asyncio.to_thread(_iter_note_entries, notes_dir)
+    matching = [
+        (entry, stats)
+        for entry, stats in entries
+        if _is_created_or_modified_between(stats, start, end)
+    ]
+    matching.sort(key=lambda item: item[1].st_mtime, reverse=True)
+
+    indexed_rows: list[_IndexRow] = []
+    try:
+        for entry, stats in matching:
+            try:
+                parts = await asyncio.to_thread(
+                    _read_note_parts,
+                    entry,
+                    stats,
+                    max_content_chars,
+                    oversize_strategy,
                 )
+            except (PermissionError, UnicodeDecodeError, OSError):
+                continue
+            if not parts:
+                continue
+            indexed_rows.append(_index_row(stats, parts[0]))
+            if len(indexed_rows) >= _INDEX_FLUSH_SIZE:
+                await asyncio.to_thread(_save_index_rows, str(notes_dir), indexed_rows)
+                indexed_rows = []
+            for part in parts:
+                yield part
+    finally:
+        if indexed_rows:
+            await asyncio.to_thread(_save_index_rows, str(notes_dir), indexed_rows)
+
+
+def get_changed_notes(
+    directory: str,
+    max_content_chars: int = DEFAULT_MAX_NOTE_CHARS,
+    oversize_strategy: str = "truncate",
+) -> list[NoteFile]:
+    notes_dir = _resolve_notes_dir(directory)
+    folder = str(notes_dir)
+    notes: list[NoteFile] = []
+    changed_rows: list[_IndexRow] = []
+
+    connection = _connect_index()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            """
+            SELECT caminho, tamanho, mtime_ns, inode, hash, hash_analisado
+            FROM arquivos_notas
+            WHERE pasta = ?
+            """,
+            (folder,),
+        )
+        indexed = {
+            str(row[0]): (int(row[1]), int(row[2]), int(row[3]), str(row[4]), row[5])
+            for row in cursor.fetchall()
+        }
+
+        seen_paths: set[str] = set()
+        for entry, stats in _iter_note_entries(notes_dir):
+            seen_paths.add(entry.path)
+            previous = indexed.get(entry.path)
+            metadata_unchanged = previous is not None and previous[:3] == (
+                stats.st_size,
+                stats.st_mtime_ns,
+                stats.st_ino,
             )
-        except (PermissionError, UnicodeDecodeError, OSError):
-            continue
+            if metadata_unchanged and previous[3] == previous[4]:
+                continue
+
+            try:
+                parts = _read_note_parts(entry, stats, max_content_chars, oversize_strategy)
+            except (PermissionError, UnicodeDecodeError, OSError):
+                continue
+            if not parts:
+                continue
+
+            if not metadata_unchanged:
+                changed_rows.append(_index_row(stats, parts[0]))
+            if previous is None or parts[0].revision != previous[4]:
+                notes.extend(parts)
+
+        _upsert_index_rows(connection, folder, changed_rows)
+        removed_paths = [(path,) for path in indexed if path not in seen_paths]
+        cursor.executemany("DELETE FROM arquivos_notas WHERE caminho = ?", removed_paths)
+        connection.commit()
+    finally:
+        connection.close()
 
     notes.sort(key=lambda item: item.modified_at, reverse=True)
     return notes
+
+
+def mark_notes_analyzed(
+    notes: list[NoteFile],
+    failed_notes: list[NoteFile] | None = None,
+) -> list[NoteFile]:
+    # A chunked file only counts as analyzed once every one of its parts has
+    # succeeded; notes of files still waiting for parts are returned to the caller.
+    failed_paths = {source_path(note.file_path) for note in failed_notes or []}
+    parts_by_path: dict[str, list[NoteFile]] = {}
+    for note in notes:
+        if note.revision and source_path(note.file_path) not in failed_paths:
+            parts_by_path.setdefault(source_path(note.file_path), []).append(note)
+
+    rows: list[tuple[str, str]] = []
+    pending: list[NoteFile] = []
+    for path, parts in parts_by_path.items():
+        if len({part.file_path for part in parts}) < parts[0].part_count:
+            pending.extend(parts)
+        else:
+            rows.append((parts[0].revision, path))
+    if not rows:
+        return pending
+
+    connection = _connect_index()
+    try:
+        connection.executemany(
+            "UPDATE arquivos_notas SET hash_analisado = ? WHERE caminho = ?",
+            rows,
+        )
+        connection.commit()
+    finally:
+        connection.close()
+    return pending
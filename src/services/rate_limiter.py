@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import re
+import time
+from collections.abc import Mapping
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+_SHORT_RETRY_AFTER_SECONDS = 1.0
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_duration(value: str | None) -> float | None:
+    raw = (value or "").strip()
+    if not raw:
+        return None
+    try:
+        return max(float(raw), 0.0)
+    except ValueError:
+        pass
+
+    seconds = 0.0
+    matched = False
+    for amount, unit in _DURATION_PART.findall(raw):
+        matched = True
+        if unit == "h":
+            seconds += float(amount) * 3600
+        elif unit == "m":
+            seconds += float(amount) * 60
+        elif unit == "ms":
+            seconds += float(amount) / 1000
+        else:
+            seconds += float(amount)
+    return seconds if matched else None
+
+
+def _parse_int(value: str | None) -> int | None:
+    try:
+        return int(float((value or "").strip()))
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 30.0) -> float:
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        requests_per_minute: float = 30.0,
+        burst: int = 4,
+        max_requests_per_minute: float = 120.0,
+    ) -> None:
+        self._rate = requests_per_minute / 60
+        self._min_rate = 1 / 60
+        self._max_rate = max(max_requests_per_minute, requests_per_minute) / 60
+        self._learned_max_rate = False
+        self._tokens_per_request: float | None = None
+        self._capacity = float(max(1, burst))
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def requests_per_minute(self) -> float:
+        return self._rate * 60
+
+    @property
+    def max_requests_per_minute(self) -> float:
+        return self._max_rate * 60
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait_seconds = self._blocked_until - now
+                if wait_seconds <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait_seconds = (1 - self._tokens) / self._rate
+                await asyncio.sleep(wait_seconds)
+
+    def record_success(
+        self,
+        headers: Mapping[str, str] | None = None,
+        tokens_used: int | None = None,
+    ) -> None:
+        if tokens_used:
+            previous = self._tokens_per_request
+            self._tokens_per_request = (
+                float(tokens_used) if previous is None else previous * 0.8 + tokens_used * 0.2
+            )
+        if headers is not None:
+            self._learn_limits(headers)
+        self._rate = min(self._max_rate, self._rate * 1.1 + 1 / 60)
+        if headers is not None:
+            self._learn_from_headers(headers)
+
+    def record_throttled(
+        self,
+        headers: Mapping[str, str] | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        if headers is not None:
+            self._learn_limits(headers)
+        # A short retry-after is a momentary collision, not a sign the rate is too
+        # high, so waiting it out is enough.
+        if retry_after is None or retry_after > _SHORT_RETRY_AFTER_SECONDS:
+            self._rate = max(self._min_rate, self._rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+        if headers is not None:
+            self._learn_from_headers(headers)
+        if retry_after is not None:
+            self._block_for(retry_after)
+
+    def _learn_limits(self, headers: Mapping[str, str]) -> None:
+        # Groq counts requests per day and tokens per minute, so only the token limit
+        # sets the per-minute ceiling: tokens per minute over the average request size.
+        # The daily request budget is paced from remaining/reset instead.
+        limit_tokens = _parse_int(headers.get("x-ratelimit-limit-tokens"))
+        if not limit_tokens or not self._tokens_per_request:
+            return
+
+        self._max_rate = max(self._min_rate, limit_tokens / self._tokens_per_request / 60)
+        if not self._learned_max_rate:
+            self._learned_max_rate = True
+            self._rate = self._max_rate
+        self._rate = min(self._rate, self._max_rate)
+
+    def _learn_from_headers(self, headers: Mapping[str, str]) -> None:
+        remaining_requests = _parse_int(headers.get("x-ratelimit-remaining-requests"))
+        reset_requests = parse_duration(headers.get("x-ratelimit-reset-requests"))
+        if remaining_requests is not None and reset_requests:
+            if remaining_requests <= 0:
+                self._block_for(reset_requests)
+            else:
+                self._pace(remaining_requests / reset_requests)
+                if remaining_requests <= self._capacity:
+                    self._tokens = min(self._tokens, float(remaining_requests))
+
+        remaining_tokens = _parse_int(headers.get("x-ratelimit-remaining-tokens"))
+        reset_tokens = parse_duration(headers.get("x-ratelimit-reset-tokens"))
+        if remaining_tokens is not None and reset_tokens:
+            if remaining_tokens <= 0:
+                self._block_for(reset_tokens)
+            elif self._tokens_per_request:
+                self._pace(remaining_tokens / self._tokens_per_request / reset_tokens)
+
+    def _pace(self, rate: float) -> None:
+        self._rate = max(self._min_rate, min(self._rate, rate))
+
+    def _block_for(self, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated_at)
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+        self._updated_at = now
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import AsyncIterator, Callable
+
+from src.models.schemas import (
+    DEFAULT_MAX_NOTE_CHARS,
+    AnalysisResult,
+    CategoryRule,
+    NoteFile,
+    ReprocessSummary,
+)
+from src.services import history_service
+from src.services.ai_service import DEFAULT_MAX_CONCURRENCY, AIService
+from src.services.content_limits import truncate_content
+
+_READ_PAGE_SIZE = 200
+_WRITE_BATCH_SIZE = 50
+_HISTORY_PATH_PREFIX = "historico://"
+
+
+async def reprocess_entries(
+    api_key: str,
+    base_prompt: str,
+    categories: list[CategoryRule],
+    entry_ids: list[int] | None = None,
+    date_str: str | None = None,
+    year_month: tuple[int, int] | None = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_content_chars: int = DEFAULT_MAX_NOTE_CHARS,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> ReprocessSummary:
+    total = await history_service.count_entries_to_reprocess(entry_ids, date_str, year_month)
+    summary = ReprocessSummary(total=total)
+    if total == 0:
+        return summary
+
+    async def stored_notes() -> AsyncIterator[NoteFile]:
+        after_id = 0
+        while entries := await history_service.get_entries_to_reprocess_page(
+            after_id,
+            _READ_PAGE_SIZE,
+            entry_ids,
+            date_str,
+            year_month,
+        ):
+            for entry in entries:
+                yield NoteFile(
+                    file_name=entry["titulo"],
+                    file_path=f"{_HISTORY_PATH_PREFIX}{entry['id']}",
+                    modified_at=datetime.now(),
+                    content=truncate_content(entry["conteudo"], max_content_chars),
+                )
+            after_id = int(entries[-1]["id"])
+
+    pending: list[tuple[int, AnalysisResult]] = []
+    # Reprocessing exists to ask the model again, so the analysis cache is skipped
+    # even when the prompt and categories are unchanged.
+    ai_service = AIService(api_key, use_cache=False)
+    try:
+        async for note, result in ai_service.iter_stream(
+            notes=stored_notes(),
+            base_prompt=base_prompt,
+            categories=categories,
+            max_concurrency=max_concurrency,
+            pack_short_notes=True,
+        ):
+            if result.error:
+                summary.failed += 1
+            else:
+                summary.updated += 1
+                pending.append((int(note.file_path.removeprefix(_HISTORY_PATH_PREFIX)), result))
+                if len(pending) >= _WRITE_BATCH_SIZE:
+                    await history_service.update_entries_analysis(pending)
+                    pending = []
+            if on_progress is not None:
+                on_progress(summary.updated + summary.failed, total)
+    finally:
+        # Results already received are kept even when the job is cancelled.
+        await history_service.update_entries_analysis(pending)
+
+    return summary
@@ -2,24 +2,44 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-
-import flet as ft
+from typing import TYPE_CHECKING
 
 from src.models.schemas import AppConfig
 
+if TYPE_CHECKING:
+    import flet as ft
+
+CONFIG_FILE = Path(__file__).resolve().parents[2] / ".notes_analyzer_config.json"
+
+
+def load_config_file(config_file: Path = CONFIG_FILE) -> AppConfig:
+    if not config_file.exists():
+        return AppConfig()
+
+    try:
+        data = json.loads(config_file.read_text(encoding="utf-8"))
+        if not isinstance(data, dict):
+            return AppConfig()
+        return AppConfig.from_dict(data)
+    except (json.JSONDecodeError, OSError):
+        return AppConfig()
+
 
 class ConfigManager:
     _PREFIX = "notesanalyzer."
 
     def __init__(self, page: ft.Page) -> None:
         self.page = page
-        self._config_file = Path(__file__).resolve().parents[2] / ".notes_analyzer_config.json"
+        self._config_file = CONFIG_FILE
 
     async def load(self) -> AppConfig:
         if hasattr(self.page, "client_storage"):
             api_key = await self.page.client_storage.get_async(f"{self._PREFIX}api_key")
             notes_directory = await self.page.client_storage.get_async(f"{self._PREFIX}notes_directory")
             notes_source = await self.page.client_storage.get_async(f"{self._PREFIX}notes_source")
+            incremental_sync = await self.page.client_storage.get_async(f"{self._PREFIX}incremental_sync")
+            max_note_chars = await self.page.client_storage.get_async(f"{self._PREFIX}max_note_chars")
+            oversize_strategy = await self.page.client_storage.get_async(f"{self._PREFIX}oversize_strategy")
             base_prompt = await self.page.client_storage.get_async(f"{self._PREFIX}base_prompt")
             categories = await self.page.client_storage.get_async(f"{self._PREFIX}categories")
 
@@ -27,21 +47,15 @@ class ConfigManager:
                 "api_key": api_key or "",
                 "notes_directory": notes_directory or "",
                 "notes_source": notes_source or "local",
+                "incremental_sync": incremental_sync is True,
+                "max_note_chars": max_note_chars,
+                "oversize_strategy": oversize_strategy or "truncate",
                 "base_prompt": base_prompt or AppConfig().base_prompt,
                 "categories": categories if isinstance(categories, list) else AppConfig().categories,
             }
             return AppConfig.from_dict(raw_data)
 
-        if not self._config_file.exists():
-            return AppConfig()
-
-        try:
-            data = json.loads(self._config_file.read_text(encoding="utf-8"))
-            if not isinstance(data, dict):
-                return AppConfig()
-            return AppConfig.from_dict(data)
-        except (json.JSONDecodeError, OSError):
-            return AppConfig()
+        return load_config_file(self._config_file)
 
     async def save(self, config: AppConfig) -> None:
         payload = config.to_dict()
@@ -53,6 +67,15 @@ class ConfigManager:
             await self.page.client_storage.set_async(
                 f"{self._PREFIX}notes_source", payload["notes_source"]
             )
+            await self.page.client_storage.set_async(
+                f"{self._PREFIX}incremental_sync", payload["incremental_sync"]
+            )
+            await self.page.client_storage.set_async(
+                f"{self._PREFIX}max_note_chars", payload["max_note_chars"]
+            )
+            await self.page.client_storage.set_async(
+                f"{self._PREFIX}oversize_strategy", payload["oversize_strategy"]
+            )
             await self.page.client_storage.set_async(
                 f"{self._PREFIX}base_prompt", payload["base_prompt"]
             )
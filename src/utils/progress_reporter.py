@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import flet as ft
+
+DEFAULT_FPS = 8.0
+
+
+def format_eta(seconds: float) -> str:
+    total_seconds = max(0, round(seconds))
+    minutes, remaining_seconds = divmod(total_seconds, 60)
+    if minutes >= 60:
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}h{minutes:02d}min"
+    if minutes:
+        return f"{minutes}min{remaining_seconds:02d}s"
+    return f"{remaining_seconds}s"
+
+
+class ProgressReporter:
+    def __init__(
+        self,
+        page: ft.Page,
+        text_control: ft.Text,
+        label: str,
+        unit: str = "nota(s)",
+        rate_unit: str = "notas/s",
+        fps: float = DEFAULT_FPS,
+        extra_controls: tuple[ft.Control, ...] = (),
+    ) -> None:
+        self.page = page
+        self.text_control = text_control
+        self.label = label
+        self.unit = unit
+        self.rate_unit = rate_unit
+        self.completed = 0
+        self.total: int | None = None
+        self._frame_interval = 1.0 / max(fps, 0.1)
+        self._controls = (text_control, *extra_controls)
+        self._started_at = time.monotonic()
+        self._last_render_at = 0.0
+        self._pending_render: asyncio.TimerHandle | None = None
+
+    def start(self, total: int | None = None) -> None:
+        self.completed = 0
+        self.total = total
+        self._started_at = time.monotonic()
+        self.text_control.visible = True
+        self._render()
+
+    def update(self, completed: int, total: int | None = None) -> None:
+        self.completed = completed
+        if total is not None:
+            self.total = total
+        self._schedule_render()
+
+    def finish(self, hide: bool = True) -> None:
+        if self._pending_render is not None:
+            self._pending_render.cancel()
+            self._pending_render = None
+        self.text_control.visible = not hide
+        self._render()
+
+    def _schedule_render(self) -> None:
+        # Progress often advances many times per frame; a single deferred render
+        # picks up the latest numbers instead of sending one patch per step.
+        if self._pending_render is not None:
+            return
+        wait = self._last_render_at + self._frame_interval - time.monotonic()
+        if wait <= 0:
+            self._render()
+            return
+        self._pending_render = asyncio.get_running_loop().call_later(wait, self._render)
+
+    def _render(self) -> None:
+        self._pending_render = None
+        self._last_render_at = time.monotonic()
+        self.text_control.value = self.message()
+        self.page.update(*self._controls)
+
+    def message(self) -> str:
+        elapsed = time.monotonic() - self._started_at
+        if self.total is None:
+            text = f"{self.label}... {self.completed} {self.unit} concluída(s)"
+        else:
+            text = f"{self.label}... {self.completed} de {self.total} {self.unit} concluída(s)"
+        if self.completed == 0 or elapsed <= 0:
+            return text
+
+        rate = self.completed / elapsed
+        text = f"{text} · {rate:.1f} {self.rate_unit}"
+        if self.total is not None and self.completed < self.total:
+            text = f"{text} · restam ~{format_eta((self.total - self.completed) / rate)}"
+        return text
@@ -1,15 +1,29 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import aclosing
+from dataclasses import replace
+from datetime import date
+from typing import Any, AsyncIterator
+
 import flet as ft
 
-from src.models.schemas import AnalysisResult
+from src.models.schemas import JOB_CANCELLED, JOB_FAILED, JOB_PENDING, AnalysisResult, AppConfig, Job, NoteFile
+from src.services import job_service
 from src.services.ai_service import AIService
-from src.services.antinote_service import get_today_notes_from_antinote
+from src.services.antinote_service import (
+    get_antinote_notes_since_last_sync,
+    iter_antinote_notes_in_range,
+    mark_antinote_notes_synced,
+)
 from src.services import history_service
-from src.services.notes_service import get_today_notes
+from src.services.notes_service import get_changed_notes, iter_notes_in_range, mark_notes_analyzed
 from src.utils.config_manager import ConfigManager
+from src.utils.progress_reporter import ProgressReporter
 from src.views import theme
 
+_ANALYSIS_JOB = "analise"
+
 
 class DashboardView:
     def __init__(self, page: ft.Page, config_manager: ConfigManager) -> None:
@@ -17,6 +31,8 @@ class DashboardView:
         self.config_manager = config_manager
         self._latest_results: list[AnalysisResult] = []
         self._is_compact_mode = False
+        self._active_job_id: int | None = None
+        self._progress: ProgressReporter | None = None
 
         self.progress_ring = ft.ProgressRing(
             visible=False,
@@ -26,6 +42,13 @@ class DashboardView:
             stroke_width=3,
         )
         self.progress_text = ft.Text(visible=False, color=theme.TEXT_SECONDARY, size=14)
+        self.cancel_button = ft.TextButton(
+            "Cancelar",
+            icon=ft.Icons.CLOSE,
+            style=theme.ios_secondary_button_style(),
+            visible=False,
+            on_click=self._cancel_analysis,
+        )
 
         self.title_text = theme.ios_title("Dashboard")
         self.subtitle_text = theme.ios_subtitle(
@@ -75,17 +98,18 @@ class DashboardView:
                     ft.Row(
                         spacing=10,
                         vertical_alignment=ft.CrossAxisAlignment.CENTER,
-                        controls=[self.progress_ring, self.progress_text],
+                        controls=[self.progress_ring, self.progress_text, self.cancel_button],
                     ),
                     self.empty_state_card,
                     self.results_container,
                 ],
             ),
         )
+        job_service.register_handler(_ANALYSIS_JOB, self._run_analysis_job)
+        job_service.subscribe(self._handle_analysis_event, kind=_ANALYSIS_JOB)
 
     async def _analyze_notes(self, _: ft.ControlEvent) -> None:
         config = await self.config_manager.load()
-        await history_service.init_db()
 
         if not config.api_key:
             self._show_snackbar("API Key não configurada. Vá em Configurações.")
@@ -94,63 +118,212 @@ class DashboardView:
             self._show_snackbar("Pasta base não configurada. Vá em Configurações.")
             return
 
-        self.results_column.controls = []
-        self.results_container.visible = False
-        self.empty_state_card.visible = False
-        self.progress_ring.visible = True
-        self.progress_text.value = "Lendo notas do dia..."
-        self.progress_text.visible = True
-        self.page.update()
+        active_job_id = self._active_job_id
+        job = await job_service.submit(
+            _ANALYSIS_JOB,
+            {
+                "source": config.notes_source,
+                "directory": config.notes_directory if config.notes_source == "local" else "",
+                "incremental": config.incremental_sync,
+                "date": date.today().isoformat(),
+            },
+        )
+        if job.id == active_job_id:
+            self._show_snackbar("Esta análise já está em andamento.")
 
+    async def _run_analysis_job(self, context: job_service.JobContext) -> str | None:
+        params = context.params
+        config = replace(
+            await self.config_manager.load(),
+            notes_source=str(params.get("source", "local")),
+            notes_directory=str(params.get("directory", "")),
+            incremental_sync=bool(params.get("incremental", False)),
+        )
         try:
-            if config.notes_source == "antinote":
-                notes = get_today_notes_from_antinote()
-            else:
-                notes = get_today_notes(config.notes_directory)
-        except FileNotFoundError:
-            if config.notes_source == "antinote":
-                self._finish_loading_with_message("Banco do Antinote não encontrado.")
-            else:
-                self._finish_loading_with_message("Pasta não encontrada.")
-            return
-        except PermissionError:
-            if config.notes_source == "antinote":
-                self._finish_loading_with_message("Sem permissão para ler o banco do Antinote.")
-            else:
-                self._finish_loading_with_message("Sem permissão para ler a pasta selecionada.")
-            return
+            note_stream, candidates = await self._open_note_stream(config, date.fromisoformat(str(params["date"])))
         except Exception as error:
-            self._finish_loading_with_message(f"Erro ao ler notas: {error}")
-            return
+            return self._read_error_message(config, error)
 
-        if not notes:
-            self._finish_loading_with_message("Nenhuma nota encontrada para hoje.")
-            return
+        # Saved notes are checkpointed under the job, so a job resumed after a restart
+        # skips what it already stored instead of adding it to the history twice.
+        run_id = await history_service.start_backfill_run(f"tarefa:{context.job.id}")
+        checkpoint = await history_service.get_backfill_checkpoint(run_id)
+        completed = 0
+        analyzed_notes: list[NoteFile] = []
+        failed_notes: list[NoteFile] = []
+        context.progress(completed, len(candidates) if candidates is not None else None)
+
+        async def pending_notes() -> AsyncIterator[NoteFile]:
+            nonlocal completed
+            async with aclosing(note_stream):
+                async for note in note_stream:
+                    if (note.file_path, note.revision) in checkpoint:
+                        analyzed_notes.append(note)
+                        completed += 1
+                        context.progress(completed)
+                        continue
+                    yield note
 
+        read_error: Exception | None = None
         ai_service = AIService(config.api_key)
         try:
-            def on_progress(current: int, total: int) -> None:
-                self.progress_text.value = f"Analisando nota {current} de {total}..."
-                self.page.update()
-
-            results = await ai_service.analyze_batch(
-                notes=notes,
+            async for note, result in ai_service.iter_stream(
+                notes=pending_notes(),
                 base_prompt=config.base_prompt,
                 categories=config.categories,
-                on_progress=on_progress,
-            )
+                pack_short_notes=True,
+            ):
+                if result.error:
+                    failed_notes.append(note)
+                else:
+                    await history_service.save_backfill_result(
+                        run_id,
+                        result,
+                        config.notes_source,
+                        note,
+                        keep_note_date=False,
+                    )
+                    analyzed_notes.append(note)
+                completed += 1
+                context.emit(result)
+                context.progress(completed)
+        except (OSError, RuntimeError) as error:
+            read_error = error
         finally:
-            await ai_service.close()
+            if candidates is not None:
+                # Candidates left unprocessed by a cancel, shutdown or read error count
+                # as failed, so the sync watermark stays below them for the next run.
+                processed = {id(note) for note in analyzed_notes}
+                processed.update(id(note) for note in failed_notes)
+                failed_notes.extend(note for note in candidates if id(note) not in processed)
+            self._mark_notes_processed(config, analyzed_notes, failed_notes)
+            if not context.stopping:
+                await history_service.discard_backfill_run(run_id)
 
-        self._latest_results = results
-        await history_service.save_results_batch(results, config.notes_source, notes=notes)
-        self._render_results_cards()
+        if read_error is not None:
+            return self._read_error_message(config, read_error)
+        if completed == 0:
+            if config.incremental_sync:
+                return "Nenhuma nota nova ou alterada desde a última análise."
+            return "Nenhuma nota encontrada para hoje."
+        return None
+
+    def _handle_analysis_event(self, job: Job, item: Any) -> None:
+        if isinstance(item, AnalysisResult):
+            self._latest_results.append(item)
+            self.results_column.controls.append(self._result_card(item))
+            self.results_container.visible = True
+            return
+        if job.finished:
+            self._finish_analysis_view(job)
+        elif job.status == JOB_PENDING:
+            if self._active_job_id is None:
+                self._active_job_id = job.id
+                self._show_progress("Análise na fila...")
+        elif self._progress is None or job.id != self._active_job_id:
+            self._start_analysis_view(job)
+        else:
+            self._progress.update(job.completed, job.total)
+
+    def _show_progress(self, message: str) -> None:
+        self.results_column.controls = []
+        self.results_container.visible = False
+        self.empty_state_card.visible = False
+        self.progress_ring.visible = True
+        self.progress_text.value = message
+        self.progress_text.visible = True
+        self.cancel_button.visible = True
+        self.cancel_button.disabled = False
+        self.page.update()
+
+    def _start_analysis_view(self, job: Job) -> None:
+        self._active_job_id = job.id
+        self._latest_results = []
+        self._show_progress("Lendo notas...")
+        self._progress = ProgressReporter(
+            self.page,
+            self.progress_text,
+            "Analisando notas",
+            extra_controls=(self.results_container,),
+        )
+        self._progress.start(job.total)
+
+    def _finish_analysis_view(self, job: Job) -> None:
+        if job.id != self._active_job_id:
+            return
+        if self._progress is not None:
+            self._progress.finish()
+            self._progress = None
+        self._active_job_id = None
+        self.cancel_button.visible = False
+
+        if job.status == JOB_FAILED:
+            message = f"Falha na análise: {job.error}"
+        elif job.status == JOB_CANCELLED:
+            message = "Análise cancelada."
+        else:
+            message = job.result or ""
+
+        if not self.results_column.controls:
+            self._finish_loading_with_message(message or "Nenhuma nota encontrada para hoje.")
+            return
 
         self.progress_ring.visible = False
         self.progress_text.visible = False
         self.results_container.visible = True
         self.empty_state_card.visible = False
         self.page.update()
+        if message:
+            self._show_snackbar(message)
+
+    async def _cancel_analysis(self, _: ft.ControlEvent) -> None:
+        if self._active_job_id is None:
+            return
+        self.cancel_button.disabled = True
+        self.page.update(self.cancel_button)
+        await job_service.cancel(self._active_job_id)
+
+    async def _open_note_stream(
+        self,
+        config: AppConfig,
+        day: date,
+    ) -> tuple[AsyncIterator[NoteFile], list[NoteFile] | None]:
+        max_chars = config.max_note_chars
+        strategy = config.oversize_strategy
+        if config.incremental_sync:
+            # The incremental readers diff against their stored state in one pass, so
+            # they still return a list; only the notes that changed are in it.
+            if config.notes_source == "antinote":
+                notes = await asyncio.to_thread(get_antinote_notes_since_last_sync, max_chars, strategy)
+            else:
+                notes = await asyncio.to_thread(get_changed_notes, config.notes_directory, max_chars, strategy)
+            return _iter_notes(notes), notes
+
+        if config.notes_source == "antinote":
+            return iter_antinote_notes_in_range(day, day, max_chars, strategy), None
+        return iter_notes_in_range(config.notes_directory, day, day, max_chars, strategy), None
+
+    @staticmethod
+    def _read_error_message(config: AppConfig, error: Exception) -> str:
+        is_antinote = config.notes_source == "antinote"
+        if isinstance(error, FileNotFoundError):
+            return "Banco do Antinote não encontrado." if is_antinote else "Pasta não encontrada."
+        if isinstance(error, PermissionError):
+            if is_antinote:
+                return "Sem permissão para ler o banco do Antinote."
+            return "Sem permissão para ler a pasta selecionada."
+        return f"Erro ao ler notas: {error}"
+
+    def _mark_notes_processed(
+        self,
+        config: AppConfig,
+        analyzed_notes: list[NoteFile],
+        failed_notes: list[NoteFile],
+    ) -> None:
+        if config.notes_source == "local":
+            mark_notes_analyzed(analyzed_notes, failed_notes)
+        elif config.incremental_sync:
+            mark_antinote_notes_synced(analyzed_notes, failed_notes)
 
     def on_host_resized(self) -> None:
         if not self.results_container.visible or not self._latest_results:
@@ -237,3 +410,8 @@ class DashboardView:
         self.page.overlay.append(snackbar)
         snackbar.open = True
         self.page.update()
+
+
+async def _iter_notes(notes: list[NoteFile]) -> AsyncIterator[NoteFile]:
+    for note in notes:
+        yield note
@@ -3,13 +3,16 @@ from __future__ import annotations
 import calendar
 from collections import defaultdict
 from datetime import date, datetime
+from typing import Any
 
 import flet as ft
 
-from src.models.schemas import NoteFile
+from src.models.schemas import JOB_CANCELLED, JOB_FAILED, JOB_PENDING, Job, NoteFile
 from src.services.ai_service import AIService
-from src.services import history_service
+from src.services import history_service, job_service
+from src.services.reprocess_service import reprocess_entries
 from src.utils.config_manager import ConfigManager
+from src.utils.progress_reporter import ProgressReporter
 from src.views import theme
 
 
@@ -28,6 +31,13 @@ _PT_MONTHS = [
     "dezembro",
 ]
 
+_SEARCH_PAGE_SIZE = 20
+_TIMELINE_PAGE_SIZE = 100
+_SCROLL_LOAD_THRESHOLD = 400
+_RENDER_DAYS_STEP = 10
+_REPROCESS_JOB = "reprocessamento"
+_DAY_SUMMARY_JOB = "resumo_dia"
+
 
 class HistoryView:
     def __init__(self, page: ft.Page, config_manager: ConfigManager) -> None:
@@ -38,9 +48,25 @@ class HistoryView:
         self._current_month = today.month
         self._is_compact_mode = False
         self._counts_by_day: dict[int, int] = {}
+        self._counts_by_date: dict[str, int] = {}
+        self._is_year_view = False
         self._entries: list[dict[str, str]] = []
+        self._entries_cursor: tuple[str, str, int] | None = None
+        self._loaded_month: tuple[int, int] | None = None
+        self._is_loading_entries = False
         self._selected_entry_ids: set[str] = set()
         self._expanded_dates: set[str] = set()
+        self._entries_by_date: dict[str, list[dict[str, str]]] = {}
+        self._day_rows: dict[str, ft.Control] = {}
+        self._day_titles: dict[str, ft.Text] = {}
+        self._day_expansions: dict[str, ft.ExpansionTile] = {}
+        self._day_lines: dict[str, tuple[ft.Container, ft.Container]] = {}
+        self._entry_checkboxes: dict[str, ft.Checkbox] = {}
+        self._search_query = ""
+        self._search_results: list[dict[str, str]] = []
+        self._search_has_more = False
+        self._reprocess_job_id: int | None = None
+        self._reprocess_progress: ProgressReporter | None = None
 
         self.title_text = theme.ios_title("Histórico")
         self.subtitle_text = theme.ios_subtitle(
@@ -48,8 +74,77 @@ class HistoryView:
         )
 
         self.month_label = ft.Text(weight=ft.FontWeight.W_600, color=theme.TEXT_PRIMARY)
+        self.search_field = ft.TextField(
+            hint_text="Buscar no histórico (título, categoria, justificativa ou conteúdo)",
+            prefix_icon=ft.Icons.SEARCH,
+            border=ft.InputBorder.NONE,
+            color=theme.TEXT_PRIMARY,
+            hint_style=ft.TextStyle(color=theme.TEXT_SECONDARY),
+            cursor_color=theme.ACCENT,
+            text_size=14,
+            dense=True,
+            on_submit=self._handle_search_submit,
+        )
+        self.progress_text = ft.Text(size=12, color=theme.TEXT_SECONDARY, visible=False)
+        self.cancel_reprocess_button = ft.TextButton(
+            "Cancelar",
+            icon=ft.Icons.CLOSE,
+            style=theme.ios_secondary_button_style(),
+            visible=False,
+            on_click=self._cancel_reprocess,
+        )
+        self.progress_row = ft.Row(
+            spacing=8,
+            vertical_alignment=ft.CrossAxisAlignment.CENTER,
+            visible=False,
+            controls=[self.progress_text, self.cancel_reprocess_button],
+        )
+        self.summary_progress_text = ft.Text(size=12, color=theme.TEXT_SECONDARY, visible=False)
+        self.search_results_card = theme.ios_card(ft.Container())
+        self.search_results_card.visible = False
         self.map_card = theme.ios_card(ft.Container())
-        self.timeline_card = theme.ios_card(ft.Container())
+        self.delete_selected_button = ft.TextButton(
+            "Excluir selecionadas (0)",
+            icon=ft.Icons.DELETE_OUTLINE,
+            style=theme.ios_secondary_button_style(),
+            disabled=True,
+            on_click=self._confirm_delete_selected_entries,
+        )
+        self.select_all_button = ft.TextButton(
+            "Selecionar todas",
+            icon=ft.Icons.SELECT_ALL,
+            style=theme.ios_secondary_button_style(),
+            disabled=True,
+            on_click=self._select_all_entries,
+        )
+        self.clear_selection_button = ft.TextButton(
+            "Limpar seleção",
+            icon=ft.Icons.DESELECT,
+            style=theme.ios_secondary_button_style(),
+            disabled=True,
+            on_click=self._clear_selection,
+        )
+        self.timeline_header = self._timeline_header()
+        self.timeline_empty_text = ft.Text(
+            "Nenhuma nota processada neste mês.",
+            size=13,
+            color=theme.TEXT_SECONDARY,
+            visible=False,
+        )
+        self.load_more_days_row = ft.Row(
+            alignment=ft.MainAxisAlignment.CENTER,
+            visible=False,
+            controls=[
+                ft.TextButton(
+                    "Carregar mais dias",
+                    icon=ft.Icons.EXPAND_MORE,
+                    style=theme.ios_secondary_button_style(),
+                    on_click=lambda _: self.page.run_task(self._show_more_days),
+                )
+            ],
+        )
+        self.timeline_column = ft.Column(spacing=6)
+        self.timeline_card = theme.ios_card(self.timeline_column)
 
         self.control = ft.Container(
             expand=True,
@@ -58,14 +153,23 @@ class HistoryView:
             content=ft.Column(
                 expand=True,
                 scroll=ft.ScrollMode.AUTO,
+                scroll_interval=200,
+                on_scroll=self._handle_scroll,
                 spacing=16,
                 controls=[
                     ft.Column(spacing=4, controls=[self.title_text, self.subtitle_text]),
+                    theme.ios_input_container(self.search_field),
+                    self.progress_row,
+                    self.summary_progress_text,
+                    self.search_results_card,
                     self.map_card,
                     self.timeline_card,
                 ],
             ),
         )
+        job_service.register_handler(_REPROCESS_JOB, self._run_reprocess_job)
+        job_service.register_handler(_DAY_SUMMARY_JOB, self._run_day_summary_job)
+        job_service.subscribe(self._handle_reprocess_event, kind=_REPROCESS_JOB)
 
     async def load(self) -> None:
         await history_service.init_db()
@@ -73,32 +177,88 @@ class HistoryView:
             self._current_year,
             self._current_month,
         )
-        self._entries = await history_service.get_month_entries(
+        if self._is_year_view:
+            self._counts_by_date = await history_service.get_year_counts(self._current_year)
+        current_month = (self._current_year, self._current_month)
+        page_size = _TIMELINE_PAGE_SIZE
+        rendered_days = _RENDER_DAYS_STEP
+        if self._loaded_month == current_month:
+            page_size = max(page_size, len(self._entries))
+            rendered_days = max(rendered_days, len(self._day_rows))
+        self._entries, self._entries_cursor = await history_service.get_month_entries_page(
             self._current_year,
             self._current_month,
+            limit=page_size,
         )
+        self._loaded_month = current_month
         valid_entry_ids = {item["id"] for item in self._entries}
         self._selected_entry_ids = {
             entry_id for entry_id in self._selected_entry_ids if entry_id in valid_entry_ids
         }
-        self._build_content()
+        self._update_month_label()
+        self.map_card.content = self._build_heatmap()
+        self._reset_timeline(rendered_days)
+
+    async def _show_more_days(self) -> None:
+        if self._is_loading_entries:
+            return
+
+        self._is_loading_entries = True
+        try:
+            if not self._has_hidden_days() and self._entries_cursor is not None:
+                entries, self._entries_cursor = await history_service.get_month_entries_page(
+                    self._current_year,
+                    self._current_month,
+                    cursor=self._entries_cursor,
+                    limit=_TIMELINE_PAGE_SIZE,
+                )
+                self._entries.extend(entries)
+                for item in entries:
+                    self._entries_by_date.setdefault(item["data"], []).append(item)
+        finally:
+            self._is_loading_entries = False
+        self._render_more_days(_RENDER_DAYS_STEP)
+        self._refresh_selection_controls()
+        self.page.update(self.timeline_column)
+
+    def _handle_scroll(self, event: ft.OnScrollEvent) -> None:
+        if self._is_loading_entries or not self.load_more_days_row.visible:
+            return
+        if event.max_scroll_extent - event.pixels <= _SCROLL_LOAD_THRESHOLD:
+            self.page.run_task(self._show_more_days)
 
     def set_compact_mode(self, is_compact: bool) -> None:
         self._is_compact_mode = is_compact
         self.control.padding = 14 if is_compact else 24
         self.title_text.size = 20 if is_compact else 30
         self.subtitle_text.size = 12 if is_compact else 14
+        for title_text in self._day_titles.values():
+            title_text.size = 13 if is_compact else 14
+
+    def _update_month_label(self) -> None:
+        if self._is_year_view:
+            self.month_label.value = str(self._current_year)
+            return
+        self.month_label.value = f"{_PT_MONTHS[self._current_month - 1].capitalize()} de {self._current_year}"
 
-    def _build_content(self) -> None:
+    async def _toggle_year_view(self, _: ft.ControlEvent) -> None:
+        self._is_year_view = not self._is_year_view
+        if self._is_year_view:
+            self._counts_by_date = await history_service.get_year_counts(self._current_year)
         self._update_month_label()
         self.map_card.content = self._build_heatmap()
-        self.timeline_card.content = self._build_timeline()
+        self.page.update(self.map_card)
 
-    def _update_month_label(self) -> None:
-        self.month_label.value = f"{_PT_MONTHS[self._current_month - 1].capitalize()} de {self._current_year}"
+    async def _open_month_from_year(self, month: int) -> None:
+        self._current_month = month
+        self._is_year_view = False
+        await self.load()
+        self.page.update()
 
     async def _go_prev_month(self, _: ft.ControlEvent) -> None:
-        if self._current_month == 1:
+        if self._is_year_view:
+            self._current_year -= 1
+        elif self._current_month == 1:
             self._current_month = 12
             self._current_year -= 1
         else:
@@ -107,7 +267,9 @@ class HistoryView:
         self.page.update()
 
     async def _go_next_month(self, _: ft.ControlEvent) -> None:
-        if self._current_month == 12:
+        if self._is_year_view:
+            self._current_year += 1
+        elif self._current_month == 12:
             self._current_month = 1
             self._current_year += 1
         else:
@@ -116,47 +278,12 @@ class HistoryView:
         self.page.update()
 
     def _build_heatmap(self) -> ft.Control:
-        first_weekday, total_days = calendar.monthrange(self._current_year, self._current_month)
-        offset = (first_weekday + 1) % 7
-
-        cells: list[ft.Control] = []
-        for _ in range(offset):
-            cells.append(
-                ft.Container(
-                    width=16,
-                    height=16,
-                    border_radius=3,
-                    bgcolor=ft.Colors.TRANSPARENT,
-                )
-            )
-
-        for day in range(1, total_days + 1):
-            count = self._counts_by_day.get(day, 0)
-            cells.append(
-                ft.Container(
-                    width=16,
-                    height=16,
-                    border_radius=3,
-                    bgcolor=theme.heatmap_color(count),
-                    tooltip=f"Dia {day}: {count} nota(s)",
-                )
-            )
-
-        while len(cells) % 7 != 0:
-            cells.append(
-                ft.Container(
-                    width=16,
-                    height=16,
-                    border_radius=3,
-                    bgcolor=ft.Colors.TRANSPARENT,
-                )
-            )
-
-        rows: list[ft.Control] = []
-        for index in range(0, len(cells), 7):
-            rows.append(ft.Row(spacing=4, controls=cells[index:index + 7]))
-
-        total_notes_month = sum(self._counts_by_day.values())
+        if self._is_year_view:
+            grid = self._build_year_grid()
+            total_text = f"{sum(self._counts_by_date.values())} nota(s) processada(s) no ano."
+        else:
+            grid = self._build_month_grid()
+            total_text = f"{sum(self._counts_by_day.values())} nota(s) processada(s) no mês."
 
         return ft.Column(
             spacing=12,
@@ -170,6 +297,12 @@ class HistoryView:
                             spacing=4,
                             vertical_alignment=ft.CrossAxisAlignment.CENTER,
                             controls=[
+                                ft.TextButton(
+                                    "Ver mês" if self._is_year_view else "Ver ano",
+                                    icon=ft.Icons.CALENDAR_VIEW_MONTH,
+                                    style=theme.ios_secondary_button_style(),
+                                    on_click=self._toggle_year_view,
+                                ),
                                 ft.IconButton(
                                     icon=ft.Icons.CHEVRON_LEFT,
                                     icon_size=18,
@@ -185,7 +318,7 @@ class HistoryView:
                         ),
                     ],
                 ),
-                ft.Column(spacing=4, controls=rows),
+                grid,
                 ft.Row(
                     alignment=ft.MainAxisAlignment.END,
                     spacing=8,
@@ -200,111 +333,213 @@ class HistoryView:
                     ],
                 ),
                 ft.Text(
-                    f"{total_notes_month} nota(s) processada(s) no mês.",
+                    total_text,
                     size=12,
                     color=theme.TEXT_SECONDARY,
                 ),
             ],
         )
 
-    def _build_timeline(self) -> ft.Control:
-        if not self._entries:
-            return ft.Column(
-                spacing=10,
-                controls=[
-                    self._timeline_header(),
-                    ft.Text(
-                        "Nenhuma nota processada neste mês.",
-                        size=13,
-                        color=theme.TEXT_SECONDARY,
-                    ),
-                ],
+    def _build_month_grid(self) -> ft.Control:
+        first_weekday, total_days = calendar.monthrange(self._current_year, self._current_month)
+        offset = (first_weekday + 1) % 7
+
+        cells: list[ft.Control] = []
+        for _ in range(offset):
+            cells.append(
+                ft.Container(
+                    width=16,
+                    height=16,
+                    border_radius=3,
+                    bgcolor=ft.Colors.TRANSPARENT,
+                )
             )
 
-        grouped: dict[str, list[dict[str, str]]] = defaultdict(list)
-        for item in self._entries:
-            grouped[item["data"]].append(item)
+        for day in range(1, total_days + 1):
+            count = self._counts_by_day.get(day, 0)
+            cells.append(
+                ft.Container(
+                    width=16,
+                    height=16,
+                    border_radius=3,
+                    bgcolor=theme.heatmap_color(count),
+                    tooltip=f"Dia {day}: {count} nota(s)",
+                )
+            )
+
+        while len(cells) % 7 != 0:
+            cells.append(
+                ft.Container(
+                    width=16,
+                    height=16,
+                    border_radius=3,
+                    bgcolor=ft.Colors.TRANSPARENT,
+                )
+            )
 
-        sorted_dates = sorted(grouped.keys(), reverse=True)
+        rows: list[ft.Control] = []
+        for index in range(0, len(cells), 7):
+            rows.append(ft.Row(spacing=4, controls=cells[index:index + 7]))
 
-        rows: list[ft.Control] = [self._timeline_header()]
-        for index, data_str in enumerate(sorted_dates):
-            daily_items = grouped[data_str]
-            summary_text = self._build_summary(daily_items)
-            formatted_date = self._format_date_label(data_str)
+        return ft.Column(spacing=4, controls=rows)
 
-            top_line_color = theme.BG_CARD if index == 0 else theme.TIMELINE_LINE
-            bottom_line_color = theme.BG_CARD if index == len(sorted_dates) - 1 else theme.TIMELINE_LINE
+    def _build_year_grid(self) -> ft.Control:
+        first_day = date(self._current_year, 1, 1)
+        offset = (first_day.weekday() + 1) % 7
+        total_days = 366 if calendar.isleap(self._current_year) else 365
 
-            left_column = ft.Column(
-                spacing=0,
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                controls=[
-                    ft.Container(width=2, height=12, bgcolor=top_line_color),
-                    ft.Container(width=12, height=12, border_radius=6, bgcolor=theme.TIMELINE_DOT),
-                    ft.Container(width=2, height=72, bgcolor=bottom_line_color),
-                ],
+        cells: list[ft.Control] = [
+            ft.Container(width=11, height=11, border_radius=2, bgcolor=ft.Colors.TRANSPARENT)
+            for _ in range(offset)
+        ]
+        for day_index in range(total_days):
+            day = date.fromordinal(first_day.toordinal() + day_index)
+            count = self._counts_by_date.get(day.isoformat(), 0)
+            cells.append(
+                ft.Container(
+                    width=11,
+                    height=11,
+                    border_radius=2,
+                    bgcolor=theme.heatmap_color(count),
+                    tooltip=f"{self._format_date_label(day.isoformat())}: {count} nota(s)",
+                    on_click=lambda _, month=day.month: self.page.run_task(self._open_month_from_year, month),
+                )
             )
 
-            details_controls = [
-                self._timeline_item_tile(item)
-                for item in daily_items
-            ]
+        weeks = [
+            ft.Column(spacing=3, controls=cells[index:index + 7])
+            for index in range(0, len(cells), 7)
+        ]
+        return ft.Row(spacing=3, scroll=ft.ScrollMode.AUTO, controls=weeks)
 
-            summary_button = ft.IconButton(
-                icon=ft.Icons.AUTO_AWESOME,
-                icon_size=18,
-                tooltip="Resumo do dia",
-                on_click=lambda event, date_value=data_str, day_items=list(daily_items): self.page.run_task(
-                    self._handle_day_summary,
-                    event,
-                    date_value,
-                    day_items,
-                ),
-            )
+    def _reset_timeline(self, rendered_days: int) -> None:
+        self._entries_by_date = {}
+        for item in self._entries:
+            self._entries_by_date.setdefault(item["data"], []).append(item)
+        self._day_rows.clear()
+        self._day_titles.clear()
+        self._day_expansions.clear()
+        self._day_lines.clear()
+        self._entry_checkboxes.clear()
+
+        self.timeline_empty_text.visible = not self._entries
+        self.timeline_column.controls = [
+            self.timeline_header,
+            self.timeline_empty_text,
+            self.load_more_days_row,
+        ]
+        self._render_more_days(rendered_days)
+        self._refresh_selection_controls()
+
+    def _has_hidden_days(self) -> bool:
+        return len(self._day_rows) < len(self._entries_by_date)
+
+    def _render_more_days(self, count: int) -> None:
+        # Only the next few day groups get controls; the rest are built as the
+        # user scrolls, and each day's tiles only once it is expanded.
+        pending_dates = [
+            date_str for date_str in self._entries_by_date if date_str not in self._day_rows
+        ][:count]
+        footer_index = len(self.timeline_column.controls) - 1
+        self.timeline_column.controls[footer_index:footer_index] = [
+            self._day_row(date_str) for date_str in pending_dates
+        ]
+        self._refresh_timeline_edges()
+
+    def _refresh_timeline_edges(self) -> None:
+        rendered_dates = list(self._day_rows)
+        is_complete = not self._has_hidden_days() and self._entries_cursor is None
+        for index, date_str in enumerate(rendered_dates):
+            top_line, bottom_line = self._day_lines[date_str]
+            top_line.bgcolor = theme.BG_CARD if index == 0 else theme.TIMELINE_LINE
+            is_last_day = is_complete and index == len(rendered_dates) - 1
+            bottom_line.bgcolor = theme.BG_CARD if is_last_day else theme.TIMELINE_LINE
+        self.load_more_days_row.visible = not is_complete
+
+    def _day_title(self, date_str: str) -> str:
+        summary_text = self._build_summary(self._entries_by_date[date_str])
+        return f"{self._format_date_label(date_str)}: {summary_text}"
+
+    def _day_row(self, date_str: str) -> ft.Control:
+        top_line = ft.Container(width=2, height=12)
+        bottom_line = ft.Container(width=2, height=72)
+        left_column = ft.Column(
+            spacing=0,
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            controls=[
+                top_line,
+                ft.Container(width=12, height=12, border_radius=6, bgcolor=theme.TIMELINE_DOT),
+                bottom_line,
+            ],
+        )
 
-            tile_title = ft.Row(
+        title_text = ft.Text(
+            self._day_title(date_str),
+            size=13 if self._is_compact_mode else 14,
+            color=theme.TEXT_PRIMARY,
+            weight=ft.FontWeight.W_500,
+        )
+        summary_button = ft.IconButton(
+            icon=ft.Icons.AUTO_AWESOME,
+            icon_size=18,
+            tooltip="Resumo do dia",
+            on_click=lambda event: self.page.run_task(
+                self._handle_day_summary,
+                event,
+                date_str,
+            ),
+        )
+
+        reprocess_button = ft.IconButton(
+            icon=ft.Icons.REFRESH,
+            icon_size=18,
+            tooltip="Reprocessar dia com IA",
+            on_click=lambda _: self.page.run_task(
+                self._request_reprocess,
+                f"dia {self._format_date_label(date_str)}",
+                None,
+                date_str,
+            ),
+        )
+
+        is_expanded = date_str in self._expanded_dates
+        expansion = ft.ExpansionTile(
+            title=ft.Row(
                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                 controls=[
-                    ft.Text(
-                        f"{formatted_date}: {summary_text}",
-                        size=13 if self._is_compact_mode else 14,
-                        color=theme.TEXT_PRIMARY,
-                        weight=ft.FontWeight.W_500,
-                    ),
-                    summary_button,
+                    title_text,
+                    ft.Row(spacing=0, tight=True, controls=[reprocess_button, summary_button]),
                 ],
-            )
-
-            expansion = ft.ExpansionTile(
-                title=tile_title,
-                controls=details_controls,
-                text_color=theme.TEXT_PRIMARY,
-                icon_color=theme.TEXT_SECONDARY,
-                collapsed_text_color=theme.TEXT_PRIMARY,
-                collapsed_icon_color=theme.TEXT_SECONDARY,
-                tile_padding=ft.Padding.symmetric(horizontal=8, vertical=4),
-                expanded=data_str in self._expanded_dates,
-                on_change=lambda event, date_value=data_str: self._handle_day_expansion_change(event, date_value),
-                maintain_state=True,
-            )
+            ),
+            controls=self._day_item_tiles(date_str) if is_expanded else [],
+            text_color=theme.TEXT_PRIMARY,
+            icon_color=theme.TEXT_SECONDARY,
+            collapsed_text_color=theme.TEXT_PRIMARY,
+            collapsed_icon_color=theme.TEXT_SECONDARY,
+            tile_padding=ft.Padding.symmetric(horizontal=8, vertical=4),
+            expanded=is_expanded,
+            on_change=lambda event: self._handle_day_expansion_change(event, date_str),
+            maintain_state=True,
+        )
 
-            rows.append(
-                ft.Row(
-                    spacing=8,
-                    vertical_alignment=ft.CrossAxisAlignment.START,
-                    controls=[
-                        ft.Container(width=24, content=left_column),
-                        ft.Container(expand=True, content=expansion),
-                    ],
-                )
-            )
+        row = ft.Row(
+            spacing=8,
+            vertical_alignment=ft.CrossAxisAlignment.START,
+            controls=[
+                ft.Container(width=24, content=left_column),
+                ft.Container(expand=True, content=expansion),
+            ],
+        )
+        self._day_rows[date_str] = row
+        self._day_titles[date_str] = title_text
+        self._day_expansions[date_str] = expansion
+        self._day_lines[date_str] = (top_line, bottom_line)
+        return row
 
-        return ft.Column(spacing=6, controls=rows)
+    def _day_item_tiles(self, date_str: str) -> list[ft.Control]:
+        return [self._timeline_item_tile(item) for item in self._entries_by_date[date_str]]
 
     def _timeline_header(self) -> ft.Control:
-        selected_count = len(self._selected_entry_ids)
-        total_count = len(self._entries)
         return ft.Row(
             alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
             vertical_alignment=ft.CrossAxisAlignment.CENTER,
@@ -313,26 +548,39 @@ class HistoryView:
                 ft.Row(
                     spacing=8,
                     controls=[
-                        ft.TextButton(
-                            f"Excluir selecionadas ({selected_count})",
-                            icon=ft.Icons.DELETE_OUTLINE,
-                            style=theme.ios_secondary_button_style(),
-                            disabled=selected_count == 0,
-                            on_click=self._confirm_delete_selected_entries,
-                        ),
-                        ft.TextButton(
-                            "Selecionar todas",
-                            icon=ft.Icons.SELECT_ALL,
-                            style=theme.ios_secondary_button_style(),
-                            disabled=total_count == 0 or selected_count == total_count,
-                            on_click=self._select_all_entries,
-                        ),
-                        ft.TextButton(
-                            "Limpar seleção",
-                            icon=ft.Icons.DESELECT,
-                            style=theme.ios_secondary_button_style(),
-                            disabled=selected_count == 0,
-                            on_click=self._clear_selection,
+                        self.delete_selected_button,
+                        self.select_all_button,
+                        self.clear_selection_button,
+                        ft.PopupMenuButton(
+                            icon=ft.Icons.AUTO_AWESOME_MOTION,
+                            tooltip="Reprocessar com IA",
+                            items=[
+                                ft.PopupMenuItem(
+                                    content="Reprocessar selecionadas",
+                                    on_click=lambda _: self.page.run_task(
+                                        self._request_reprocess,
+                                        "selecionadas",
+                                        [int(entry_id) for entry_id in self._selected_entry_ids],
+                                    ),
+                                ),
+                                ft.PopupMenuItem(
+                                    content="Reprocessar mês atual",
+                                    on_click=lambda _: self.page.run_task(
+                                        self._request_reprocess,
+                                        f"{_PT_MONTHS[self._current_month - 1]} de {self._current_year}",
+                                        None,
+                                        None,
+                                        (self._current_year, self._current_month),
+                                    ),
+                                ),
+                                ft.PopupMenuItem(
+                                    content="Reprocessar todo o histórico",
+                                    on_click=lambda _: self.page.run_task(
+                                        self._request_reprocess,
+                                        "todo o histórico",
+                                    ),
+                                ),
+                            ],
                         ),
                         ft.TextButton(
                             "Limpar histórico",
@@ -345,6 +593,14 @@ class HistoryView:
             ],
         )
 
+    def _refresh_selection_controls(self) -> None:
+        selected_count = len(self._selected_entry_ids)
+        total_count = len(self._entries)
+        self.delete_selected_button.content = f"Excluir selecionadas ({selected_count})"
+        self.delete_selected_button.disabled = selected_count == 0
+        self.select_all_button.disabled = total_count == 0 or selected_count == total_count
+        self.clear_selection_button.disabled = selected_count == 0
+
     def _timeline_item_tile(self, item: dict[str, str]) -> ft.Control:
         async def handle_delete(_: ft.ControlEvent) -> None:
             self._confirm_delete_entry(item)
@@ -369,15 +625,19 @@ class HistoryView:
                 self._selected_entry_ids.add(item_id)
             else:
                 self._selected_entry_ids.discard(item_id)
-            self._build_content()
-            self.page.update()
+            self._refresh_selection_controls()
+            self.page.update(self.timeline_header)
+
+        checkbox = ft.Checkbox(
+            value=item_id in self._selected_entry_ids,
+            on_change=handle_selection_change,
+        )
+        self._entry_checkboxes[item_id] = checkbox
 
         return ft.ListTile(
             dense=True,
-            leading=ft.Checkbox(
-                value=item_id in self._selected_entry_ids,
-                on_change=handle_selection_change,
-            ),
+            data=item_id,
+            leading=checkbox,
             title=ft.Text(item["titulo"], size=12, color=theme.TEXT_PRIMARY),
             subtitle=ft.Text(
                 f"{item['hora']} · {self._build_note_preview(item)}",
@@ -398,19 +658,57 @@ class HistoryView:
                     ),
                 ],
             ),
-            on_click=lambda _: self._open_note_dialog(item),
+            on_click=lambda _: self.page.run_task(self._open_entry, item_id),
         )
 
+    def _remove_timeline_entries(self, entry_ids: set[str]) -> None:
+        removed_items = [item for item in self._entries if item["id"] in entry_ids]
+        self._entries = [item for item in self._entries if item["id"] not in entry_ids]
+        self._selected_entry_ids -= entry_ids
+        for entry_id in entry_ids:
+            self._entry_checkboxes.pop(entry_id, None)
+
+        for item in removed_items:
+            date_str = item["data"]
+            day = int(date_str[8:10])
+            self._counts_by_day[day] = max(0, self._counts_by_day.get(day, 0) - 1)
+            if date_str in self._counts_by_date:
+                self._counts_by_date[date_str] = max(0, self._counts_by_date[date_str] - 1)
+
+        for date_str in {item["data"] for item in removed_items}:
+            remaining = [
+                item for item in self._entries_by_date.get(date_str, []) if item["id"] not in entry_ids
+            ]
+            if remaining:
+                self._entries_by_date[date_str] = remaining
+                if date_str in self._day_rows:
+                    self._day_titles[date_str].value = self._day_title(date_str)
+                    expansion = self._day_expansions[date_str]
+                    expansion.controls = [tile for tile in expansion.controls if tile.data not in entry_ids]
+                continue
+
+            self._entries_by_date.pop(date_str, None)
+            row = self._day_rows.pop(date_str, None)
+            if row is not None:
+                self.timeline_column.controls.remove(row)
+                self._day_titles.pop(date_str)
+                self._day_expansions.pop(date_str)
+                self._day_lines.pop(date_str)
+
+        self.timeline_empty_text.visible = not self._entries
+        self._refresh_timeline_edges()
+        self._refresh_selection_controls()
+        self.map_card.content = self._build_heatmap()
+        self.page.update(self.map_card, self.timeline_column)
+
     def _confirm_delete_entry(self, item: dict[str, str]) -> None:
         async def handle_confirm(_: ft.ControlEvent) -> None:
-            deleted_item = dict(item)
-            await history_service.delete_entry(int(item["id"]))
+            deleted_items = await history_service.delete_entries([int(item["id"])])
             dialog.open = False
-            await self.load()
-            self.page.update()
+            self._remove_timeline_entries({item["id"]})
 
             def handle_undo_action(_: ft.ControlEvent) -> None:
-                self.page.run_task(self._undo_deleted_entry, deleted_item)
+                self.page.run_task(self._undo_deleted_entries, deleted_items)
 
             self._show_snackbar(
                 "Nota removida do histórico.",
@@ -443,14 +741,21 @@ class HistoryView:
             return
 
         async def handle_confirm(_: ft.ControlEvent) -> None:
-            for entry_id in selected_ids:
-                await history_service.delete_entry(int(entry_id))
+            deleted_items = await history_service.delete_entries(
+                [int(entry_id) for entry_id in selected_ids]
+            )
 
-            self._selected_entry_ids.clear()
             dialog.open = False
-            await self.load()
-            self.page.update()
-            self._show_snackbar(f"{len(selected_ids)} nota(s) removida(s) do histórico.")
+            self._remove_timeline_entries(set(selected_ids))
+
+            def handle_undo_action(_: ft.ControlEvent) -> None:
+                self.page.run_task(self._undo_deleted_entries, deleted_items)
+
+            self._show_snackbar(
+                f"{len(deleted_items)} nota(s) removida(s) do histórico.",
+                action_label="Desfazer",
+                on_action=handle_undo_action,
+            )
 
         dialog = ft.AlertDialog(
             modal=True,
@@ -472,22 +777,149 @@ class HistoryView:
         dialog.open = True
         self.page.update()
 
+    async def _handle_search_submit(self, _: ft.ControlEvent) -> None:
+        self._search_query = (self.search_field.value or "").strip()
+        self._search_results = []
+        self._search_has_more = False
+        if not self._search_query:
+            self.search_results_card.visible = False
+            self.page.update()
+            return
+        await self._load_search_page()
+
+    async def _load_more_search_results(self, _: ft.ControlEvent) -> None:
+        await self._load_search_page()
+
+    async def _load_search_page(self) -> None:
+        results, has_more = await history_service.search(
+            self._search_query,
+            limit=_SEARCH_PAGE_SIZE,
+            offset=len(self._search_results),
+        )
+        self._search_results.extend(results)
+        self._search_has_more = has_more
+        self.search_results_card.content = self._build_search_results()
+        self.search_results_card.visible = True
+        self.page.update()
+
+    def _clear_search(self, _: ft.ControlEvent) -> None:
+        self.search_field.value = ""
+        self._search_query = ""
+        self._search_results = []
+        self._search_has_more = False
+        self.search_results_card.visible = False
+        self.page.update()
+
+    def _build_search_results(self) -> ft.Control:
+        header = ft.Row(
+            alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            vertical_alignment=ft.CrossAxisAlignment.CENTER,
+            controls=[
+                theme.ios_section_title("RESULTADOS DA BUSCA"),
+                ft.TextButton(
+                    "Fechar busca",
+                    icon=ft.Icons.CLOSE,
+                    style=theme.ios_secondary_button_style(),
+                    on_click=self._clear_search,
+                ),
+            ],
+        )
+        if not self._search_results:
+            return ft.Column(
+                spacing=10,
+                controls=[
+                    header,
+                    ft.Text(
+                        f"Nenhuma nota encontrada para “{self._search_query}”.",
+                        size=13,
+                        color=theme.TEXT_SECONDARY,
+                    ),
+                ],
+            )
+
+        controls: list[ft.Control] = [header]
+        controls.extend(self._search_result_tile(item) for item in self._search_results)
+        if self._search_has_more:
+            controls.append(
+                ft.TextButton(
+                    "Carregar mais resultados",
+                    icon=ft.Icons.EXPAND_MORE,
+                    style=theme.ios_secondary_button_style(),
+                    on_click=self._load_more_search_results,
+                )
+            )
+        return ft.Column(spacing=4, controls=controls)
+
+    def _search_result_tile(self, item: dict[str, str]) -> ft.Control:
+        return ft.ListTile(
+            dense=True,
+            title=ft.Text(item["titulo"], size=12, color=theme.TEXT_PRIMARY, weight=ft.FontWeight.W_500),
+            subtitle=ft.Text(
+                spans=[
+                    ft.TextSpan(
+                        f"{self._format_date_label(item['data'])} · {item['hora']} · {item['categoria']} — ",
+                        style=ft.TextStyle(color=theme.TEXT_SECONDARY),
+                    ),
+                    *self._highlight_spans(item["trecho"]),
+                ],
+                size=11,
+                color=theme.TEXT_SECONDARY,
+            ),
+            on_click=lambda _, entry_id=item["id"]: self.page.run_task(self._open_entry, entry_id),
+        )
+
+    def _highlight_spans(self, text: str) -> list[ft.TextSpan]:
+        spans: list[ft.TextSpan] = []
+        for index, part in enumerate(text.split(history_service.HIGHLIGHT_START)):
+            highlighted, _, rest = part.partition(history_service.HIGHLIGHT_END) if index else ("", "", part)
+            if highlighted:
+                spans.append(
+                    ft.TextSpan(
+                        highlighted,
+                        style=ft.TextStyle(
+                            color=theme.TEXT_PRIMARY,
+                            weight=ft.FontWeight.W_700,
+                            bgcolor=theme.TAG_BG,
+                        ),
+                    )
+                )
+            if rest:
+                spans.append(ft.TextSpan(rest, style=ft.TextStyle(color=theme.TEXT_SECONDARY)))
+        return spans
+
+    async def _open_entry(self, entry_id: str) -> None:
+        entry = await history_service.get_entry(int(entry_id))
+        if entry is None:
+            self._show_snackbar("Esta nota não está mais no histórico.")
+            return
+        self._open_note_dialog(entry)
+
     def _select_all_entries(self, _: ft.ControlEvent) -> None:
         self._selected_entry_ids = {item["id"] for item in self._entries}
-        self._build_content()
-        self.page.update()
+        self._set_checkbox_values()
 
     def _clear_selection(self, _: ft.ControlEvent) -> None:
         self._selected_entry_ids.clear()
-        self._build_content()
-        self.page.update()
+        self._set_checkbox_values()
+
+    def _set_checkbox_values(self) -> None:
+        for entry_id, checkbox in self._entry_checkboxes.items():
+            checkbox.value = entry_id in self._selected_entry_ids
+        self._refresh_selection_controls()
+        self.page.update(self.timeline_header, *self._entry_checkboxes.values())
 
     def _handle_day_expansion_change(self, event: ft.ControlEvent, date_str: str) -> None:
         is_expanded = str(getattr(event, "data", "")).lower() == "true"
-        if is_expanded:
-            self._expanded_dates.add(date_str)
-        else:
+        if not is_expanded:
             self._expanded_dates.discard(date_str)
+            return
+
+        self._expanded_dates.add(date_str)
+        expansion = self._day_expansions.get(date_str)
+        if expansion is not None and not expansion.controls:
+            expansion.expanded = True
+            expansion.controls = self._day_item_tiles(date_str)
+            self.page.update(expansion)
 
     def _confirm_clear_history(self, _: ft.ControlEvent) -> None:
         async def handle_clear(_: ft.ControlEvent) -> None:
@@ -599,20 +1031,19 @@ class HistoryView:
         event.control.disabled = True
         self.page.update()
 
-        ai_service = AIService(config.api_key)
-        try:
-            result = await ai_service.analyze_note(
-                note=NoteFile(
-                    file_name=item["titulo"],
-                    file_path=f"historico://{item['id']}",
-                    modified_at=datetime.now(),
-                    content=note_content,
-                ),
-                base_prompt=config.base_prompt,
-                categories=config.categories,
-            )
-        finally:
-            await ai_service.close()
+        # An explicit reprocess always asks the model again instead of returning the
+        # cached analysis for the same content and config.
+        ai_service = AIService(config.api_key, use_cache=False)
+        result = await ai_service.analyze_note(
+            note=NoteFile(
+                file_name=item["titulo"],
+                file_path=f"historico://{item['id']}",
+                modified_at=datetime.now(),
+                content=note_content,
+            ),
+            base_prompt=config.base_prompt,
+            categories=config.categories,
+        )
 
         if result.error:
             event.control.disabled = False
@@ -632,17 +1063,157 @@ class HistoryView:
         self.page.update()
         self._show_snackbar("Nota reprocessada com sucesso.")
 
-    async def _undo_deleted_entry(self, deleted_item: dict[str, str]) -> None:
-        await history_service.restore_entry(deleted_item)
+    async def _request_reprocess(
+        self,
+        scope_label: str,
+        entry_ids: list[int] | None = None,
+        date_str: str | None = None,
+        year_month: tuple[int, int] | None = None,
+    ) -> None:
+        if self._reprocess_job_id is not None:
+            self._show_snackbar("Já existe um reprocessamento em andamento.")
+            return
+        if entry_ids is not None and not entry_ids:
+            self._show_snackbar("Selecione ao menos uma nota para reprocessar.")
+            return
+
+        config = await self.config_manager.load()
+        if not config.api_key:
+            self._show_snackbar("API Key não configurada. Vá em Configurações.")
+            return
+
+        total = await history_service.count_entries_to_reprocess(entry_ids, date_str, year_month)
+        if total == 0:
+            self._show_snackbar("Nenhuma nota com conteúdo salvo para reprocessar.")
+            return
+
+        async def handle_confirm(_: ft.ControlEvent) -> None:
+            dialog.open = False
+            self.page.update()
+            await job_service.submit(
+                _REPROCESS_JOB,
+                {
+                    "entry_ids": sorted(entry_ids) if entry_ids is not None else None,
+                    "date": date_str,
+                    "year_month": list(year_month) if year_month is not None else None,
+                },
+                priority=job_service.PRIORITY_LOW,
+            )
+
+        dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("Reprocessar com IA"),
+            content=ft.Text(
+                f"Reclassificar {total} nota(s) ({scope_label}) com o prompt e as categorias atuais?"
+            ),
+            actions=[
+                ft.TextButton("Cancelar", on_click=lambda _: self._close_dialog(dialog)),
+                ft.FilledButton(
+                    "Reprocessar",
+                    icon=ft.Icons.AUTO_AWESOME,
+                    style=theme.ios_primary_button_style(),
+                    on_click=handle_confirm,
+                ),
+            ],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+        self.page.overlay.append(dialog)
+        dialog.open = True
+        self.page.update()
+
+    async def _run_reprocess_job(self, context: job_service.JobContext) -> str:
+        params = context.params
+        config = await self.config_manager.load()
+        if not config.api_key:
+            raise RuntimeError("API Key não configurada.")
+
+        entry_ids = params.get("entry_ids")
+        year_month = params.get("year_month")
+        summary = await reprocess_entries(
+            api_key=config.api_key,
+            base_prompt=config.base_prompt,
+            categories=config.categories,
+            entry_ids=[int(entry_id) for entry_id in entry_ids] if entry_ids is not None else None,
+            date_str=params.get("date"),
+            year_month=(int(year_month[0]), int(year_month[1])) if year_month is not None else None,
+            max_content_chars=config.max_note_chars,
+            on_progress=context.progress,
+        )
+        message = f"{summary.updated} nota(s) reprocessada(s)."
+        if summary.failed:
+            message = f"{message} {summary.failed} com erro."
+        return message
+
+    def _handle_reprocess_event(self, job: Job, _: Any) -> None:
+        if job.finished:
+            self.page.run_task(self._finish_reprocess_view, job)
+            return
+
+        if job.id != self._reprocess_job_id:
+            self._reprocess_job_id = job.id
+            self._reprocess_progress = None
+            self.progress_text.value = "Reprocessamento na fila..."
+            self.progress_text.visible = True
+            self.progress_row.visible = True
+            self.cancel_reprocess_button.visible = True
+            self.cancel_reprocess_button.disabled = False
+            self.page.update(self.progress_row)
+        if job.status == JOB_PENDING:
+            return
+
+        if self._reprocess_progress is None:
+            self._reprocess_progress = ProgressReporter(
+                self.page,
+                self.progress_text,
+                "Reprocessando notas",
+                extra_controls=(self.progress_row,),
+            )
+            self._reprocess_progress.start(job.total)
+        self._reprocess_progress.update(job.completed, job.total)
+
+    async def _finish_reprocess_view(self, job: Job) -> None:
+        if job.id != self._reprocess_job_id:
+            return
+        if self._reprocess_progress is not None:
+            self._reprocess_progress.finish()
+            self._reprocess_progress = None
+        self._reprocess_job_id = None
+        self.cancel_reprocess_button.visible = False
+        self.progress_row.visible = False
+        self.progress_text.visible = False
+        self.page.update(self.progress_row)
+
+        if job.status == JOB_CANCELLED:
+            message = f"Reprocessamento cancelado após {job.completed} nota(s)."
+        elif job.status == JOB_FAILED:
+            message = f"Falha no reprocessamento: {job.error}"
+        else:
+            message = job.result or "Reprocessamento concluído."
+
         await self.load()
         self.page.update()
-        self._show_snackbar("Nota restaurada no histórico.")
+        self._show_snackbar(message)
+
+    async def _cancel_reprocess(self, _: ft.ControlEvent) -> None:
+        if self._reprocess_job_id is None:
+            return
+        self.cancel_reprocess_button.disabled = True
+        self.page.update(self.cancel_reprocess_button)
+        await job_service.cancel(self._reprocess_job_id)
+
+    async def _undo_deleted_entries(self, deleted_items: list[dict[str, str]]) -> None:
+        await history_service.restore_entries(deleted_items)
+        await self.load()
+        self.page.update()
+        if len(deleted_items) == 1:
+            self._show_snackbar("Nota restaurada no histórico.")
+        else:
+            self._show_snackbar(f"{len(deleted_items)} nota(s) restaurada(s) no histórico.")
 
     async def _handle_day_summary(
         self,
         event: ft.ControlEvent,
         date_str: str,
-        daily_items: list[dict[str, str]],
     ) -> None:
         event.control.disabled = True
         self.page.update()
@@ -650,7 +1221,6 @@ class HistoryView:
         try:
             summary_text = await self._get_or_generate_day_summary(
                 date_str=date_str,
-                daily_items=daily_items,
                 force_refresh=False,
             )
             if not summary_text:
@@ -658,7 +1228,6 @@ class HistoryView:
             self._open_summary_dialog(
                 date_str=date_str,
                 summary_text=summary_text,
-                daily_items=daily_items,
             )
         finally:
             event.control.disabled = False
@@ -667,14 +1236,9 @@ class HistoryView:
     async def _get_or_generate_day_summary(
         self,
         date_str: str,
-        daily_items: list[dict[str, str]],
         force_refresh: bool,
     ) -> str | None:
-        note_contents = [
-            str(item.get("conteudo", "") or "").strip()
-            for item in daily_items
-            if str(item.get("conteudo", "") or "").strip()
-        ]
+        note_contents = await history_service.get_day_contents(date_str)
         if not note_contents:
             self._show_snackbar("Nenhuma nota com conteúdo para resumir neste dia.")
             return None
@@ -689,15 +1253,50 @@ class HistoryView:
             self._show_snackbar("API Key não configurada. Vá em Configurações.")
             return None
 
-        combined_text = "\n\n---\n\n".join(note_contents)
-        ai_service = AIService(config.api_key)
+        job = await job_service.submit(
+            _DAY_SUMMARY_JOB,
+            {"date": date_str},
+            priority=job_service.PRIORITY_HIGH,
+            key=f"{_DAY_SUMMARY_JOB}|{date_str}",
+        )
+        progress = ProgressReporter(
+            self.page,
+            self.summary_progress_text,
+            "Resumindo o dia",
+            unit="parte(s)",
+            rate_unit="partes/s",
+        )
+        progress.start(job.total)
+
+        def handle_event(event_job: Job, _: Any) -> None:
+            if not event_job.finished:
+                progress.update(event_job.completed, event_job.total)
+
+        unsubscribe = job_service.subscribe(handle_event, job_id=job.id)
         try:
-            summary = await ai_service.generate_summary(combined_text)
-        except Exception as error:
-            self._show_snackbar(str(error) or "Falha ao gerar resumo do dia.")
-            return None
+            finished_job = await job_service.wait(job.id)
         finally:
-            await ai_service.close()
+            unsubscribe()
+            progress.finish()
+
+        if finished_job is None or finished_job.status == JOB_CANCELLED:
+            return None
+        if finished_job.status == JOB_FAILED:
+            self._show_snackbar(finished_job.error or "Falha ao gerar resumo do dia.")
+            return None
+        return finished_job.result
+
+    async def _run_day_summary_job(self, context: job_service.JobContext) -> str:
+        date_str = str(context.params["date"])
+        note_contents = await history_service.get_day_contents(date_str)
+        if not note_contents:
+            raise RuntimeError("Nenhuma nota com conteúdo para resumir neste dia.")
+        config = await self.config_manager.load()
+        if not config.api_key:
+            raise RuntimeError("API Key não configurada. Vá em Configurações.")
+
+        ai_service = AIService(config.api_key)
+        summary = await ai_service.summarize_day(note_contents, on_progress=context.progress)
 
         await history_service.save_daily_summary(date_str, summary)
         return summary
@@ -706,7 +1305,6 @@ class HistoryView:
         self,
         date_str: str,
         summary_text: str,
-        daily_items: list[dict[str, str]],
     ) -> None:
         summary_value = ft.Text(
             summary_text,
@@ -723,7 +1321,6 @@ class HistoryView:
             try:
                 refreshed_summary = await self._get_or_generate_day_summary(
                     date_str=date_str,
-                    daily_items=daily_items,
                     force_refresh=True,
                 )
                 if not refreshed_summary:
@@ -6,7 +6,8 @@ import subprocess
 
 import flet as ft
 
-from src.models.schemas import AppConfig, CategoryRule
+from src.models.schemas import DEFAULT_MAX_NOTE_CHARS, AppConfig, CategoryRule
+from src.services import cache_service
 from src.services.antinote_service import get_antinote_db_path
 from src.utils.config_manager import ConfigManager
 from src.views import theme
@@ -83,6 +84,39 @@ class SettingsView:
             visible=False,
         )
 
+        self.incremental_sync_switch = ft.Switch(
+            label="Analisar apenas notas novas ou alteradas desde a última análise",
+            value=False,
+            active_color=theme.ACCENT,
+            label_text_style=ft.TextStyle(color=theme.TEXT_PRIMARY, size=13),
+        )
+
+        self.max_note_chars_field = ft.TextField(
+            label="Tamanho máximo por nota (caracteres)",
+            value=str(DEFAULT_MAX_NOTE_CHARS),
+            keyboard_type=ft.KeyboardType.NUMBER,
+            border=ft.InputBorder.NONE,
+            color=theme.TEXT_PRIMARY,
+            label_style=ft.TextStyle(color=theme.TEXT_SECONDARY, size=12),
+            hint_style=ft.TextStyle(color=theme.TEXT_SECONDARY),
+            cursor_color=theme.ACCENT,
+            text_size=14,
+            dense=True,
+        )
+
+        self.oversize_strategy_dropdown = ft.Dropdown(
+            label="Notas maiores que o limite",
+            value="truncate",
+            options=[
+                ft.DropdownOption(key="truncate", text="Truncar"),
+                ft.DropdownOption(key="chunk", text="Dividir em partes"),
+            ],
+            text_size=14,
+            dense=True,
+            color=theme.TEXT_PRIMARY,
+            label_style=ft.TextStyle(color=theme.TEXT_SECONDARY, size=12),
+        )
+
         self.local_source_container = ft.Column(
             spacing=10,
             controls=[
@@ -185,6 +219,17 @@ class SettingsView:
                             self.notes_source_group,
                             self.local_source_container,
                             self.antinote_status_text,
+                            self.incremental_sync_switch,
+                            ft.Row(
+                                spacing=8,
+                                controls=[
+                                    ft.Container(
+                                        expand=True,
+                                        content=theme.ios_input_container(self.max_note_chars_field),
+                                    ),
+                                    ft.Container(expand=True, content=self.oversize_strategy_dropdown),
+                                ],
+                            ),
                         ],
                     )
                 ),
@@ -221,6 +266,28 @@ class SettingsView:
             ],
         )
 
+        self.cache_stats_text = ft.Text(size=13, color=theme.TEXT_SECONDARY, expand=True)
+        self.cache_section = ft.Column(
+            spacing=8,
+            controls=[
+                theme.ios_section_title("CACHE DE ANÁLISES"),
+                theme.ios_card(
+                    ft.Row(
+                        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+                        controls=[
+                            self.cache_stats_text,
+                            ft.TextButton(
+                                content="Limpar cache",
+                                icon=ft.Icons.DELETE_SWEEP_OUTLINED,
+                                style=theme.ios_secondary_button_style(),
+                                on_click=self._clear_cache,
+                            ),
+                        ],
+                    )
+                ),
+            ],
+        )
+
         self.save_button = ft.FilledButton(
             content=ft.Text("Salvar Configurações", weight=ft.FontWeight.W_600),
             icon=ft.Icons.SAVE,
@@ -242,6 +309,7 @@ class SettingsView:
                     self.directory_section,
                     self.prompt_section,
                     self.categories_section,
+                    self.cache_section,
                     ft.Container(padding=ft.Padding.only(top=8), content=self.save_button),
                 ],
             ),
@@ -252,12 +320,31 @@ class SettingsView:
         self.api_key_field.value = config.api_key
         self.notes_dir_field.value = config.notes_directory
         self.notes_source_group.value = config.notes_source if config.notes_source in {"local", "antinote"} else "local"
+        self.incremental_sync_switch.value = config.incremental_sync
+        self.max_note_chars_field.value = str(config.max_note_chars)
+        self.oversize_strategy_dropdown.value = config.oversize_strategy
         self.base_prompt_field.value = config.base_prompt
         self.categories = list(config.categories)
         self._update_notes_source_ui()
         self._refresh_categories()
+        self._refresh_cache_stats()
         self.page.update()
 
+    def _refresh_cache_stats(self) -> None:
+        stats = cache_service.get_cache_stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = f" ({stats['hits'] / lookups:.0%} de acerto)" if lookups else ""
+        self.cache_stats_text.value = (
+            f"Nesta sessão: {stats['hits']} análise(s) reaproveitada(s), "
+            f"{stats['misses']} enviada(s) à IA{hit_rate}."
+        )
+
+    async def _clear_cache(self, _: ft.ControlEvent) -> None:
+        await cache_service.clear_cache()
+        self._refresh_cache_stats()
+        self.page.update()
+        self._show_snackbar("Cache de análises limpo.")
+
     def _open_new_category_dialog(self, _: ft.ControlEvent) -> None:
         self._editing_category_name = None
         self.dialog_title_text.value = "Nova categoria"
@@ -474,6 +561,7 @@ class SettingsView:
         notes_source = (self.notes_source_group.value or "local").strip().lower()
         notes_directory = (self.notes_dir_field.value or "").strip()
         base_prompt = (self.base_prompt_field.value or "").strip()
+        max_note_chars_text = (self.max_note_chars_field.value or "").strip()
 
         if not api_key:
             self._show_snackbar("Informe a API Key.")
@@ -484,6 +572,9 @@ class SettingsView:
         if notes_source == "local" and not notes_directory:
             self._show_snackbar("Informe a pasta base das notas.")
             return
+        if not max_note_chars_text.isdigit() or int(max_note_chars_text) < 1:
+            self._show_snackbar("Informe um tamanho máximo por nota válido.")
+            return
         if not base_prompt:
             self._show_snackbar("Informe um prompt base.")
             return
@@ -495,6 +586,9 @@ class SettingsView:
             api_key=api_key,
             notes_directory=notes_directory,
             notes_source=notes_source,
+            incremental_sync=bool(self.incremental_sync_switch.value),
+            max_note_chars=int(max_note_chars_text),
+            oversize_strategy=self.oversize_strategy_dropdown.value or "truncate",
             base_prompt=base_prompt,
             categories=self.categories,
         )
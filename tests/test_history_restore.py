@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from src.services import history_service
+
+_ENTRY = {
+    "id": "7",
+    "data": "2024-05-10",
+    "hora": "09:30",
+    "titulo": "reuniao.md",
+    "categoria": "Trabalho",
+    "destino": "Projetos",
+    "justificativa": "Pauta da reunião",
+    "fonte": "Arquivos",
+    "conteudo": "Pauta da reunião semanal com o time de produto",
+    "resumo": "",
+}
+
+
+@pytest.fixture
+def isolated_history(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    history_service.close()
+    yield
+    history_service.close()
+
+
+async def _restore_twice_after_delete() -> tuple[dict[int, int], int, dict[str, str] | None]:
+    await history_service.init_db()
+    await history_service.restore_entries([_ENTRY])
+    await history_service.delete_entries([int(_ENTRY["id"])])
+
+    await history_service.restore_entries([_ENTRY])
+    await history_service.restore_entries([_ENTRY])
+
+    counts = await history_service.get_month_counts(2024, 5)
+    results, _ = await history_service.search("reunião semanal")
+    entry = await history_service.get_entry(int(_ENTRY["id"]))
+    return counts, len(results), entry
+
+
+def test_restoring_twice_keeps_counts_and_search_index_consistent(isolated_history):
+    counts, search_hits, entry = asyncio.run(_restore_twice_after_delete())
+
+    assert counts == {10: 1}
+    assert search_hits == 1
+    assert entry is not None
+    assert entry["conteudo"] == _ENTRY["conteudo"]
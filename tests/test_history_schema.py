@@ -0,0 +1,77 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from src.models.schemas import AnalysisResult
+from src.services import history_service
+
+_ENTRY = {
+    "id": "3",
+    "data": "2024-05-10",
+    "hora": "09:30",
+    "titulo": "anotacoes.md",
+    "categoria": "Trabalho",
+    "destino": "Financeiro",
+    "justificativa": "Planilha de custos",
+    "fonte": "Arquivos",
+    "conteudo": "Revisar o orçamento trimestral com a diretoria na sexta",
+    "resumo": "",
+}
+
+
+@pytest.fixture
+def isolated_history(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    history_service.close()
+    yield
+    history_service.close()
+
+
+async def _setup() -> None:
+    await history_service.init_db()
+    await history_service.restore_entries([_ENTRY])
+
+
+def test_plain_sqlite_connection_can_write_history(isolated_history):
+    asyncio.run(_setup())
+    history_service.close()
+
+    connection = sqlite3.connect(history_service._get_db_path())
+    try:
+        connection.execute(
+            "INSERT INTO historico (data, hora, titulo, categoria, fonte) VALUES ('2024-05-11', '10:00', 'x', 'y', 'z')"
+        )
+        connection.execute("DELETE FROM historico WHERE id = 3")
+        connection.commit()
+        remaining = connection.execute("SELECT COUNT(*) FROM conteudos").fetchone()[0]
+    finally:
+        connection.close()
+
+    assert remaining == 0
+
+
+async def _search_lifecycle() -> list[list[str]]:
+    await _setup()
+    found = []
+    results, _ = await history_service.search("orçamento")
+    found.append([result["trecho"] for result in results])
+
+    result = AnalysisResult("anotacoes.md", "Diretoria", "Reuniões", "Pauta da diretoria")
+    await history_service.update_entries_analysis([(3, result)])
+    found.append([item["categoria"] for item in (await history_service.search("pauta"))[0]])
+    found.append([item["id"] for item in (await history_service.search("custos"))[0]])
+
+    await history_service.delete_entries([3])
+    found.append([item["id"] for item in (await history_service.search("orçamento"))[0]])
+    return found
+
+
+def test_search_index_follows_updates_and_deletes(isolated_history):
+    snippets, after_update, stale, after_delete = asyncio.run(_search_lifecycle())
+
+    start, end = history_service.HIGHLIGHT_START, history_service.HIGHLIGHT_END
+    assert snippets == [f"Revisar o {start}orçamento{end} trimestral com a diretoria na sexta"]
+    assert after_update == ["Diretoria"]
+    assert stale == []
+    assert after_delete == []
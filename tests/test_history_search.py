@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from src.services import history_service
+
+
+@pytest.fixture
+def isolated_history(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    history_service.close()
+    yield
+    history_service.close()
+
+
+def _entry(entry_id: int) -> dict[str, str]:
+    repeated = " ".join(["reunião"] * (entry_id % 5 + 1))
+    return {
+        "id": str(entry_id),
+        "data": "2024-05-10",
+        "hora": "09:30",
+        "titulo": f"nota-{entry_id}.md",
+        "categoria": "Trabalho",
+        "destino": "Projetos",
+        "justificativa": "",
+        "fonte": "Arquivos",
+        "conteudo": f"{repeated} de acompanhamento número {entry_id}",
+        "resumo": "",
+    }
+
+
+async def _page_through(total: int, page_size: int) -> list[str]:
+    await history_service.init_db()
+    await history_service.restore_entries([_entry(entry_id) for entry_id in range(1, total + 1)])
+
+    ids: list[str] = []
+    has_more = True
+    while has_more:
+        page, has_more = await history_service.search("reunião", limit=page_size, offset=len(ids))
+        assert page or not has_more
+        ids.extend(result["id"] for result in page)
+    return ids
+
+
+def test_paging_past_the_ranked_window_returns_every_match_once(isolated_history, monkeypatch):
+    monkeypatch.setattr(history_service, "_SEARCH_CANDIDATES", 25)
+
+    ids = asyncio.run(_page_through(total=70, page_size=20))
+
+    assert len(ids) == 70
+    assert len(set(ids)) == 70
+    assert [int(entry_id) for entry_id in ids[25:]] == list(range(45, 0, -1))
@@ -0,0 +1,48 @@
+import pytest
+
+from src.services import notes_service
+
+_MAX_CHARS = 200
+
+
+@pytest.fixture
+def notes_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(notes_service, "_index_ready", False)
+    directory = tmp_path / "notas"
+    directory.mkdir()
+    (directory / "longa.md").write_text("\n\n".join("x" * 80 for _ in range(10)), encoding="utf-8")
+    (directory / "curta.md").write_text("lembrete", encoding="utf-8")
+    return str(directory)
+
+
+def _changed(directory: str) -> list:
+    return notes_service.get_changed_notes(directory, _MAX_CHARS, "chunk")
+
+
+def _split(notes: list) -> tuple[list, list]:
+    long_parts = [note for note in notes if "longa.md" in note.file_path]
+    short = [note for note in notes if "curta.md" in note.file_path]
+    return long_parts, short
+
+
+def test_chunked_file_is_marked_only_after_every_part(notes_dir):
+    long_parts, short = _split(_changed(notes_dir))
+    assert len(long_parts) > 1
+
+    pending = notes_service.mark_notes_analyzed(long_parts[:-1] + short)
+
+    assert {note.file_path for note in pending} == {note.file_path for note in long_parts[:-1]}
+    assert _split(_changed(notes_dir)) == (long_parts, [])
+
+    assert notes_service.mark_notes_analyzed(pending + long_parts[-1:]) == []
+    assert _changed(notes_dir) == []
+
+
+def test_file_with_failed_part_is_not_marked(notes_dir):
+    long_parts, short = _split(_changed(notes_dir))
+
+    pending = notes_service.mark_notes_analyzed(long_parts[1:] + short, failed_notes=long_parts[:1])
+
+    assert pending == []
+    assert _split(_changed(notes_dir)) == (long_parts, [])
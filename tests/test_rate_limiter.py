@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+from src.services.rate_limiter import RateLimiter, parse_duration
+
+
+def test_daily_request_limit_does_not_raise_the_per_minute_ceiling():
+    limiter = RateLimiter(requests_per_minute=30, max_requests_per_minute=120)
+
+    limiter.record_success(
+        {
+            "x-ratelimit-limit-requests": "14400",
+            "x-ratelimit-remaining-requests": "14399",
+            "x-ratelimit-reset-requests": "6s",
+        }
+    )
+
+    assert limiter.max_requests_per_minute == pytest.approx(120)
+    assert limiter.requests_per_minute <= 120
+
+
+def test_token_limit_seeds_rate_and_ceiling():
+    limiter = RateLimiter(requests_per_minute=30)
+
+    limiter.record_success({"x-ratelimit-limit-tokens": "6000"}, tokens_used=500)
+
+    assert limiter.max_requests_per_minute == pytest.approx(12)
+    assert limiter.requests_per_minute == pytest.approx(12)
+
+
+def test_remaining_requests_pace_the_rest_of_the_window():
+    limiter = RateLimiter(requests_per_minute=30)
+
+    limiter.record_success({"x-ratelimit-remaining-requests": "2", "x-ratelimit-reset-requests": "1m"})
+
+    assert limiter.requests_per_minute == pytest.approx(2)
+
+
+def test_remaining_tokens_pace_by_average_request_size():
+    limiter = RateLimiter(requests_per_minute=60)
+
+    limiter.record_success(
+        {"x-ratelimit-remaining-tokens": "1000", "x-ratelimit-reset-tokens": "30s"},
+        tokens_used=500,
+    )
+
+    assert limiter.requests_per_minute == pytest.approx(4)
+
+
+def test_exhausted_budget_blocks_until_reset():
+    limiter = RateLimiter()
+
+    limiter.record_success({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2.5s"})
+
+    assert limiter._blocked_until - time.monotonic() == pytest.approx(2.5, abs=0.1)
+
+
+def test_short_retry_after_is_waited_out_without_slowing_down():
+    limiter = RateLimiter(requests_per_minute=30)
+
+    async def throttled_twice() -> float:
+        started_at = time.monotonic()
+        for _ in range(2):
+            await limiter.acquire()
+            limiter.record_throttled({}, retry_after=0.05)
+        await limiter.acquire()
+        return time.monotonic() - started_at
+
+    assert asyncio.run(throttled_twice()) < 0.5
+    assert limiter.requests_per_minute == pytest.approx(30)
+
+
+def test_long_retry_after_halves_the_rate():
+    limiter = RateLimiter(requests_per_minute=30)
+
+    limiter.record_throttled({}, retry_after=5)
+
+    assert limiter.requests_per_minute == pytest.approx(15)
+
+
+def test_parse_duration_accepts_groq_formats():
+    assert parse_duration("2m59.56s") == pytest.approx(179.56)
+    assert parse_duration("7.66ms") == pytest.approx(0.00766)
+    assert parse_duration("12") == 12
+    assert parse_duration("") is None